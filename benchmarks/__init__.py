@@ -0,0 +1,5 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Benchmarks in the airspeed velocity (asv) format
+#Run with "asv run", or "python -m benchmarks.run" if asv isn't installed
@@ -0,0 +1,112 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Shared setup for the benchmarks
+
+from __future__ import absolute_import
+
+from mousetracks.config.settings import CONFIG
+from mousetracks.constants import DEFAULT_NAME
+from mousetracks.files import LoadData
+from mousetracks.track.background import _create_store, check_resolution
+from mousetracks.track.replay import ReplayEngine
+from mousetracks.track.workload import Workload
+
+
+RESOLUTION = (1920, 1080)
+
+SEED = 0
+
+#Resolutions recorded in each test profile
+PROFILE_SIZES = {
+    '1080p': [(1920, 1080)],
+    '4k': [(3840, 2160)],
+    'multi': [(2560, 1440), (1920, 1080)],
+}
+
+PROFILE_FRAMES = 50000
+
+#Colour maps to use, as some are left blank to be chosen when rendering
+#The render cache is disabled so that every render is timed
+RENDER_CONFIG = {
+    'GenerateImages': {'CacheSize': 0},
+    'GenerateTracks': {'ColourProfile': 'Citrus'},
+    'GenerateSpeed': {'ColourProfile': 'Demon'},
+    'GenerateStrokes': {'ColourProfile': 'Ice'},
+    'GenerateHeatmap': {'ColourProfile': 'Jet'},
+    'GenerateKeyboard': {'ColourProfile': 'Aqua'},
+}
+
+_PROFILES = {}
+
+
+def create_store(resolution=RESOLUTION):
+    """Create a background process store with an empty default profile.
+    This avoids loading any existing profile, so that results don't depend on previous tracking.
+    """
+    store = _create_store(new_sessions=False)
+    data = LoadData(empty=True)
+    store['Applications'][DEFAULT_NAME]['Data'] = data
+    store['Resolution'] = resolution
+    store['MonitorLimits'] = [(0, 0) + resolution]
+    check_resolution(data, resolution)
+    return store
+
+
+def create_frames(count, seed=SEED, **kwargs):
+    """Generate a repeatable list of frames.
+    The resolution is fixed unless otherwise requested.
+    """
+    kwargs.setdefault('resolution', RESOLUTION)
+    kwargs.setdefault('weights', {'resolution': 0})
+    return list(Workload(seed=seed, **kwargs).frames(count))
+
+
+def create_profile(size, frames=PROFILE_FRAMES):
+    """Record a test profile by replaying generated frames at each resolution.
+    Profiles are cached, as they take a few seconds to create.
+    """
+    try:
+        return _PROFILES[(size, frames)]
+    except KeyError:
+        pass
+
+    resolutions = PROFILE_SIZES[size]
+    store = create_store(resolutions[0])
+    engine = ReplayEngine(store)
+    for i, resolution in enumerate(resolutions):
+        for frame in create_frames(frames, seed=SEED + i, resolution=resolution):
+            engine.process(frame)
+    engine.flush()
+
+    data = _PROFILES[(size, frames)] = store['Applications'][DEFAULT_NAME]['Data']
+    return data
+
+
+def frames_with(frames, key):
+    """Get the values of a key from every frame that contains it."""
+    return [frame[key] for frame in frames if key in frame]
+
+
+class ConfigOverride(object):
+    """Temporarily change config values.
+    Benchmarks that run the background process shouldn't leave a journal behind.
+
+    Example:
+    >>> with ConfigOverride(Save={'Journal': False}):
+    ...     pass
+    """
+    def __init__(self, **sections):
+        self.sections = sections
+        self.original = {}
+
+    def __enter__(self):
+        for section, values in self.sections.items():
+            for name, value in values.items():
+                self.original[(section, name)] = CONFIG[section][name]
+                CONFIG[section][name] = value
+        return self
+
+    def __exit__(self, *args):
+        for (section, name), value in self.original.items():
+            CONFIG[section][name] = value
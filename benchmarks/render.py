@@ -0,0 +1,351 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Benchmarks for image generation
+#Each stage of rendering is timed separately, along with its peak memory usage
+
+from __future__ import absolute_import, division
+
+import shutil
+import tempfile
+import time
+
+from PIL import Image
+
+from mousetracks.config.settings import CONFIG
+from mousetracks.image.cache import RenderCache
+from mousetracks.image.calculate import (arrays_to_colour_bands, arrays_to_heatmap, calculate_resolution, gaussian_size,
+                                         points_to_heatmap, upscale_arrays_to_resolution)
+from mousetracks.image.colours import ColourRange, calculate_colour_map
+from mousetracks.image.incremental import IncrementalTracks
+from mousetracks.image.main import RENDER_CONFIG_HEADINGS, RESIZE_FILTER, RenderImage
+from mousetracks.image.parallel import render_workers
+from mousetracks.utils import numpy
+from mousetracks.utils.compatibility import BytesIO
+
+from .common import RENDER_CONFIG, ConfigOverride, create_profile
+
+
+SIZES = ['1080p', '4k', 'multi']
+
+RENDER_TYPES = ['tracks', 'speed', 'strokes', 'clicks', 'keyboard']
+
+WORKERS = sorted(set([1, 2, 4, render_workers()]))
+
+COLOUR_MAPS = ['Citrus', 'Ice', 'Demon', 'Jet', 'Aqua']
+
+_STAGE_CACHE = {}
+
+
+def _cached(size, stage, func):
+    """Remember the input to each stage, as earlier stages can be slow."""
+    try:
+        return _STAGE_CACHE[(size, stage)]
+    except KeyError:
+        result = _STAGE_CACHE[(size, stage)] = func()
+        return result
+
+
+def _track_map(size):
+    return _cached(size, 'TrackMap', lambda: create_profile(size).get_tracks())
+
+
+def _resolution(size):
+    def calculate():
+        top_resolution, _, tracks = _track_map(size)
+        return calculate_resolution(tracks.keys(), top_resolution)
+    return _cached(size, 'Resolution', calculate)
+
+
+def _upscaled_tracks(size):
+    def calculate():
+        tracks = _track_map(size)[2]
+        return upscale_arrays_to_resolution(tracks, _resolution(size)[1])
+    return _cached(size, 'UpscaledTracks', calculate)
+
+
+def _upscaled_clicks(size):
+    def calculate():
+        top_resolution, _, clicks = create_profile(size).get_clicks()
+        return upscale_arrays_to_resolution(clicks, _resolution(size)[1])
+    return _cached(size, 'UpscaledClicks', calculate)
+
+
+def _image(size):
+    """Create an image from the upscaled tracks without needing a colour range."""
+    def calculate():
+        merged = numpy.merge(_upscaled_tracks(size), 'max')
+        scaled = numpy.divide(merged * 255, max(1, numpy.max(merged)), dtype='float64')
+        return Image.fromarray(numpy.set_type(scaled, 'uint8')).convert('RGB')
+    return _cached(size, 'Image', calculate)
+
+
+class _RenderStage(object):
+    params = SIZES
+    param_names = ['size']
+    number = 1
+    repeat = 3
+    timeout = 900
+
+    def setup(self, size):
+        self.config = ConfigOverride(**RENDER_CONFIG).__enter__()
+
+    def teardown(self, size):
+        self.config.__exit__()
+
+
+class GetTrackMap(_RenderStage):
+    def setup(self, size):
+        super(GetTrackMap, self).setup(size)
+        self.data = create_profile(size)
+
+    def time_get_track_map(self, size):
+        self.data.get_tracks()
+
+    def peakmem_get_track_map(self, size):
+        self.data.get_tracks()
+
+
+class CalculateResolution(_RenderStage):
+    def setup(self, size):
+        super(CalculateResolution, self).setup(size)
+        self.top_resolution, _, tracks = _track_map(size)
+        self.resolutions = list(tracks.keys())
+
+    def time_calculate_resolution(self, size):
+        calculate_resolution(self.resolutions, self.top_resolution)
+
+
+class UpscaleArrays(_RenderStage):
+    def setup(self, size):
+        super(UpscaleArrays, self).setup(size)
+        self.tracks = _track_map(size)[2]
+        self.upscale_resolution = _resolution(size)[1]
+
+    def time_upscale_arrays_to_resolution(self, size):
+        upscale_arrays_to_resolution(self.tracks, self.upscale_resolution)
+
+    def peakmem_upscale_arrays_to_resolution(self, size):
+        upscale_arrays_to_resolution(self.tracks, self.upscale_resolution)
+
+    def time_upscale_arrays_to_resolution_merged(self, size):
+        upscale_arrays_to_resolution(self.tracks, self.upscale_resolution, merge='max')
+
+    def peakmem_upscale_arrays_to_resolution_merged(self, size):
+        upscale_arrays_to_resolution(self.tracks, self.upscale_resolution, merge='max')
+
+
+class ArraysToHeatmap(_RenderStage):
+    def setup(self, size):
+        super(ArraysToHeatmap, self).setup(size)
+        self.arrays = _upscaled_clicks(size)
+        self.gaussian_size = gaussian_size(*_resolution(size)[1])
+        self.clip = 1 - CONFIG['Advanced']['HeatmapRangeClipping']
+
+    def time_arrays_to_heatmap(self, size):
+        arrays_to_heatmap(self.arrays, self.gaussian_size, self.clip)
+
+    def peakmem_arrays_to_heatmap(self, size):
+        arrays_to_heatmap(self.arrays, self.gaussian_size, self.clip)
+
+
+class PointsToHeatmap(_RenderStage):
+    def setup(self, size):
+        super(PointsToHeatmap, self).setup(size)
+        self.clicks = create_profile(size).get_clicks()[2]
+        self.output_resolution, self.upscale_resolution = _resolution(size)
+        self.gaussian_size = gaussian_size(*self.upscale_resolution)
+        self.clip = 1 - CONFIG['Advanced']['HeatmapRangeClipping']
+
+    def time_points_to_heatmap(self, size):
+        points_to_heatmap(self.clicks, self.upscale_resolution, self.output_resolution, self.gaussian_size, self.clip)
+
+    def peakmem_points_to_heatmap(self, size):
+        points_to_heatmap(self.clicks, self.upscale_resolution, self.output_resolution, self.gaussian_size, self.clip)
+
+
+class ConvertToRGB(_RenderStage):
+    def setup(self, size):
+        super(ConvertToRGB, self).setup(size)
+        _, (min_value, max_value), _ = _track_map(size)
+        self.colour_range = ColourRange(min_value, max_value, calculate_colour_map(RENDER_CONFIG['GenerateTracks']['ColourProfile']))
+        self.array = numpy.merge(_upscaled_tracks(size), 'max')
+
+    def time_convert_to_rgb(self, size):
+        self.colour_range.convert_to_rgb(self.array)
+
+    def peakmem_convert_to_rgb(self, size):
+        self.colour_range.convert_to_rgb(self.array)
+
+
+class ColourBands(_RenderStage):
+    """Upscale, merge and colour the tracks in one pass, a band at a time."""
+    def setup(self, size):
+        super(ColourBands, self).setup(size)
+        _, (min_value, max_value), self.tracks = _track_map(size)
+        self.colour_range = ColourRange(min_value, max_value, calculate_colour_map(RENDER_CONFIG['GenerateTracks']['ColourProfile']))
+        self.upscale_resolution = _resolution(size)[1]
+        self.band_height = CONFIG['GenerateImages']['BandHeight']
+
+    def time_arrays_to_colour_bands(self, size):
+        arrays_to_colour_bands(self.colour_range, self.tracks, self.upscale_resolution, self.band_height)
+
+    def peakmem_arrays_to_colour_bands(self, size):
+        arrays_to_colour_bands(self.colour_range, self.tracks, self.upscale_resolution, self.band_height)
+
+
+class UpdateTracks(_RenderStage):
+    """Update a previous track render after a short burst of movement."""
+    params = (SIZES, [0, 10, 1000])
+    param_names = ['size', 'pixels']
+
+    def setup(self, size, pixels):
+        super(UpdateTracks, self).setup(size)
+        top_resolution, (min_value, max_value), tracks = _track_map(size)
+        self.colour_map = calculate_colour_map(RENDER_CONFIG['GenerateTracks']['ColourProfile'])
+        self.upscale_resolution = _resolution(size)[1]
+        self.band_height = CONFIG['GenerateImages']['BandHeight']
+        self.ticks = max_value + 1
+
+        #Draw a horizontal line of new values along the middle of each resolution
+        updated = {}
+        for resolution, array in tracks.items():
+            array = updated[resolution] = array.copy()
+            row = array[resolution[1] // 2]
+            row[:pixels] = numpy.arange(self.ticks, self.ticks + min(pixels, len(row)), dtype=str(array.dtype))
+        max_value = max(numpy.max(array) for array in updated.values())
+        self.updated = (top_resolution, (min_value, int(max_value)), updated)
+
+        self.incremental = IncrementalTracks()
+        self.incremental.render(_track_map(size), self.ticks, self.colour_map, self.upscale_resolution, self.band_height)
+
+    def teardown(self, size, pixels):
+        super(UpdateTracks, self).teardown(size)
+
+    def time_update_tracks(self, size, pixels):
+        self.incremental.render(self.updated, self.ticks + max(1, pixels), self.colour_map, self.upscale_resolution, self.band_height)
+
+
+class Resize(_RenderStage):
+    def setup(self, size):
+        super(Resize, self).setup(size)
+        self.image = _image(size)
+        self.output_resolution = _resolution(size)[0]
+
+    def time_resize(self, size):
+        self.image.resize(self.output_resolution, RESIZE_FILTER)
+
+    def peakmem_resize(self, size):
+        self.image.resize(self.output_resolution, RESIZE_FILTER)
+
+
+class Save(_RenderStage):
+    def setup(self, size):
+        super(Save, self).setup(size)
+        self.image = _image(size).resize(_resolution(size)[0], RESIZE_FILTER)
+        self.file_type = CONFIG['GenerateImages']['FileType']
+
+    def time_save(self, size):
+        self.image.save(BytesIO(), self.file_type)
+
+    def peakmem_save(self, size):
+        self.image.save(BytesIO(), self.file_type)
+
+
+class Render(_RenderStage):
+    """Full render of each image type, without saving."""
+    params = (SIZES, RENDER_TYPES)
+    param_names = ['size', 'render_type']
+    repeat = 1
+
+    def setup(self, size, render_type):
+        super(Render, self).setup(size)
+        self.render = RenderImage(create_profile(size), allow_save=False)
+
+    def teardown(self, size, render_type):
+        super(Render, self).teardown(size)
+
+    def time_render(self, size, render_type):
+        getattr(self.render, render_type)()
+
+    def peakmem_render(self, size, render_type):
+        getattr(self.render, render_type)()
+
+
+class RenderWorkers(_RenderStage):
+    """Full renders split between multiple workers."""
+    params = (SIZES, ['tracks', 'clicks'], WORKERS)
+    param_names = ['size', 'render_type', 'workers']
+    repeat = 1
+
+    def setup(self, size, render_type, workers):
+        super(RenderWorkers, self).setup(size)
+        self.workers = ConfigOverride(GenerateImages={'RenderWorkers': workers}).__enter__()
+        self.render = RenderImage(create_profile(size), allow_save=False)
+
+    def teardown(self, size, render_type, workers):
+        self.workers.__exit__()
+        super(RenderWorkers, self).teardown(size)
+
+    def _time(self, render_type, workers):
+        with ConfigOverride(GenerateImages={'RenderWorkers': workers}):
+            start = time.time()
+            getattr(self.render, render_type)()
+            return time.time() - start
+
+    def time_render(self, size, render_type, workers):
+        getattr(self.render, render_type)()
+
+    def track_speedup(self, size, render_type, workers):
+        """How many times faster the render is compared to a single worker."""
+        return self._time(render_type, 1) / self._time(render_type, workers)
+    track_speedup.unit = 'speedup'
+
+
+class Batch(_RenderStage):
+    """Render multiple colour maps, either as a batch or one at a time."""
+    params = (SIZES, ['tracks', 'clicks'], [1, 3, 5])
+    param_names = ['size', 'render_type', 'colour_maps']
+    repeat = 1
+
+    def setup(self, size, render_type, colour_maps):
+        super(Batch, self).setup(size)
+        self.render = RenderImage(create_profile(size), allow_save=False)
+
+    def teardown(self, size, render_type, colour_maps):
+        super(Batch, self).teardown(size)
+
+    def time_batch(self, size, render_type, colour_maps):
+        self.render.batch([(render_type, COLOUR_MAPS[:colour_maps])])
+
+    def time_separate(self, size, render_type, colour_maps):
+        config_heading = RENDER_CONFIG_HEADINGS[render_type]
+        for colour_map in COLOUR_MAPS[:colour_maps]:
+            CONFIG[config_heading]['ColourProfile'] = colour_map
+            getattr(self.render, render_type)()
+
+
+class RenderCached(_RenderStage):
+    """Full render of an image that has already been cached.
+    Data from a saved profile is identified by the file, otherwise it must be hashed.
+    """
+    params = (SIZES, ['tracks', 'clicks'], ['memory', 'saved'])
+    param_names = ['size', 'render_type', 'source']
+
+    def setup(self, size, render_type, source):
+        super(RenderCached, self).setup(size)
+        self.folder = tempfile.mkdtemp()
+        self.render = RenderImage(create_profile(size), allow_save=False)
+        self.render.cache = RenderCache(self.folder, max_size=1024 * 1024 * 1024)
+
+        #The profile isn't really saved, so give it a fixed file state
+        if source == 'saved':
+            self.render._file_state = (size, 0, 0)
+        getattr(self.render, render_type)()
+
+    def teardown(self, size, render_type, source):
+        shutil.rmtree(self.folder, ignore_errors=True)
+        super(RenderCached, self).teardown(size)
+
+    def time_render_cached(self, size, render_type, source):
+        getattr(self.render, render_type)()
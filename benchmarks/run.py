@@ -0,0 +1,265 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Minimal runner for the asv benchmarks, for when asv isn't available
+#Results are saved per commit so that any two commits can be compared
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import re
+import subprocess
+import sys
+import time
+import timeit
+
+
+BENCHMARK_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+REPO_FOLDER = os.path.dirname(BENCHMARK_FOLDER)
+
+RESULTS_FOLDER = os.path.join(REPO_FOLDER, '.benchmarks')
+
+BENCHMARK_TYPES = ('time_', 'peakmem_', 'track_')
+
+#Modules that only contain helpers
+IGNORE_MODULES = ('common', 'run')
+
+#Minimum length of a single timing sample
+SAMPLE_TIME = 0.1
+
+DEFAULT_REPEAT = 5
+
+#Slowdowns bigger than this are reported as regressions
+DEFAULT_THRESHOLD = 0.1
+
+
+class Benchmark(object):
+    """A single benchmark method or function, following the asv conventions."""
+    def __init__(self, name, func, owner=None):
+        self.name = name
+        self.func = func
+        self.owner = owner
+        self.type = [prefix for prefix in BENCHMARK_TYPES if func.__name__.startswith(prefix)][0][:-1]
+
+        params = self._attr('params', [])
+        if params and not isinstance(params[0], (list, tuple)):
+            params = [params]
+        self.params = [list(param) for param in params]
+        self.param_names = self._attr('param_names', ['param{}'.format(i + 1) for i in range(len(self.params))])
+        self.number = self._attr('number', 0)
+        self.repeat = self._attr('repeat', DEFAULT_REPEAT)
+        self.unit = self._attr('unit', {'time': 'seconds', 'peakmem': 'bytes'}.get(self.type, 'unit'))
+
+    def _attr(self, name, default):
+        """Get an attribute from the function, falling back to the class or module."""
+        for source in (self.func, self.owner):
+            if source is not None and hasattr(source, name):
+                return getattr(source, name)
+        return default
+
+    def combinations(self):
+        return list(itertools.product(*self.params)) if self.params else [()]
+
+    def run(self, params=(), quick=False):
+        """Run the benchmark with one set of parameters.
+        Returns None if it was skipped.
+        """
+        instance = self.owner() if inspect.isclass(self.owner) else None
+        func = getattr(instance, self.func.__name__) if instance is not None else self.func
+        setup = getattr(instance if instance is not None else self.owner, 'setup', None)
+        teardown = getattr(instance if instance is not None else self.owner, 'teardown', None)
+
+        samples = []
+        for _ in range(1 if quick else self.repeat):
+            try:
+                if setup is not None:
+                    setup(*params)
+            except NotImplementedError:
+                return None
+            try:
+                samples.append(self._measure(func, params, quick))
+            finally:
+                if teardown is not None:
+                    teardown(*params)
+            if self.type != 'time':
+                break
+
+        samples.sort()
+        return samples[len(samples) // 2]
+
+    def _measure(self, func, params, quick):
+        if self.type == 'track':
+            return func(*params)
+
+        if self.type == 'peakmem':
+            import tracemalloc
+            tracemalloc.start()
+            try:
+                func(*params)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        timer = timeit.Timer(lambda: func(*params))
+        number = self.number or 1
+        if not self.number and not quick:
+            while True:
+                elapsed = timer.timeit(number)
+                if elapsed >= SAMPLE_TIME:
+                    return elapsed / number
+                number *= 2 if elapsed else 10
+        return timer.timeit(number) / number
+
+
+def discover(pattern=None):
+    """Find every benchmark in the benchmarks package."""
+    if REPO_FOLDER not in sys.path:
+        sys.path.insert(0, REPO_FOLDER)
+    regex = re.compile(pattern) if pattern else None
+
+    benchmarks = []
+    for _, module_name, _ in pkgutil.iter_modules([BENCHMARK_FOLDER]):
+        if module_name in IGNORE_MODULES or module_name.startswith('_'):
+            continue
+        module = importlib.import_module('benchmarks.{}'.format(module_name))
+
+        for name, obj in sorted(vars(module).items()):
+            if name.startswith('_') or getattr(obj, '__module__', None) != module.__name__:
+                continue
+            if inspect.isclass(obj):
+                for attr in sorted(dir(obj)):
+                    if attr.startswith(BENCHMARK_TYPES):
+                        benchmarks.append(Benchmark('{}.{}.{}'.format(module_name, name, attr), getattr(obj, attr), obj))
+            elif inspect.isfunction(obj) and name.startswith(BENCHMARK_TYPES):
+                benchmarks.append(Benchmark('{}.{}'.format(module_name, name), obj, module))
+
+    if regex is not None:
+        benchmarks = [benchmark for benchmark in benchmarks if regex.search(benchmark.name)]
+    return benchmarks
+
+
+def git_commit(ref='HEAD'):
+    """Get the full hash of a commit."""
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', ref], cwd=REPO_FOLDER, stderr=subprocess.STDOUT)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def result_path(commit):
+    return os.path.join(RESULTS_FOLDER, '{}-{}.json'.format(commit[:12], platform.node() or 'unknown'))
+
+
+def load_results(ref):
+    """Load results from a file path or a commit."""
+    if os.path.isfile(ref):
+        path = ref
+    else:
+        commit = git_commit(ref)
+        if commit is None:
+            raise ValueError('unknown commit: {}'.format(ref))
+        path = result_path(commit)
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def format_value(value, unit):
+    if value is None:
+        return 'skipped'
+    if unit == 'seconds':
+        for scale, suffix in ((1, 's'), (1e-3, 'ms'), (1e-6, 'us')):
+            if value >= scale:
+                return '{:.3f}{}'.format(value / scale, suffix)
+        return '{:.3f}ns'.format(value * 1e9)
+    if unit == 'bytes':
+        return '{:.2f}MB'.format(value / 1048576)
+    return '{:.2f} {}'.format(value, unit)
+
+
+def run_benchmarks(benchmarks, quick=False):
+    """Run every benchmark and return the results."""
+    results = {}
+    for benchmark in benchmarks:
+        results[benchmark.name] = {'type': benchmark.type, 'unit': benchmark.unit,
+                                   'param_names': benchmark.param_names, 'results': {}}
+        for params in benchmark.combinations():
+            start = time.time()
+            value = benchmark.run(params, quick=quick)
+            key = ', '.join(map(str, params))
+            results[benchmark.name]['results'][key] = value
+            label = '{}({})'.format(benchmark.name, key) if params else benchmark.name
+            print('{:<80} {:>16}  [{:.1f}s]'.format(label, format_value(value, benchmark.unit), time.time() - start))
+    return results
+
+
+def compare_results(old, new, threshold=DEFAULT_THRESHOLD):
+    """Print the change between two sets of results.
+    Returns a list of any benchmarks that got worse by more than the threshold.
+    Higher values are worse, apart from track benchmarks measured as a rate or speedup.
+    """
+    regressions = []
+    print('\n{:<80} {:>12} {:>12} {:>8}'.format('Benchmark', 'Before', 'After', 'Ratio'))
+    for name, benchmark in sorted(new['benchmarks'].items()):
+        try:
+            old_results = old['benchmarks'][name]['results']
+        except KeyError:
+            continue
+        higher_is_better = benchmark['type'] == 'track' and ('/s' in benchmark['unit'] or benchmark['unit'] == 'speedup')
+
+        for key, value in sorted(benchmark['results'].items()):
+            old_value = old_results.get(key)
+            if value is None or not old_value:
+                continue
+            ratio = value / old_value
+            worse = 1 / ratio if higher_is_better else ratio
+            label = '{}({})'.format(name, key) if key else name
+            flag = ''
+            if worse > 1 + threshold:
+                flag = ' !'
+                regressions.append(label)
+            elif worse < 1 / (1 + threshold):
+                flag = ' +'
+            print('{:<80} {:>12} {:>12} {:>8.2f}{}'.format(label, format_value(old_value, benchmark['unit']),
+                                                          format_value(value, benchmark['unit']), ratio, flag))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Run the Mouse Tracks benchmarks.')
+    parser.add_argument('-b', '--bench', help='only run benchmarks matching this regex')
+    parser.add_argument('-q', '--quick', action='store_true', help='run each benchmark once')
+    parser.add_argument('-c', '--compare', help='commit or results file to compare against')
+    parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fraction of slowdown to report as a regression')
+    parser.add_argument('--no-save', action='store_true', help="don't save the results")
+    args = parser.parse_args(args)
+
+    commit = git_commit()
+    results = {'commit': commit, 'machine': platform.node(), 'python': platform.python_version(),
+               'date': int(time.time()), 'benchmarks': run_benchmarks(discover(args.bench), quick=args.quick)}
+
+    if commit is not None and not args.no_save:
+        if not os.path.exists(RESULTS_FOLDER):
+            os.makedirs(RESULTS_FOLDER)
+        with open(result_path(commit), 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, threshold=args.threshold)
+        if regressions:
+            print('\n{} benchmark(s) regressed by more than {:.0%}'.format(len(regressions), args.threshold))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Benchmarks for the time taken to import each entry point
+#Each import is run in a new interpreter with "-X importtime", so nothing is already loaded
+#The language is loaded on every import, so its parsing and cache are timed separately
+
+from __future__ import absolute_import, division
+
+import os
+import subprocess
+import sys
+
+from mousetracks.utils.compatibility import range
+
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#Slow to load modules, which should only be imported when they are used
+HEAVY_MODULES = ('numpy', 'PIL', 'scipy', 'flask', 'urllib.request')
+
+#Imports are quick enough that the time varies a lot, so use the fastest of several runs
+RUNS = 3
+
+
+def import_time(module):
+    """Import a module in a new interpreter.
+    Returns the total import time in seconds, and the names of every module loaded.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (REPO_FOLDER, env.get('PYTHONPATH'))))
+    process = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+                               cwd=REPO_FOLDER, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, output = process.communicate()
+    if process.returncode:
+        raise RuntimeError(output.decode('utf-8', 'replace'))
+
+    #Each line is "import time: self | cumulative | name", indented by depth
+    #The module and its parent packages are listed at the top level, after the interpreter startup
+    parts = module.split('.')
+    targets = set('.'.join(parts[:i + 1]) for i in range(len(parts)))
+    total = 0
+    modules = set()
+    for line in output.decode('utf-8', 'replace').splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            cumulative = int(cumulative)
+        except ValueError:
+            continue
+        modules.add(name.strip())
+        if not name[1:].startswith(' ') and name.strip() in targets:
+            total += cumulative
+    return total / 1000000, modules
+
+
+class Startup(object):
+    """Time to import the modules needed before tracking starts or any input is asked for."""
+    params = ['mousetracks.config.language', 'mousetracks.track', 'mousetracks.image', 'mousetracks.image.batch', 'mousetracks.api']
+    param_names = ['module']
+    unit = 'seconds'
+    repeat = 1
+
+    def setup(self, module):
+        if sys.version_info < (3, 7):
+            raise NotImplementedError('-X importtime requires Python 3.7')
+
+    def track_import_time(self, module):
+        return min(import_time(module)[0] for _ in range(RUNS))
+
+    def track_heavy_modules(self, module):
+        return len(import_time(module)[1].intersection(HEAVY_MODULES))
+    track_heavy_modules.unit = 'modules'
+
+
+class LoadLanguage(object):
+    """Time to load the language strings, keys and keyboard layout."""
+    params = ['parsed', 'cached']
+    param_names = ['source']
+
+    def setup(self, source):
+        from mousetracks.config.language import LANGUAGE
+
+        #Make sure the cache is up to date
+        self.language = LANGUAGE
+        self.language.reload()
+
+    def time_load(self, source):
+        if source == 'parsed':
+            self.language._strings()
+            self.language._keyboard_keys()
+            self.language._keyboard_layout()
+        else:
+            self.language.reload()
@@ -0,0 +1,184 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Benchmarks for the tracking and recording hot paths
+
+from __future__ import absolute_import, division
+
+import random
+import time
+
+from mousetracks.config.settings import CONFIG
+from mousetracks.constants import UPDATES_PER_SECOND
+from mousetracks.track.background import (process_queue, check_resolution, record_mouse_move, record_key_press,
+                                          _record_click, compress_tracks, history_trim)
+from mousetracks.track.replay import ReplayEngine, calculate_lines
+from mousetracks.track.workload import feed_queue
+from mousetracks.utils import numpy
+from mousetracks.utils.compatibility import queue, range
+
+from .common import RESOLUTION, SEED, ConfigOverride, create_frames, create_store, frames_with
+
+
+FRAMES = 20000
+
+#Frame mixes for the end to end benchmarks
+#With a gamepad connected, the axis positions are sent every tick
+WORKLOADS = {
+    'default': {},
+    'gamepad': {'gamepad': True, 'weights': {'resolution': 0, 'gamepad': 45}},
+}
+
+
+class CalculateLine(object):
+    """Compare the pixel line calculations."""
+    params = (['mousetracks', 'mousetracks2'], [2, 16, 256])
+    param_names = ['module', 'length']
+
+    def setup(self, module, length):
+        if module == 'mousetracks':
+            from mousetracks.utils.maths import calculate_line
+        else:
+            try:
+                from mousetracks2.utils.math import calculate_line
+            except ImportError:
+                raise NotImplementedError('mousetracks2 requirements not installed')
+        self.calculate_line = calculate_line
+
+        rng = random.Random(SEED)
+        self.lines = []
+        for _ in range(1000):
+            start = (rng.randint(0, RESOLUTION[0]), rng.randint(0, RESOLUTION[1]))
+            end = (start[0] + rng.randint(-length, length), start[1] + rng.randint(-length, length))
+            self.lines.append((start, end))
+
+    def time_calculate_line(self, module, length):
+        calculate_line = self.calculate_line
+        for start, end in self.lines:
+            calculate_line(start, end)
+
+
+class CalculateLines(object):
+    """Vectorised line calculation used by the replay engine."""
+    params = [2, 16, 256]
+    param_names = ['length']
+
+    def setup(self, length):
+        rng = random.Random(SEED)
+        x = [rng.randint(-length, length) for _ in range(1000)]
+        y = [rng.randint(-length, length) for _ in range(1000)]
+        self.x = numpy.array(x, dtype='int64')
+        self.y = numpy.array(y, dtype='int64')
+
+    def time_calculate_lines(self, length):
+        calculate_lines(self.x, self.y)
+
+
+class Record(object):
+    """Individual record functions of the background process."""
+    def setup(self):
+        frames = create_frames(FRAMES)
+        self.moves = frames_with(frames, 'MouseMove')
+        self.keys = frames_with(frames, 'KeyPress')
+        self.clicks = frames_with(frames, 'MouseClick')
+        self.store = create_store()
+
+    def time_record_mouse_move(self):
+        store = self.store
+        for move in self.moves:
+            record_mouse_move(store, move)
+
+    def time_record_key_press(self):
+        store = self.store
+        for keys in self.keys:
+            record_key_press(store, keys)
+
+    def time_record_click(self):
+        store = self.store
+        for clicks in self.clicks:
+            _record_click(store, clicks, 'Single')
+
+
+class CompressTracks(object):
+    """Divide all the track maps."""
+    params = [1, 4]
+    param_names = ['resolutions']
+
+    def setup(self, resolutions):
+        self.store = create_store()
+        data = self.store['Applications'][self.store['CurrentProgramName']]['Data']
+        for i in range(resolutions):
+            resolution = (RESOLUTION[0] + i, RESOLUTION[1])
+            check_resolution(data, resolution)
+            maps = data['Resolution'][resolution]
+            maps['Tracks'] += numpy.arange(resolution[0] * resolution[1], dtype='int64').reshape(maps['Tracks'].shape)
+        data['Ticks']['Tracks'] = resolution[0] * resolution[1]
+
+    def time_compress_tracks(self, resolutions):
+        compress_tracks(self.store, CONFIG['Advanced']['CompressTrackAmount'])
+
+
+class HistoryTrim(object):
+    """Trim an oversized history down to the configured length."""
+    number = 1
+    repeat = 10
+
+    def setup(self):
+        self.store = create_store()
+        self.length = CONFIG['Main']['HistoryLength'] * UPDATES_PER_SECOND
+        history = self.store['Applications'][self.store['CurrentProgramName']]['Data']['HistoryAnimation']['Tracks']
+        del history[:]
+
+        #Spread twice the allowed length over a few resolution changes
+        positions = [(i % RESOLUTION[0], i % RESOLUTION[1]) for i in range(self.length * 2 // 8)]
+        for _ in range(8):
+            history.append([RESOLUTION] + positions)
+
+    def time_history_trim(self):
+        history_trim(self.store, self.length)
+
+
+class BackgroundProcess(object):
+    """End to end processing of frames sent from the tracking loop.
+    The queue is processed with an empty store, as starting the background process
+    would load the real profiles and recover any journals left in the data folder.
+    """
+    params = sorted(WORKLOADS)
+    param_names = ['workload']
+    number = 1
+    repeat = 5
+    timeout = 300
+
+    def setup(self, workload):
+        self.config = ConfigOverride(Save={'Journal': False}).__enter__()
+        self.frames = create_frames(FRAMES, **WORKLOADS[workload])
+        self.store = create_store()
+        self._fill_queue()
+
+    def teardown(self, workload):
+        self.config.__exit__()
+
+    def _fill_queue(self):
+        self.q_recv = queue.Queue()
+        self.q_send = queue.Queue()
+        feed_queue(self.q_recv, self.frames)
+        self.q_recv.put({'Quit': True})
+
+    def time_background_process(self, workload):
+        process_queue(self.store, self.q_recv, self.q_send)
+
+    def track_background_process_frames_per_second(self, workload):
+        start = time.time()
+        process_queue(self.store, self.q_recv, self.q_send)
+        return len(self.frames) / (time.time() - start)
+    track_background_process_frames_per_second.unit = 'frames/s'
+
+    def time_replay(self, workload):
+        ReplayEngine(self.store).replay(self.frames)
+
+    def track_replay_frames_per_second(self, workload):
+        engine = ReplayEngine(self.store)
+        start = time.time()
+        engine.replay(self.frames)
+        return len(self.frames) / (time.time() - start)
+    track_replay_frames_per_second.unit = 'frames/s'
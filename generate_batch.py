@@ -0,0 +1,74 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Render images for multiple profiles without any user input
+#Example: generate_batch.py "*" --types tracks,clicks --colours tracks=Citrus,Ice --jobs 2 --memory 4096
+
+from __future__ import absolute_import, division
+
+import argparse
+import sys
+from multiprocessing import freeze_support
+
+from mousetracks.image.batch import RENDER_TYPES, render_profiles
+
+
+def parse_colours(values, render_types):
+    """Read the colour maps for each render type.
+    Each value is either "type=map,map" or "map,map" to use for every type.
+    """
+    colour_maps = {render_type: [] for render_type in render_types}
+    for value in values or []:
+        if '=' in value:
+            render_type, value = value.split('=', 1)
+            selected = [render_type.strip().lower()]
+        else:
+            selected = render_types
+        for render_type in selected:
+            if render_type not in colour_maps:
+                raise ValueError('colour maps given for unselected render type: {}'.format(render_type))
+            colour_maps[render_type] += [colour_map.strip() for colour_map in value.split(',') if colour_map.strip()]
+    return [(render_type, colour_maps[render_type] or None) for render_type in render_types]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Render images for multiple profiles.')
+    parser.add_argument('profiles', nargs='*', help='profile names, which may contain wildcards (default: all)')
+    parser.add_argument('-t', '--types', default='tracks,clicks',
+                        help='comma separated render types: {} (default: %(default)s)'.format(', '.join(RENDER_TYPES)))
+    parser.add_argument('-c', '--colours', action='append',
+                        help='colour maps to use, either "map,map" or "type=map,map" (default: from the config, or a preset for each type)')
+    parser.add_argument('-o', '--output', help='folder to save images to, such as "Images/[Name]" (default: from the config)')
+    parser.add_argument('-f', '--file-types', help='comma separated image types to save (default: from the config)')
+    parser.add_argument('-s', '--session', action='store_true', help='only render the last session')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of profiles to render at once (default: %(default)s)')
+    parser.add_argument('-m', '--memory', type=int, help='estimated memory limit for all running jobs in MB')
+    parser.add_argument('-r', '--report', default='-', help='file to write the JSON progress report to (default: stdout)')
+    args = parser.parse_args(args)
+
+    render_types = [render_type.strip().lower() for render_type in args.types.split(',') if render_type.strip()]
+    invalid = [render_type for render_type in render_types if render_type not in RENDER_TYPES]
+    if invalid:
+        parser.error('invalid render types: {}'.format(', '.join(invalid)))
+    try:
+        render_types = parse_colours(args.colours, render_types)
+    except ValueError as error:
+        parser.error(str(error))
+    file_types = args.file_types.split(',') if args.file_types else None
+    memory_limit = args.memory * 1024 * 1024 if args.memory else None
+
+    #Only show the render messages if they won't mix with the report
+    report = sys.stdout if args.report == '-' else open(args.report, 'w')
+    try:
+        results = render_profiles(args.profiles, render_types, output=args.output, file_types=file_types,
+                                  last_session=args.session, jobs=args.jobs, memory_limit=memory_limit,
+                                  report=report, quiet=report is sys.stdout)
+    finally:
+        if report is not sys.stdout:
+            report.close()
+    return int(any(result['event'] == 'failed' for result in results))
+
+
+if __name__ == '__main__':
+    freeze_support()
+    sys.exit(main())
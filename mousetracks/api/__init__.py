@@ -15,13 +15,28 @@ from ..config.language import LANGUAGE
 from ..notify import NOTIFY
 from ..utils.sockets import *
 from ..utils.internet import send_request
-try:
-    from .web import app
-except ImportError as e:
-    CONFIG['API']['WebServer'] = False
-    CONFIG['API']['WebServer'].lock = True
-    NOTIFY(LANGUAGE.strings['Misc']['ImportFailed'], MODULE='web server', REASON=e)
-    app = None
+
+
+_WEB_APP = {}
+
+
+def load_web_app():
+    """Import the web server the first time it's needed, as Flask is slow to load.
+    Returns None and disables the web server if it can't be imported.
+    """
+    try:
+        return _WEB_APP['App']
+    except KeyError:
+        pass
+    try:
+        from .web import app
+    except ImportError as e:
+        CONFIG['API']['WebServer'] = False
+        CONFIG['API']['WebServer'].lock = True
+        NOTIFY(LANGUAGE.strings['Misc']['ImportFailed'], MODULE='web server', REASON=e)
+        app = None
+    _WEB_APP['App'] = app
+    return app
 
 
 def local_message_server(q_main, port=0, close_port=False, server_secret=None, q_feedback=None):
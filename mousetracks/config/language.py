@@ -10,10 +10,12 @@ import os
 
 from . import utf8
 from .settings import CONFIG
-from ..constants import DEFAULT_LANGUAGE
-from ..misc import TextFile, get_config_file
-from ..utils.compatibility import iteritems
+from ..constants import DEFAULT_LANGUAGE, DATA_CACHE_FOLDER
+from ..misc import TextFile, format_file_path, get_config_file
+from ..utils import ini
+from ..utils.compatibility import iteritems, pickle
 from ..utils.ini import Config
+from ..utils.os import create_folder, hide_file, remove_file, rename_file
 
 
 LANGUAGE_FOLDER = 'language'
@@ -26,6 +28,13 @@ STRINGS_FOLDER = 'strings'
 
 LANGUAGE_BASE_PATH = get_config_file(LANGUAGE_FOLDER)
 
+#The parsed language is saved here, and only read again from the ini files when one of them changes
+#Importing the data folder from files.py would load a lot more at startup, so it is found from the config
+LANGUAGE_CACHE_FILE = '{}/{}/language.pickle'.format(format_file_path(CONFIG['Paths']['Data']), DATA_CACHE_FOLDER)
+
+#Use the same protocol on Python 2 and 3, so they can share the cache
+LANGUAGE_CACHE_PROTOCOL = min(pickle.HIGHEST_PROTOCOL, 2)
+
 LANGUAGE_DEFAULTS = {
     'Words': {
         '__priority__': 1,
@@ -282,6 +291,19 @@ LANGUAGE_DEFAULTS = {
             'value': 'Finished saving.',
             'level': 2
         },
+        'JournalReplayStart': {
+            'value': 'Recovering unsaved data from the previous session...',
+            'level': 2
+        },
+        'JournalReplayEnd': {
+            '__info__': 'Valid Replacements: [NUMBER] [COMMANDS-PLURAL]',
+            'value': 'Recovered [NUMBER] [COMMANDS-PLURAL] of unsaved data.',
+            'level': 2
+        },
+        'JournalReplayFail': {
+            'value': 'Unable to recover unsaved data from the previous session.',
+            'level': 2
+        },
         'SaveIncompleteNoRetry': {
             'value': 'Unable to save file, make sure this has the correct permissions.',
             'level': 2
@@ -427,7 +449,8 @@ LANGUAGE_DEFAULTS = {
         'Speed': 'Acceleration',
         'Strokes': 'Brush Strokes',
         'Clicks': 'Click Heatmap',
-        'Keyboard': 'Keyboard Heatmap'
+        'Keyboard': 'Keyboard Heatmap',
+        'Thumbsticks': 'Thumbstick Heatmap'
     },
     'GenerationInput': {
         'KeyboardNoUse': {
@@ -1527,6 +1550,53 @@ def get_language_paths(*languages):
     return paths
 
 
+def _file_info(path):
+    """Get the modified time and size of a file, to tell if it has changed."""
+    try:
+        stat = os.stat(path)
+    except (IOError, OSError):
+        return None
+    return (stat.st_mtime, stat.st_size)
+
+
+def _load_cache(key):
+    """Load the parsed language if it was saved with the same key."""
+    try:
+        with open(LANGUAGE_CACHE_FILE, 'rb') as f:
+            cache_key, result = pickle.load(f)
+    except (IOError, OSError):
+        return None
+
+    #The file was only partly written or is from an incompatible version
+    except Exception:
+        remove_file(LANGUAGE_CACHE_FILE)
+        return None
+
+    if cache_key != key:
+        return None
+    return result
+
+
+def _save_cache(key, result):
+    """Save the parsed language, writing to a temporary file first so an incomplete file is never loaded."""
+    if create_folder(LANGUAGE_CACHE_FILE, is_file=True):
+        hide_file(os.path.dirname(LANGUAGE_CACHE_FILE))
+
+    #Several processes may start at once, so each needs its own temporary file
+    temp_path = '{}.{}.tmp'.format(LANGUAGE_CACHE_FILE, os.getpid())
+    try:
+        with open(temp_path, 'wb') as f:
+            pickle.dump((key, result), f, protocol=LANGUAGE_CACHE_PROTOCOL)
+    except (IOError, OSError):
+        remove_file(temp_path)
+        return False
+    remove_file(LANGUAGE_CACHE_FILE)
+    if not rename_file(temp_path, LANGUAGE_CACHE_FILE):
+        remove_file(temp_path)
+        return False
+    return True
+
+
 class Language(object):
     def __init__(self, local_language=None):
         self.local_language = local_language or CONFIG['Main']['Language']
@@ -1534,10 +1604,19 @@ class Language(object):
     
     def reload(self, local_language=None):
         self.paths = get_language_paths(local_language or CONFIG['Main']['Language'], DEFAULT_LANGUAGE)
-        self.strings = self._strings()
-        self._keys = self._keyboard_keys()
+        extended = CONFIG['GenerateKeyboard']['ExtendedKeyboard']
+
+        #Parsing takes much longer than loading, so only do it if a file has changed
+        #The defaults and parsing code are included in the sources, as they may be edited without a version change
+        sources = sorted(set(path for _, path in iteritems(self.paths['NewLinks'])) | {__file__, ini.__file__})
+        key = (bool(extended), tuple((path, _file_info(path)) for path in sources))
+        result = _load_cache(key)
+        if result is None:
+            result = (self._strings(), self._keyboard_keys(), self._keyboard_layout(extended))
+            _save_cache(key, result)
+
+        self.strings, self._keys, self.keyboard_layout = result
         self.keys = self._keys['Keys']
-        self.keyboard_layout = self._keyboard_layout(CONFIG['GenerateKeyboard']['ExtendedKeyboard'])
 
     def _strings(self):
         strings = Config(LANGUAGE_DEFAULTS, default_settings={'type': str})
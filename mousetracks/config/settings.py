@@ -115,6 +115,17 @@ CONFIG_DEFAULTS = {
             'value': 5,
             'type': int,
             'min': 0
+        },
+        'Journal': {
+            '__info__': 'Keep a journal of everything recorded since the last save, so it can be recovered after a crash.',
+            'value': True,
+            'type': bool
+        },
+        'JournalSync': {
+            '__info__': 'How many seconds to wait between writing the journal to disk.',
+            'value': 5,
+            'type': int,
+            'min': 0
         }
     },
     'GenerateImages': {
@@ -167,6 +178,27 @@ CONFIG_DEFAULTS = {
             '__info__': 'Open the folder containing the image(s) once the render is complete.',
             'value': True,
             'type': bool
+        },
+        'BandHeight': {
+            '__priority__': 7,
+            '__info__': 'Render track images this many rows at a time to limit memory usage. Set to 0 to render the whole image at once.',
+            'value': 256,
+            'type': int,
+            'min': 0
+        },
+        'RenderWorkers': {
+            '__priority__': 8,
+            '__info__': 'How many threads to split rendering between. Set to 0 to use one per CPU.',
+            'value': 0,
+            'type': int,
+            'min': 0
+        },
+        'CacheSize': {
+            '__priority__': 9,
+            '__info__': 'Maximum size of the render cache in megabytes, used to skip rendering images that haven\'t changed. Set to 0 to disable.',
+            'value': 1024,
+            'type': int,
+            'min': 0
         }
     },
     'GenerateTracks': {
@@ -228,6 +260,13 @@ CONFIG_DEFAULTS = {
             'type': float,
             'min': 0
         },
+        'BlurPrecision': {
+            '__info__': 'Blur on a smaller grid where each blur is at least this many pixels wide, which is much faster. Set to 0 to blur at full resolution.',
+            '__priority__': 4,
+            'value': 8,
+            'type': int,
+            'min': 0
+        },
         '_MouseButtonLeft': {
             'value': True,
             'type': bool
@@ -292,6 +331,27 @@ CONFIG_DEFAULTS = {
             'type': float
         }
     },
+    'GenerateThumbsticks': {
+        '__priority__': 9,
+        'FileName': {
+            '__priority__': 1,
+            'value': '[[RunningTimeSeconds]]Thumbsticks - [ColourProfile]',
+            'type': str
+        },
+        'ColourProfile': {
+            '__priority__': 2,
+            'value': 'Jet',
+            'type': str,
+            'allow_empty': True
+        },
+        'Resolution': {
+            '__info__': 'Width and height of the image for each thumbstick.',
+            '__priority__': 3,
+            'value': 512,
+            'type': int,
+            'min': 16
+        }
+    },
     'GenerateCSV': {
         '__info__': 'This is for anyone who may want to use the recorded data in their own projects.',
         '__priority__': 10,
@@ -310,6 +370,32 @@ CONFIG_DEFAULTS = {
             'value': '[[RunningTimeSeconds]] Keyboard',
             'type': str
         },
+        'FileNameGamepad': {
+            '__priority__': 1,
+            'value': '[[RunningTimeSeconds]] Gamepad',
+            'type': str
+        },
+        'FileNameThumbsticks': {
+            '__priority__': 1,
+            'value': '[[RunningTimeSeconds]] Thumbstick [Axis]',
+            'type': str
+        },
+        'FileNameTriggers': {
+            '__priority__': 1,
+            'value': '[[RunningTimeSeconds]] Trigger [Axis]',
+            'type': str
+        },
+        'FileType': {
+            '__priority__': 2,
+            '__info__': 'Choose how to export the maps.'
+                        ' csv is a grid of every value, sparse is a csv of "x,y,value" for recorded points only,'
+                        ' npz is the raw arrays, and columns is an npz of separate x, y and value arrays.'
+                        ' Key and button stats are always exported as a csv table.',
+            'value': 'csv',
+            'type': str,
+            'case_sensitive': False,
+            'valid': ('csv', 'sparse', 'npz', 'columns')
+        },
         'MinimumPoints': {
             '__info__': 'Files will not be generated for any resolutions that have fewer points than this recorded.',
             'value': 50,
@@ -326,6 +412,15 @@ CONFIG_DEFAULTS = {
         '_GenerateKeyboard': {
             'value': True,
             'type': bool
+        },
+        '_GenerateGamepad': {
+            'value': True,
+            'type': bool
+        },
+        '_GamepadAxis': {
+            'value': '',
+            'type': str,
+            'allow_empty': True
         }
     },
     'API': {
@@ -363,6 +458,12 @@ CONFIG_DEFAULTS = {
             'min': 0,
             'max': 1
         },
+        'HeatmapRangeSample': {
+            '__info__': 'Only check every nth pixel when finding the heatmap range, which is faster for large images.',
+            'value': 1,
+            'type': int,
+            'min': 1
+        },
         'CompressTrackMax': {
             '__info__': 'Maximum number of of ticks before compression happens. Set to 0 to disable.',
             'value': 425000,
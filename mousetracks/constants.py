@@ -24,4 +24,6 @@ TRACKING_IGNORE = '<ignore>'
 TRACKING_WILDCARD = '<*>'
 
 KEY_STATS = set(ord(i) for i in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890')
-KEY_STATS.update([8, 32, 188, 190]) #backspace, space, comma, period
\ No newline at end of file
+KEY_STATS.update([8, 32, 188, 190]) #backspace, space, comma, period
+
+DATA_CACHE_FOLDER = '.cache'
@@ -7,7 +7,7 @@ Source: https://github.com/Peter92/MouseTracks
 from __future__ import division
 
 from ..files import LoadData, save_data
-from ..image import RenderImage
+from ..image.main import RenderImage
 from ..utils.compatibility import Message, range, input
 from ..utils.input import yes_or_no
 from ..utils.maths import round_int
@@ -15,7 +15,8 @@ from tempfile import gettempdir
 
 from .utils import numpy
 from .config.settings import CONFIG
-from .constants import DEFAULT_NAME, MAX_INT
+from .constants import DEFAULT_NAME, MAX_INT, DATA_CACHE_FOLDER
+from .gamepad import THUMBSTICKS
 from .misc import CustomOpen, format_file_path, format_name
 from .utils.compatibility import PYTHON_VERSION, ModuleNotFoundError, BytesIO, unicode, pickle, iteritems, BytesIO
 from .utils.os import remove_file, rename_file, create_folder, hide_file, get_modified_time, list_directory, file_exists, get_file_size
@@ -89,6 +90,20 @@ def _get_paths(program_name):
             'BackupFolder': backup_folder, 'TempFolder': temp_folder, 'CorruptedFolder': corrupted_folder}
 
 
+def get_file_state(profile_name):
+    """Get the path, modified time and size of a saved profile, or None if it doesn't exist.
+    This changes every time the profile is saved, so can be used to check for new data without loading it.
+    """
+    path = _get_paths(profile_name)['Main']
+    modified = get_modified_time(path)
+    if modified is None:
+        return None
+    try:
+        return (path, modified, get_file_size(path))
+    except (IOError, OSError):
+        return None
+
+
 def prepare_file(data, legacy=False):
     """Prepare data for saving."""
     data['Time']['Modified'] = time.time()
@@ -179,6 +194,9 @@ def load_data(profile_name=None, _reset_sessions=True, _update_metadata=True, _c
                 for path in metadata_files:
                     metadata[path[9:-4]] = f.read(path)
 
+                #Get the uncompressed size of the maps without loading them
+                metadata['mapsize'] = sum(info.file_size for info in f.zip.infolist() if info.filename.startswith('maps/'))
+
             #Use inbuilt OS way to get modified time if no metadata
             if 'modified' not in metadata:
                 metadata['modified'] = get_modified_time(paths['Main'])
@@ -326,6 +344,22 @@ class LoadData(dict):
         return top_resolution, (int(min_value), int(max_value)), result
                 
         
+    def get_thumbsticks(self, session=False):
+        """Return dictionary of thumbstick histograms, or None if there is no data."""
+        axis = self['Gamepad']['Session' if session else 'All']['Axis']
+        result = {}
+        for thumbstick in THUMBSTICKS:
+            try:
+                histogram = axis[thumbstick]
+            except KeyError:
+                continue
+            if histogram.any():
+                result[thumbstick] = histogram
+
+        if not result:
+            return None
+        return result
+
     def get_keys(self):
         raise NotImplementedError
         
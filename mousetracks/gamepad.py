@@ -0,0 +1,101 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Fixed size histograms for recording gamepad axis positions
+
+from __future__ import absolute_import, division
+
+from .utils import numpy
+from .utils.compatibility import iteritems
+
+
+AXIS_BINS = 256
+
+AXIS_RANGE = 65536
+
+#Both axes of a thumbstick are recorded together, so the position can be rendered
+THUMBSTICKS = {
+    'l_thumb': ('l_thumb_x', 'l_thumb_y'),
+    'r_thumb': ('r_thumb_x', 'r_thumb_y'),
+}
+
+TRIGGERS = ('left_trigger', 'right_trigger')
+
+#Thumbsticks are signed shorts, triggers are scaled up to the same range but unsigned
+_AXIS_OFFSET = {
+    'l_thumb_x': 32768,
+    'l_thumb_y': 32768,
+    'r_thumb_x': 32768,
+    'r_thumb_y': 32768,
+    'left_trigger': 0,
+    'right_trigger': 0,
+}
+
+
+def create_axis_histograms():
+    """Create an empty set of histograms for every axis.
+    Thumbsticks are stored as a 2D occupancy grid indexed by [y][x].
+    """
+    histograms = {}
+    for thumbstick in THUMBSTICKS:
+        histograms[thumbstick] = numpy.array((AXIS_BINS, AXIS_BINS), create=True, dtype='int64')
+    for trigger in TRIGGERS:
+        histograms[trigger] = numpy.array((AXIS_BINS,), create=True, dtype='int64')
+    return histograms
+
+
+def axis_to_bin(axis, values):
+    """Convert raw axis values into histogram bin indexes."""
+    offset = _AXIS_OFFSET.get(axis, 0)
+    indexes = (numpy.array(values, dtype='int64') + offset) * AXIS_BINS // AXIS_RANGE
+    return numpy.clip(indexes, 0, AXIS_BINS - 1)
+
+
+def _axis_bin(axis, value):
+    """Convert a single raw axis value into a histogram bin index.
+    This gives the same result as axis_to_bin, without the overhead of creating an array.
+    """
+    index = (int(value) + _AXIS_OFFSET.get(axis, 0)) * AXIS_BINS // AXIS_RANGE
+    return min(max(index, 0), AXIS_BINS - 1)
+
+
+def record_axis_histograms(histograms, axis_updates):
+    """Add a batch of axis updates to the histograms.
+    Each update is a dict of {axis: value}, as sent from the gamepad once per tick.
+    This runs every tick while a gamepad is connected, so only the bins that were hit are updated.
+    """
+    for axis_update in axis_updates:
+
+        #Only count thumbstick positions where both axes were sent together
+        for thumbstick, (axis_x, axis_y) in iteritems(THUMBSTICKS):
+            try:
+                x, y = axis_update[axis_x], axis_update[axis_y]
+            except KeyError:
+                continue
+            histograms[thumbstick][_axis_bin(axis_y, y), _axis_bin(axis_x, x)] += 1
+
+        for trigger in TRIGGERS:
+            try:
+                value = axis_update[trigger]
+            except KeyError:
+                continue
+            histograms[trigger][_axis_bin(trigger, value)] += 1
+
+
+def convert_axis_dict(axis_dict):
+    """Convert the old {axis: {value: count}} format to histograms.
+    The thumbstick axes were recorded separately so cannot be paired up again,
+    meaning only the triggers can be kept.
+    """
+    histograms = create_axis_histograms()
+    for trigger in TRIGGERS:
+        try:
+            counts = axis_dict[trigger]
+        except KeyError:
+            continue
+        if not counts:
+            continue
+        indexes = axis_to_bin(trigger, list(counts.keys()))
+        weights = numpy.array(list(counts.values()), dtype='int64')
+        histograms[trigger] += numpy.bincount(indexes, AXIS_BINS, weights=weights, dtype='int64')
+    return histograms
@@ -12,7 +12,6 @@ import sys
 import time
 
 from .colours import get_map_matches, calculate_colour_map
-from .main import RenderImage
 from ..applications import RunningApplications, AppList
 from ..constants import DEFAULT_NAME, UPDATES_PER_SECOND
 from ..config.settings import CONFIG
@@ -247,6 +246,8 @@ def _user_generate():
         Message(LANGUAGE.strings['Misc']['ProgramExit'])
         return
 
+    #The image libraries are only loaded once a profile is chosen
+    from .main import RenderImage
     Message(LANGUAGE.strings['Misc']['ProfileLoad'].format_custom(PROFILE=profile))
     render = RenderImage(profile)
 
@@ -256,7 +257,8 @@ def _user_generate():
         ['click heatmap', True, LANGUAGE.strings['RenderTypes']['Clicks'], []],
         ['keyboard heatmap', True, LANGUAGE.strings['RenderTypes']['Keyboard'], []],
         ['acceleration', False, LANGUAGE.strings['RenderTypes']['Speed'], []],
-        ['brush strokes', False, LANGUAGE.strings['RenderTypes']['Strokes'], []]
+        ['brush strokes', False, LANGUAGE.strings['RenderTypes']['Strokes'], []],
+        ['thumbsticks', False, LANGUAGE.strings['RenderTypes']['Thumbsticks'], []]
     ]
 
     #Set keyboard default to False if not tracked
@@ -414,6 +416,31 @@ def _user_generate():
         else:
             render_types[4][3].append(CONFIG['GenerateStrokes']['ColourProfile'])
 
+    #Generate thumbsticks
+    if render_types[5][1]:
+        Message(LANGUAGE.strings['GenerationInput']['RenderOptions'].format_custom(RENDER_TYPE=render_types[5][0]))
+
+        #Select colour map
+        try:
+            colour_map_gen = calculate_colour_map(CONFIG['GenerateThumbsticks']['ColourProfile'])
+        except ValueError:
+            Message(LANGUAGE.strings['GenerationInput']['ColourNotSet'])
+            map_options = [[colours, False, colours] for colours in sorted(get_map_matches(clicks=True))]
+
+            while not render_types[5][3]:
+                colour_maps = multi_select(map_options)
+                for colour_map in colour_maps:
+                    try:
+                        calculate_colour_map(colour_map)
+                    except ValueError:
+                        Message(LANGUAGE.strings['GenerationInput']['ColourMapInvalid'].format_custom(COLOUR_MAP=colour_map))
+                    else:
+                        render_types[5][3].append(colour_map)
+                if not render_types[5][3]:
+                    Message(LANGUAGE.strings['GenerationInput']['ColourMapNotSet'])
+        else:
+            render_types[5][3].append(CONFIG['GenerateThumbsticks']['ColourProfile'])
+
 
     #Calculate session length
     last_session_start = render.data['Ticks']['Session']['Total']
@@ -437,31 +464,9 @@ def _user_generate():
                 break
     
     #Render the images
-    if render_types[0][1]:
-        for colour_map in render_types[0][3]:
-            CONFIG['GenerateTracks']['ColourProfile'] = colour_map
-            render.tracks(session)
-            Message()
-    if render_types[1][1]:
-        for colour_map in render_types[1][3]:
-            CONFIG['GenerateHeatmap']['ColourProfile'] = colour_map
-            render.clicks(session)
-            Message()
-    if render_types[2][1]:
-        for colour_map in render_types[2][3]:
-            CONFIG['GenerateKeyboard']['ColourProfile'] = colour_map
-            render.keyboard(session)
-            Message()
-    if render_types[3][1]:
-        for colour_map in render_types[3][3]:
-            CONFIG['GenerateSpeed']['ColourProfile'] = colour_map
-            render.speed(session)
-            Message()
-    if render_types[4][1]:
-        for colour_map in render_types[4][3]:
-            CONFIG['GenerateStrokes']['ColourProfile'] = colour_map
-            render.strokes(session)
-            Message()
+    render_methods = ('tracks', 'clicks', 'keyboard', 'speed', 'strokes', 'thumbsticks')
+    render.batch([(method, colour_maps) for method, (_, enabled, _, colour_maps) in zip(render_methods, render_types) if enabled],
+                 last_session=session)
         
     #Open folder
     if CONFIG['GenerateImages']['OpenOnFinish']:
@@ -1,143 +1,161 @@
 """This is part of the Mouse Tracks Python application.
 Source: https://github.com/Peter92/MouseTracks
 """
-#Use track history to make an image sequence
+#Use track history to make an animation
+#The history is replayed in chunks, and each frame only redraws the bands of rows that changed
+
+from __future__ import absolute_import, division
+
+from .calculate import calculate_resolution
+from .colours import calculate_colour_map
+from .incremental import IncrementalTracks
+from .main import RESIZE_FILTER
+from .misc import save_image_to_folder
+from .parallel import render_workers
+from ..config.settings import CONFIG
+from ..constants import DEFAULT_NAME
+from ..files import LoadData
+from ..track.background import _create_store
+from ..track.replay import ReplayEngine, frames_from_history
+from ..utils.compatibility import Message
+from ..utils.os import create_folder
 
-from __future__ import division
 
-from .main import RenderImage
-from ..utils.compatibility import range
-from ..files import LoadData
-from ..utils.maths import calculate_line
-from ..track.background import check_resolution, monitor_offset
+#File types that hold every frame in a single file
+ANIMATED_FILE_TYPES = ('gif', 'apng', 'webp')
 
 
 class TrackHistory(object):
-    """Turn track history into an image sequence for animation.
+    """Turn track history into an animation.
 
-    TODO: Improve render options:
-        Get filename from config
-        Auto select sequence number
-        Ask for colour profile
-        Auto select output resolution (since it can change)
+    The history is replayed into an empty profile a chunk of movements at a time,
+    with the lines calculated in batches by the replay engine. Each frame is then
+    an incremental update of the previous one, so only rows with new movement are
+    upscaled and coloured again.
+
+    The colour range is fixed to the length of the history, otherwise every pixel
+    would change colour on every frame. The output resolution is also fixed,
+    based on every resolution in the profile.
     """
-    _CACHE = {'Steps': {}}
     def __init__(self, data):
         self.data = data
-        self._track_history = [tuple(i) for i in self.data['HistoryAnimation']['Tracks']]
-        self._counts = [len(i)-1 for i in self.data['HistoryAnimation']['Tracks']]
-        self._total = sum(self._counts)
-        self.reset()
-    
-    def _step_range(self, steps):
-        try:
-            return self._CACHE['Steps'][steps]
-        except KeyError:
-            self._CACHE['Steps'][steps] = list(range(steps))
-            return self._CACHE['Steps'][steps]
-
-    def _next_resolution(self):
-        try:
-            self._index += 1
-        except AttributeError:
-            self._index = 0
-        self._current = 0
-
-        try:
-            new_resolution = self._track_history[self._index][0]
-        except IndexError:
-            return False
-        
-        self._resolution['Current'] = new_resolution
-        return True
-
-    def _step(self):
-        """Step forward a single frame."""
-        coordinate = self._track_history[self._index][self._current + 1]
-
-        #Calculate line between points
-        if self._last_pos is None:
-            mouse_coordinates = [coordinate]
-        else:
-            mouse_coordinates = [self._last_pos] + calculate_line(self._last_pos, coordinate) + [coordinate]
-        self._last_pos = coordinate
-
-        #Add to data
-        for (x, y) in mouse_coordinates:
-            
-            try:
-                try:
-                    resolution, (x_offset, y_offset) = monitor_offset((x, y), self._resolution['Current'])
-                except ValueError:
-                    #TODO: Application resolution requires [var[0]], the other types don't, need to edit all of stored history to fix
-                    resolution, (x_offset, y_offset) = monitor_offset((x, y), [self._resolution['Current'][0]])
-            
-            #Mouse outside bounds
-            except TypeError:
-                continue
-
-            if resolution not in self._resolution['All']:
-                self._resolution['All'].add(resolution)
-                check_resolution(self._data, resolution)
-                
-            self._data['Resolution'][resolution]['Tracks'][y-y_offset][x-x_offset] = self._count
-        
-        self._current += 1
-        self._count += 1
-
-    def step(self, steps, render_file=False):
-        """Step forward any number of steps.
-        Uses recursion to handle overflow if too many steps.
-        """
-        print('Current history index: {}/{}'.format(self._count, self._total))
-        distance_to_resolution = self._counts[self._index] - self._current
-
-        #All steps are within the current resolution
-        if distance_to_resolution > steps:
-            for step in self._step_range(steps):
-                self._step()
-        
-        #Resolution changes at some point
+        self._history = data['HistoryAnimation']['Tracks']
+        self.total = sum(max(0, len(record) - 1) for record in self._history)
+
+        track_data = data.get_tracks()
+        if track_data is None:
+            self.output_resolution = self.upscale_resolution = None
         else:
-            steps, remaining_steps = distance_to_resolution, steps - distance_to_resolution
-            for step in self._step_range(steps):
-                self._step()
-            if self._next_resolution():
-                self.step(remaining_steps)
-        
-        #Render image
-        if render_file:
-            self._render('{}.{}.jpg'.format(render_file, int(self._count//steps)))
+            top_resolution, _, tracks = track_data
+            self.output_resolution, self.upscale_resolution = calculate_resolution(tracks.keys(), top_resolution)
+        self.reset()
 
     def reset(self):
-        """Set the animation back to frame 1 and reset any variables."""
-        self._data = LoadData(empty=True)
-        self._current = self._count = 0
-        self._last_pos = None
-        self._resolution = {'All': set(),
-                            'Current': None}
-        self._next_resolution()
-    
-    def _render(self, file_name):
-        #TODO: Ask user for colour map, automatically do filename.[n].[filetype] from config, divide or multiply [n]
-        RenderImage(self._data).tracks(file_name=file_name)
+        """Set the animation back to frame 1."""
+        store = _create_store(new_sessions=False)
+        store['Data'][None] = LoadData(empty=True)
+        store['Applications'][DEFAULT_NAME]['Data'] = LoadData(empty=True)
+        self._engine = ReplayEngine(store)
+        self._engine.history_length = 0
+        self._frames = frames_from_history(self._history)
+        self._incremental = IncrementalTracks()
+        self.count = 0
 
     @property
     def remaining(self):
         """How many steps are remaining until completion.
         Can be used in a while loop.
         """
-        return self._total - self._count
+        return self.total - self.count
+
+    def step(self, steps):
+        """Replay the next number of mouse movements.
+        Returns how many were replayed, which will be lower at the end of the history.
+        """
+        replayed = 0
+        if steps > 0:
+            for frame in self._frames:
+                self._engine.process(frame)
+                if 'MouseMove' in frame:
+                    replayed += 1
+                    if replayed >= steps:
+                        break
+        self._engine.flush()
+        self.count += replayed
+        return replayed
+
+    def render(self, colour_map=None):
+        """Render the current frame, reusing the previous frame where possible."""
+        data = self._engine.data
+        track_data = data.get_tracks()
+        if track_data is None or self.upscale_resolution is None:
+            return None
+        if colour_map is None:
+            colour_map = calculate_colour_map(CONFIG['GenerateTracks']['ColourProfile'])
+
+        top_resolution, _, tracks = track_data
+        image = self._incremental.render((top_resolution, (0, max(1, self.total)), tracks), data['Ticks']['Tracks'],
+                                         colour_map, self.upscale_resolution, CONFIG['GenerateImages']['BandHeight'],
+                                         workers=render_workers())
+        if image.size != self.output_resolution:
+            image = image.resize(self.output_resolution, RESIZE_FILTER)
+        return image
+
+    def frames(self, steps, colour_map=None):
+        """Generate every frame of the animation, moving forward a number of steps between each."""
+        while self.remaining and self.step(steps):
+            Message('Current history index: {}/{}'.format(self.count, self.total))
+            image = self.render(colour_map)
+            if image is not None:
+                yield image
+
+
+def save_animation(frames, file_path, duration=50):
+    """Save frames as an animation or image sequence.
+    Returns the number of frames saved.
+
+    Animated file types are built by Pillow, which keeps each frame until the file is written.
+    GIF frames are reduced to a palette as they arrive, but APNG and WebP frames are kept in full.
+    Anything else is saved as an image sequence with the frame number before the extension,
+    such as "history.0.png", so only one frame is kept in memory at a time.
+    """
+    name, extension = file_path.rsplit('.', 1)
+    if extension.lower() not in ANIMATED_FILE_TYPES:
+        count = 0
+        for i, frame in enumerate(frames):
+            save_image_to_folder(frame, '{}.{}.{}'.format(name, i, extension))
+            count += 1
+        return count
+
+    frames = iter(frames)
+    try:
+        first = next(frames)
+    except StopIteration:
+        return 0
+
+    #Convert the later frames while saving, as Pillow only needs them one at a time
+    saved = [1]
+    def convert(frames):
+        for frame in frames:
+            saved[0] += 1
+            yield frame.convert('RGB')
+
+    append_images = convert(frames)
+
+    #Only the GIF writer reads the frames a single time
+    if extension.lower() != 'gif':
+        append_images = list(append_images)
+
+    create_folder(file_path)
+    save_format = 'PNG' if extension.lower() == 'apng' else None
+    first.convert('RGB').save(file_path, format=save_format, save_all=True, append_images=append_images,
+                              duration=duration, loop=0)
+    return saved[0]
 
 
 #Example use
-if __name__ == '__main__' or True:
-    data = LoadData()
-    track_history = TrackHistory(data)
-
-    from ..config.settings import CONFIG
+if __name__ == '__main__':
     if not CONFIG['GenerateTracks']['ColourProfile']:
         CONFIG['GenerateTracks']['ColourProfile'] = 'Citrus'
-
-    while track_history.remaining:
-        track_history.step(50, render_file='D:/Peter/Documents/Github/MouseTracks/history/image')
\ No newline at end of file
+    track_history = TrackHistory(LoadData())
+    save_animation(track_history.frames(50), 'history.gif')
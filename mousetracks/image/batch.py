@@ -0,0 +1,229 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Render multiple profiles without any user input
+#Each profile is rendered in its own process, as the render settings are stored in the global config
+
+from __future__ import absolute_import, division
+
+import fnmatch
+import json
+import os
+import sys
+import time
+import traceback
+from multiprocessing import Process, Queue
+
+from .parallel import render_workers
+from ..applications import AppList
+from ..config.settings import CONFIG
+from ..constants import DEFAULT_NAME
+from ..files import get_data_files
+from ..misc import format_name
+from ..utils.compatibility import range, iteritems, queue
+
+
+RENDER_TYPES = ('tracks', 'clicks', 'keyboard', 'speed', 'strokes', 'thumbsticks')
+
+#Colour maps to use when none are given and the config doesn't have a valid one
+#Most of the config values are empty by default, as the user is normally asked
+DEFAULT_COLOUR_MAPS = {
+    'tracks': 'Citrus',
+    'clicks': 'Jet',
+    'keyboard': 'Aqua',
+    'speed': 'Demon',
+    'strokes': 'Ice',
+    'thumbsticks': 'Jet',
+}
+
+#Rough memory use of a render, based on the uncompressed size of the maps
+#Maps are only loaded when needed, and the base amount covers the interpreter and the upscaled images
+JOB_MEMORY_BASE = 256 * 1024 * 1024
+
+JOB_MEMORY_MULTIPLIER = 1
+
+#Assumed ratio of uncompressed to compressed size for profiles without map information
+JOB_COMPRESSION_RATIO = 10
+
+#How often to check for finished or crashed jobs
+POLL_INTERVAL = 0.5
+
+
+def find_profiles(patterns=None):
+    """Get the saved profiles matching any of the patterns.
+    Patterns may contain wildcards, and are matched against both the program and file names.
+    Returns a dictionary of profile names and their metadata.
+    """
+    program_names = {format_name(DEFAULT_NAME): DEFAULT_NAME}
+    for program_name in AppList().names:
+        program_names[format_name(program_name)] = program_name
+
+    result = {}
+    for file_name, metadata in iteritems(get_data_files() or {}):
+        profile = program_names.get(file_name, file_name)
+        if not patterns or any(fnmatch.fnmatch(name.lower(), pattern.lower())
+                               for pattern in patterns for name in (profile, file_name)):
+            result[profile] = metadata
+    return result
+
+
+def estimate_memory(metadata):
+    """Estimate how much memory rendering a profile needs, in bytes."""
+    if metadata is None:
+        return JOB_MEMORY_BASE
+    try:
+        map_size = int(metadata['mapsize'])
+    except (KeyError, ValueError):
+        map_size = int(metadata.get('filesize', 0)) * JOB_COMPRESSION_RATIO
+    return JOB_MEMORY_BASE + map_size * JOB_MEMORY_MULTIPLIER
+
+
+class RenderJob(object):
+    """Everything needed to render a single profile.
+
+    Parameters:
+        profile (str): Name of the profile.
+        render_types (list): Each type of render, with an optional list of colour maps.
+            For example [('tracks', ['Citrus', 'Ice']), ('clicks', None)].
+            If no colour maps are given, the ones in the config are used,
+            or DEFAULT_COLOUR_MAPS if they are not set.
+        output (str/None): Folder to save images to, which may contain any image name variables.
+        file_types (list/None): Types of image to save.
+        last_session (bool): If only the last session should be rendered.
+        memory (int/None): Estimated memory required, or None to calculate it.
+    """
+    def __init__(self, profile, render_types, output=None, file_types=None, last_session=False, memory=None):
+        self.profile = profile
+        self.render_types = [(render_type, list(colour_maps) if colour_maps else None) for render_type, colour_maps in render_types]
+        self.output = output
+        self.file_types = file_types
+        self.last_session = last_session
+        self.memory = memory if memory is not None else JOB_MEMORY_BASE
+
+    def run(self, render_workers=None):
+        """Render every image for the profile."""
+        from .colours import calculate_colour_map
+        from .main import RENDER_CONFIG_HEADINGS, RenderImage
+
+        if self.output is not None:
+            CONFIG['Paths']['Images'] = self.output
+        if render_workers is not None:
+            CONFIG['GenerateImages']['RenderWorkers'] = render_workers
+
+        render_types = []
+        for render_type, colour_maps in self.render_types:
+            if colour_maps is None:
+                colour_map = CONFIG[RENDER_CONFIG_HEADINGS[render_type]]['ColourProfile']
+                try:
+                    calculate_colour_map(colour_map)
+                except ValueError:
+                    colour_map = DEFAULT_COLOUR_MAPS[render_type]
+                colour_maps = [colour_map]
+            render_types.append((render_type, colour_maps))
+
+        RenderImage(self.profile).batch(render_types, last_session=self.last_session, file_types=self.file_types)
+
+
+def _run_job(index, job, results, render_workers, quiet):
+    """Run a job in a separate process and send back the result."""
+    if quiet:
+        sys.stdout = open(os.devnull, 'w')
+    start = time.time()
+    try:
+        job.run(render_workers)
+    except Exception:
+        results.put((index, time.time() - start, traceback.format_exc().strip()))
+    else:
+        results.put((index, time.time() - start, None))
+
+
+class BatchRender(object):
+    """Queue of render jobs, run with a limited number of processes.
+
+    Jobs are started in order, as long as there are free workers and the
+    estimated memory of every running job stays within the limit.
+    A job larger than the limit can still run, but only on its own.
+
+    Progress is written to the report as one JSON object per line.
+    """
+    def __init__(self, jobs=1, memory_limit=None, report=None, quiet=False):
+        self.jobs = max(1, jobs)
+        self.memory_limit = memory_limit
+        self.report = report
+        self.quiet = quiet
+        self.queue = []
+
+    def add(self, job):
+        self.queue.append(job)
+
+    def _report(self, event, **kwargs):
+        kwargs['event'] = event
+        kwargs['time'] = round(time.time() - self._start, 3)
+        if self.report is not None:
+            self.report.write(json.dumps(kwargs, sort_keys=True) + '\n')
+            self.report.flush()
+        return kwargs
+
+    def _can_start(self, job, running):
+        if len(running) >= self.jobs:
+            return False
+        if not running or not self.memory_limit:
+            return True
+        return sum(self.queue[i].memory for i in running) + job.memory <= self.memory_limit
+
+    def run(self):
+        """Run every job in the queue.
+        Returns a list of results, in the same order as the jobs.
+        """
+        self._start = time.time()
+        workers = max(1, render_workers() // min(self.jobs, len(self.queue) or 1))
+        results = Queue()
+        pending = list(range(len(self.queue)))
+        running = {}
+        finished = [None] * len(self.queue)
+        for i in pending:
+            self._report('queued', job=i, profile=self.queue[i].profile, memory=self.queue[i].memory)
+
+        while pending or running:
+            while pending and self._can_start(self.queue[pending[0]], running):
+                i = pending.pop(0)
+                process = Process(target=_run_job, args=(i, self.queue[i], results, workers, self.quiet))
+                process.start()
+                running[i] = process
+                self._report('started', job=i, profile=self.queue[i].profile, running=len(running))
+
+            try:
+                i, seconds, error = results.get(timeout=POLL_INTERVAL)
+
+            #Check if any processes ended without a result, such as being killed when out of memory
+            except queue.Empty:
+                for i, process in list(iteritems(running)):
+                    if not process.is_alive() and results.empty():
+                        process.join()
+                        del running[i]
+                        finished[i] = self._report('failed', job=i, profile=self.queue[i].profile, seconds=None,
+                                                   error='process ended with exit code {}'.format(process.exitcode))
+
+            else:
+                process = running.pop(i, None)
+                if process is None:
+                    continue
+                process.join()
+                finished[i] = self._report('failed' if error else 'finished', job=i, profile=self.queue[i].profile,
+                                           seconds=round(seconds, 3), error=error)
+
+        failed = sum(result['event'] == 'failed' for result in finished)
+        self._report('summary', jobs=len(finished), failed=failed, seconds=round(time.time() - self._start, 3))
+        return finished
+
+
+def render_profiles(patterns, render_types, output=None, file_types=None, last_session=False,
+                    jobs=1, memory_limit=None, report=None, quiet=False):
+    """Render every profile matching the patterns.
+    See RenderJob and BatchRender for the parameters.
+    """
+    batch = BatchRender(jobs=jobs, memory_limit=memory_limit, report=report, quiet=quiet)
+    for profile, metadata in sorted(iteritems(find_profiles(patterns))):
+        batch.add(RenderJob(profile, render_types, output=output, file_types=file_types,
+                            last_session=last_session, memory=estimate_memory(metadata)))
+    return batch.run()
@@ -0,0 +1,151 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Store render results on disk so that unchanged images don't need rendering again
+#Results are named after a hash of everything that affects them, so changed data or settings will never match
+
+from __future__ import absolute_import, division
+
+import hashlib
+import time
+
+from ..config.settings import CONFIG
+from ..files import DATA_FOLDER, DATA_CACHE_FOLDER, PICKLE_PROTOCOL
+from ..utils import numpy
+from ..utils.compatibility import pickle
+from ..utils.os import create_folder, hide_file, list_directory, remove_file, rename_file, set_modified_time
+from ..utils.os import get_file_size, get_modified_time
+from ..versions import VERSION
+
+
+RENDER_CACHE_FOLDER = '{}/{}'.format(DATA_FOLDER, DATA_CACHE_FOLDER)
+
+RENDER_CACHE_EXTENSION = '.cache'
+
+
+def _hash_value(hasher, value):
+    """Add a value to the hash, recursing through any containers."""
+    if numpy.is_array(value):
+        hasher.update(b'a')
+        numpy.hash_array(value, hasher)
+    elif isinstance(value, dict):
+        hasher.update(b'{')
+        for k in sorted(value):
+            _hash_value(hasher, k)
+            _hash_value(hasher, value[k])
+        hasher.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b'(')
+        for item in value:
+            _hash_value(hasher, item)
+        hasher.update(b')')
+    else:
+        hasher.update(repr(value).encode('utf-8'))
+
+
+def hash_key(*parts):
+    """Create a cache key from any combination of values and arrays.
+    Arrays are hashed by their contents, so the key stays the same after reloading a profile.
+    """
+    hasher = hashlib.sha1()
+    _hash_value(hasher, parts)
+    return hasher.hexdigest()
+
+
+class RenderCache(object):
+    """Size limited cache of render results.
+    Once the limit is reached, the least recently used results are removed.
+    """
+    def __init__(self, folder=RENDER_CACHE_FOLDER, max_size=None):
+        self.folder = folder
+        self._max_size = max_size
+
+    @property
+    def max_size(self):
+        """Get the size limit in bytes, which defaults to the value in the config."""
+        if self._max_size is not None:
+            return self._max_size
+        return CONFIG['GenerateImages']['CacheSize'] * 1024 * 1024
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def _path(self, key):
+        return '{}/{}{}'.format(self.folder, key, RENDER_CACHE_EXTENSION)
+
+    def load(self, key):
+        """Load a result, or return None if it isn't cached."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except (IOError, OSError):
+            return None
+
+        #The file was only partly written or is from an incompatible version
+        except Exception:
+            remove_file(path)
+            return None
+
+        #Mark the result as recently used
+        set_modified_time(path, time.time())
+        return result
+
+    def save(self, key, value):
+        """Save a result, then remove old results if over the size limit."""
+        if create_folder(self.folder, is_file=False):
+            hide_file(self.folder)
+
+        #Write to a temporary file first so an incomplete result is never loaded
+        path = self._path(key)
+        temp_path = '{}.tmp'.format(path)
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=PICKLE_PROTOCOL)
+        except (IOError, OSError):
+            remove_file(temp_path)
+            return False
+        remove_file(path)
+        if not rename_file(temp_path, path):
+            remove_file(temp_path)
+            return False
+
+        self.trim()
+        return True
+
+    def trim(self, max_size=None):
+        """Remove the least recently used results until the cache is within the size limit."""
+        if max_size is None:
+            max_size = self.max_size
+
+        files = []
+        for file_name in list_directory(self.folder, force_extension=RENDER_CACHE_EXTENSION) or []:
+            path = '{}/{}'.format(self.folder, file_name)
+            try:
+                files.append((get_modified_time(path) or 0, get_file_size(path), path))
+            except (IOError, OSError):
+                pass
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= max_size:
+                break
+            if remove_file(path):
+                total_size -= size
+
+    def cached(self, key_parts, func):
+        """Load a result if it was previously cached, otherwise calculate and save it.
+        The key parts should contain everything that affects the result.
+        The version is added to the key, as rendering may change between versions.
+        """
+        if not self.enabled:
+            return func()
+
+        key = hash_key(VERSION, *key_parts)
+        result = self.load(key)
+        if result is None:
+            result = func()
+            if result is not None:
+                self.save(key, result)
+        return result
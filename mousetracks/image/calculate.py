@@ -7,10 +7,10 @@ from __future__ import absolute_import, division
 
 from operator import itemgetter
 from collections import defaultdict
-from multiprocessing import Process, Queue, cpu_count
 from PIL import Image
 
-from .scipy import blur, upscale
+from .parallel import parallel_map, row_chunks
+from .scipy import blur, take_indexes, upscale, upscale_indexes
 from ..utils import numpy
 from ..config.settings import CONFIG
 from ..config.language import LANGUAGE
@@ -83,12 +83,16 @@ def calculate_resolution(resolutions, output_resolution=None):
     return output_resolution, max_resolution
 
 
-def upscale_arrays_to_resolution(arrays, target_resolution, skip=[]):
+def upscale_arrays_to_resolution(arrays, target_resolution, skip=[], merge=None, workers=1):
     """Upscale a dict of arrays to a certain resolution.
     The dictionary key must be a resolution,
     and the values can either be an array or list of arrays.
     
     Use skip to ignore array indexes in the list.
+
+    If a merge type is given, such as "max" or "add", each array is merged
+    into a single array as soon as it is upscaled, and that is returned
+    instead of a list. The merge can be split between multiple workers.
     """
     if isinstance(skip, int):
         skip = [skip]
@@ -107,6 +111,7 @@ def upscale_arrays_to_resolution(arrays, target_resolution, skip=[]):
     LANGUAGE.strings['Generation']['UpscaleArrayStart'].format_custom(XRES=target_resolution[0], YRES=target_resolution[1])
     processed = 0
     output = []
+    merged = None
     for resolution, array_list in iteritems(arrays):
 
         if not isinstance(array_list, (list, tuple)):
@@ -120,47 +125,235 @@ def upscale_arrays_to_resolution(arrays, target_resolution, skip=[]):
                                                                                 CURRENT=processed, TOTAL=num_arrays))
             zoom_factor = (target_resolution[1] / resolution[1],
                            target_resolution[0] / resolution[0])
+            if merge is not None and workers > 1:
+                merged = _upscale_merge(array, merged, zoom_factor, merge, workers)
+                continue
             upscaled = upscale(array, zoom_factor)
-            output.append(upscaled)
-    return output
+            if merge is None:
+                output.append(upscaled)
+            elif merged is None:
+                merged = upscaled.copy()  #The original array is returned if not resized
+            else:
+                numpy.merge_into(merged, upscaled, merge)
+    
+    if merge is None:
+        return output
+    return merged
 
 
-def arrays_to_heatmap(numpy_arrays, gaussian_size, clip):
+@numpy.process_numpy_array
+def _upscale_merge(array, merged, zoom_factor, merge_type, workers):
+    """Upscale an array and merge it into another, with the rows split between workers."""
+    rows = upscale_indexes(array.shape[0], zoom_factor[0])
+    columns = upscale_indexes(array.shape[1], zoom_factor[1])
+    first = merged is None
+    if first:
+        merged = numpy.array((len(columns), len(rows)), create=True, dtype=str(array.dtype))
+    
+    def upscale_rows(chunk):
+        upscaled = take_indexes(array, rows[chunk[0]:chunk[1]], columns)
+        if first:
+            merged[chunk[0]:chunk[1]] = upscaled
+        else:
+            numpy.merge_into(merged[chunk[0]:chunk[1]], upscaled, merge_type)
+    parallel_map(upscale_rows, row_chunks(len(rows), workers), workers)
+    return merged
+
+
+def arrays_to_heatmap(numpy_arrays, gaussian_size, clip, workers=1):
     """Convert list of arrays into a heatmap.
     The stages and values are chosen with trial and error, 
     so this function is still open to improvement.
     """
     
-    #Add all arrays together
-    Message(LANGUAGE.strings['Generation']['ArrayMerge'])
-    merged_arrays = numpy.merge(numpy_arrays, 'add', 'float64')
+    #Add all arrays together, unless it was done while upscaling
+    if isinstance(numpy_arrays, (list, tuple)):
+        Message(LANGUAGE.strings['Generation']['ArrayMerge'])
+        merged_arrays = numpy.merge(numpy_arrays, 'add', 'float64')
+    else:
+        merged_arrays = numpy_arrays
     
     #Set to constant values
     Message(LANGUAGE.strings['Generation']['ArrayRemap'])
-    flattened = numpy.remap_to_range(merged_arrays)
+    flattened = numpy.remap_to_range(merged_arrays, 'float64')
     
     #Blur the array
     if gaussian_size:
         Message(LANGUAGE.strings['Generation']['ArrayBlur'])
-        heatmap = blur(flattened, gaussian_size)
+        heatmap = blur(flattened, gaussian_size, workers=workers)
     else:
         heatmap = flattened
     
+    return (heatmap_range(heatmap, clip), heatmap)
+
+
+def points_to_heatmap(arrays, upscale_resolution, output_resolution, gaussian_size, clip, skip=[], workers=1):
+    """Convert a dict of click arrays into a heatmap, without upscaling them.
+    Each click is placed where it would be in the upscaled array, and the blur
+    is done on a grid reduced by the blur size, before being resized to the
+    output resolution.
+
+    Use skip to ignore array indexes in the list.
+    """
+    if isinstance(skip, int):
+        skip = [skip]
+    skip = set(skip)
+    width, height = upscale_resolution
+    factor = max(1, int(gaussian_size / CONFIG['GenerateHeatmap']['BlurPrecision']))
+    grid_width = -(-width // factor)
+    grid_height = -(-height // factor)
+
+    #Find the position of each click in the upscaled array
+    Message(LANGUAGE.strings['Generation']['ArrayMerge'])
+    indexes = []
+    counts = []
+    areas = []
+    for resolution, array_list in iteritems(arrays):
+        if not isinstance(array_list, (list, tuple)):
+            array_list = [array_list]
+        start_x, length_x = _upscale_footprint(resolution[0], width)
+        start_y, length_y = _upscale_footprint(resolution[1], height)
+        
+        for i, array in enumerate(array_list):
+            if i in skip:
+                continue
+            y, x = numpy.nonzero(array)
+            upscaled_x = start_x[x] + length_x[x] // 2
+            upscaled_y = start_y[y] + length_y[y] // 2
+            indexes.append(upscaled_y * width + upscaled_x)
+            counts.append(numpy.set_type(array[y, x], 'float64'))
+            areas.append(numpy.set_type(length_x[x] * length_y[y], 'float64'))
+    if not indexes:
+        heatmap = numpy.array(output_resolution, create=True, dtype='float64')
+        return (heatmap_range(heatmap, clip), heatmap)
+    
+    indexes, inverse = numpy.unique(numpy.concatenate(indexes, dtype='int64'), return_inverse=True)
+    num_indexes = len(indexes)
+    counts = numpy.bincount(inverse, num_indexes, weights=numpy.concatenate(counts))
+    areas = numpy.bincount(inverse, num_indexes, weights=numpy.concatenate(areas)) / numpy.bincount(inverse, num_indexes)
+
+    #Set to constant values, where 0 is the background
+    Message(LANGUAGE.strings['Generation']['ArrayRemap'])
+    flattened = (numpy.remap_to_range(counts, 'float64') + 1) * areas
+
+    #Blur the reduced array
+    Message(LANGUAGE.strings['Generation']['ArrayBlur'])
+    cells = (indexes // width // factor) * grid_width + indexes % width // factor
+    reduced = numpy.bincount(cells, grid_width * grid_height, weights=flattened) / (factor * factor)
+    reduced = reduced.reshape((grid_height, grid_width))
+    
+    #Splatting each point is quicker than blurring the whole array if there aren't many
+    sigma = gaussian_size / factor
+    y, x = numpy.nonzero(reduced)
+    radius = int(4 * sigma + 0.5)
+    
+    #With no radius (such as when the blur is disabled), the kernel only covers the point itself
+    if not radius:
+        pass
+    elif len(y) * (2 * radius + 1) < 2 * reduced.size and radius < min(grid_width, grid_height):
+        reduced = splat_points(reduced.shape, y, x, reduced[y, x], sigma)
+    else:
+        reduced = blur(reduced, sigma, workers=workers)
+
+    image = Image.fromarray(numpy.set_type(reduced, 'float32'), 'F')
+    image = image.resize(output_resolution, Image.BILINEAR, box=(0, 0, width / factor, height / factor))
+    heatmap = numpy.array(image, dtype='float64')
+    
+    return (heatmap_range(heatmap, clip), heatmap)
+
+
+def splat_points(shape, y, x, weights, sigma):
+    """Add a gaussian kernel to an empty array at each point.
+    This gives the same result as a gaussian blur (with reflected edges),
+    but the time taken depends on the number of points rather than the size.
+    """
+    height, width = shape
+    radius = int(4 * sigma + 0.5)
+    if not radius:
+        result = numpy.array((width, height), create=True, dtype='float64')
+        return numpy.add_at(result, (y, x), weights)
+    
+    kernel = numpy.arange(-radius, radius + 1, dtype='float64') / sigma
+    kernel = numpy.exp(kernel * kernel * -0.5)
+    kernel /= numpy.sum(kernel)
+    kernel = kernel[:, None] * kernel[None, :]
+    
+    #Pad the array so each kernel fits, and fold the edges back afterwards
+    padded = numpy.array((width + radius * 2, height + radius * 2), create=True, dtype='float64')
+    size = radius * 2 + 1
+    for i in range(len(y)):
+        padded[y[i]:y[i] + size, x[i]:x[i] + size] += kernel * weights[i]
+    
+    padded[radius:radius * 2] += padded[radius - 1::-1]
+    padded[-radius * 2:-radius] += padded[:-radius - 1:-1]
+    padded[:, radius:radius * 2] += padded[:, radius - 1::-1]
+    padded[:, -radius * 2:-radius] += padded[:, :-radius - 1:-1]
+    return padded[radius:-radius, radius:-radius]
+
+
+def _upscale_footprint(size, target):
+    """Find where each pixel starts and how many pixels it covers once upscaled."""
+    indexes = upscale_indexes(size, target / size)
+    lengths = numpy.bincount(indexes[indexes >= 0], size)
+    return numpy.cumsum(lengths) - lengths, lengths
+
+
+def heatmap_range(heatmap, clip):
+    """Find the range of values to use for the colours of a heatmap."""
     Message(LANGUAGE.strings['Generation']['ArrayRange'])
     min_value = numpy.min(heatmap)
     
-    #Lower the maximum value a little
-    all_values = numpy.sort(heatmap.ravel(), unique=True)
-    max_value = all_values[round_int(all_values.size * clip)]
-    
-    return ((min_value, max_value), heatmap)
+    #Lower the maximum value a little, ignoring the background
+    sample = heatmap.ravel()[::CONFIG['Advanced']['HeatmapRangeSample']]
+    sample = sample[sample > min_value]
+    if sample.size:
+        max_value = numpy.quantile(sample, clip)
+    else:
+        max_value = min_value
+    return (min_value, max_value)
+
 
+def arrays_to_colour_bands(colour_range, arrays, target_resolution, band_height, workers=1):
+    """Upscale, merge and colour a dict of arrays a band of rows at a time.
+    This gives the same result as arrays_to_colour with the upscaled arrays,
+    but only one band of each array (per worker) is upscaled at once.
+    """
+    width, height = target_resolution
+    mappings = []
+    for resolution, array_list in iteritems(arrays):
+        if not isinstance(array_list, (list, tuple)):
+            array_list = [array_list]
+        rows = upscale_indexes(resolution[1], height / resolution[1])
+        columns = upscale_indexes(resolution[0], width / resolution[0])
+        mappings += [(array, rows, columns) for array in array_list]
+    if not mappings:
+        return None
+    
+    def render_band(start):
+        bands = [take_indexes(array, rows[start:start + band_height], columns) for array, rows, columns in mappings]
+        return Image.fromarray(colour_range.lookup(numpy.merge(bands, 'max')))
+    
+    Message(LANGUAGE.strings['Generation']['ArrayMerge'])
+    image = None
+    starts = list(range(0, height, band_height))
+    for i in range(0, len(starts), workers):
+        group = starts[i:i + workers]
+        for start, band in zip(group, parallel_map(render_band, group, workers)):
+            if image is None:
+                image = Image.new(band.mode, target_resolution)
+            image.paste(band, (0, start))
+    return image
 
-def arrays_to_colour(colour_range, numpy_arrays):
-    """Convert an array of floats or integers into an image object."""
 
-    max_array = numpy.merge(numpy_arrays, 'max')
+def arrays_to_colour(colour_range, numpy_arrays, workers=1):
+    """Convert an array of floats or integers into an image object.
+    A list of arrays will be merged first.
+    """
+    if isinstance(numpy_arrays, (list, tuple)):
+        max_array = numpy.merge(numpy_arrays, 'max')
+    else:
+        max_array = numpy_arrays
     if max_array is None:
         return None
     
-    return Image.fromarray(colour_range.convert_to_rgb(max_array))
\ No newline at end of file
+    return Image.fromarray(colour_range.convert_to_rgb(max_array, workers=workers))
\ No newline at end of file
@@ -10,6 +10,7 @@ from ..misc import TextFile, get_config_file
 from ..utils.compatibility import Message, range, iteritems
 from ..files import format_name
 from ..utils.os import join_path
+from .parallel import parallel_map, row_chunks
 
 
 COLOUR_FILE = get_config_file('colours.txt')
@@ -70,13 +71,10 @@ class ColourRange(object):
         self.steps = colour_steps * self._len
         self._step_size = self.amount_diff / self.steps
         
-        #Cache results for quick access
+        #Cache results for quick access, as a lookup table of (steps+1, channels)
         if cache is None:
-            self.cache = []
-            for i in range(self.steps + 1):
-                self.cache.append(self.calculate_colour(self.min + i * self._step_size))
-        else:
-            self.cache = cache
+            cache = [self.calculate_colour(self.min + i * self._step_size) for i in range(self.steps + 1)]
+        self.cache = numpy.array(cache, dtype='uint8')
             
     def __getitem__(self, n):
         """Read an item from the cache."""
@@ -87,8 +85,8 @@ class ColourRange(object):
         
         if self.loop:
             if value_index != self.steps:
-                return self.cache[value_index % self.steps]
-        return self.cache[min(max(0, value_index), self.steps)]
+                return tuple(self.cache[value_index % self.steps].tolist())
+        return tuple(self.cache[min(max(0, value_index), self.steps)].tolist())
     
     def calculate_colour(self, n, as_int=True):
         """Calculate colour for given value."""
@@ -118,7 +116,7 @@ class ColourRange(object):
         else:
             return tuple(i * mix_ratio_r + j * mix_ratio for i, j in zip(base_colour, mix_colour))
 
-    def convert_to_rgb(self, array):
+    def convert_to_rgb(self, array, workers=1):
         """Convert an array into an RGB numpy array."""
         
         message = 'Converting {} points to RGB values... (this may take a few seconds)'
@@ -127,17 +125,36 @@ class ColourRange(object):
         except AttributeError:
             array = numpy.array(array)
             Message(message.format(array.size))
+        return self.lookup(array, workers=workers)
+    
+    def lookup(self, array, workers=1):
+        """Convert a numpy array into RGB values without any messages.
+        The rows can be split between multiple workers.
+        """
+        if workers <= 1 or array.ndim < 2:
+            return self._lookup(array)
         
-        new = numpy.round(numpy.divide(array - self.min, self._step_size), 0, 'int64')
+        output = numpy.array(self.cache.shape[1:] + array.shape[::-1], create=True, dtype='uint8')
+        def lookup_rows(chunk):
+            output[chunk[0]:chunk[1]] = self._lookup(array[chunk[0]:chunk[1]])
+        parallel_map(lookup_rows, row_chunks(len(array), workers), workers)
+        return output
     
-        start_colour = self.cache[0]
-        end_colour = self.cache[-1]
-        colour_array = [[self.cache[item] if 0 <= item <= self.steps 
-                         else start_colour if item < 0 
-                         else end_colour for item in sublst] 
-                        for sublst in new.tolist()]
-                        
-        return numpy.array(colour_array, dtype='uint8')
+    def _lookup(self, array):
+        indexes = numpy.round(numpy.divide(array - self.min, self._step_size), 0, 'int64')
+        
+        #Match the indexing of __getitem__, and look up every colour at once
+        if self.loop:
+            at_end = indexes == self.steps
+            indexes %= self.steps
+            indexes[at_end] = self.steps
+        else:
+            indexes = numpy.clip(indexes, 0, self.steps)
+        colour_array = self.cache[indexes]
+        
+        if self.background is not None:
+            colour_array[array == 0] = self.background
+        return colour_array
     
     def _preview_gradient(self, width, height):
         """Draw a gradient to test the colours."""
@@ -1,76 +1,163 @@
 """This is part of the Mouse Tracks Python application.
 Source: https://github.com/Peter92/MouseTracks
 """
-#Generate CSV files from data
-#TODO: Not currently working or in use, needs fixing at some point
+#Export data for use in other projects
+#Maps are written a chunk of rows at a time, so only a small part is ever converted to text at once
 
 from __future__ import absolute_import
 
 from ..utils import numpy
 from ..utils.compatibility import range, iteritems, Message
 from ..config.settings import CONFIG
+from ..constants import KEY_STATS
 from ..files import load_data
+from ..gamepad import THUMBSTICKS, TRIGGERS
 from ..config.language import LANGUAGE
 from ..utils.os import create_folder
 
 
+#Number of rows to convert at once
+EXPORT_CHUNK_ROWS = 256
+
+MOUSE_BUTTONS = ('Left', 'Middle', 'Right')
+
+
+def _row_chunks(array, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Split an array into groups of rows, returning the starting row of each."""
+    for start in range(0, len(array), chunk_rows):
+        yield start, array[start:start + chunk_rows]
+
+
+def _sparse_chunks(array, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Get the x, y and value of every recorded point, a group of rows at a time."""
+    for start, chunk in _row_chunks(array, chunk_rows):
+        y, x = numpy.nonzero(chunk)
+        if len(x):
+            yield x, y + start, chunk[y, x]
+
+
+def write_csv(f, array):
+    """Write every value in the map, with one line per row."""
+    for _, chunk in _row_chunks(array):
+        numpy.csv(chunk, f)
+
+
+def write_sparse(f, array):
+    """Write each recorded point as "x,y,value"."""
+    f.write('X,Y,Value\n')
+    for x, y, values in _sparse_chunks(array):
+        numpy.csv(numpy.stack((x, y, values), axis=1), f)
+
+
+def write_npz(f, array):
+    """Write the map as a compressed numpy array."""
+    numpy.save_npz(f, values=array)
+
+
+def write_columns(f, array):
+    """Write each recorded point in separate x, y and value columns.
+    The columns are compressed, so repeated values take up very little space.
+    """
+    columns = list(_sparse_chunks(array))
+    if columns:
+        x, y, values = zip(*columns)
+        x, y, values = numpy.concatenate(x), numpy.concatenate(y), numpy.concatenate(values)
+    else:
+        x = y = values = numpy.array((0,), create=True, dtype='int64')
+    numpy.save_npz(f, x=x, y=y, value=values, resolution=numpy.array(array.shape[::-1]))
+
+
+#File mode and writer for each file type
+MAP_WRITERS = {
+    'csv': ('w', write_csv),
+    'sparse': ('w', write_sparse),
+    'npz': ('wb', write_npz),
+    'columns': ('wb', write_columns),
+}
+
+
 class ExportCSV(object):
     def __init__(self, profile, data=None):
         if data is None:
             data = load_data(profile, _update_version=False)
         self.profile = profile
         self.data = data
-    
-    def _generate(self, resolution, data):
-        
-        if numpy.count(data) < CONFIG['GenerateCSV']['MinimumPoints']:
+
+    def _export_map(self, image_name, image_type, array):
+        """Write a single map to a file, if it contains enough points."""
+        if isinstance(array, numpy.LazyLoader):
+            array = array.array
+        if numpy.count(array) < CONFIG['GenerateCSV']['MinimumPoints']:
             return None
-        output = numpy.set_type(data, str)
-        return '\n'.join(','.join(row) for row in output)
-   
+
+        mode, writer = MAP_WRITERS[CONFIG['GenerateCSV']['FileType'].lower()]
+        file_name = image_name.generate(image_type, reload=True)
+        create_folder(file_name)
+        with open(file_name, mode) as f:
+            writer(f, array)
+        return file_name
+
+    def _export_table(self, image_name, image_type, header, rows):
+        """Write a table to a csv file."""
+        file_name = image_name.generate(image_type, reload=True)
+        create_folder(file_name)
+        with open(file_name, 'w') as f:
+            f.write('{}\n'.format(','.join(header)))
+            for row in rows:
+                f.write('{}\n'.format(','.join(map(str, row))))
+        return file_name
+
     def tracks(self, image_name):
-        
+
         Message(LANGUAGE.strings['GenerationInput']['GenerateCSV'].format_custom(RENDER_TYPE='tracks'))
-        for resolution in self.data['Maps']['Tracks']:
-            CONFIG['GenerateImages']['_TempResolutionX'], CONFIG['GenerateImages']['_TempResolutionY'] = resolution
-            
-            result = self._generate(resolution, self.data['Maps']['Tracks'][resolution])
-            if result is not None:
-                file_name = image_name.generate('csv-tracks', reload=True)
-                create_folder(file_name)
-                with open(file_name, 'w') as f:
-                    f.write(result)
-   
+        for resolution, maps in iteritems(self.data['Resolution']):
+            CONFIG['GenerateImages']['_OutputResolutionX'], CONFIG['GenerateImages']['_OutputResolutionY'] = resolution
+            self._export_map(image_name, 'csv-tracks', maps['Tracks'])
+
     def clicks(self, image_name):
-        
+
         Message(LANGUAGE.strings['GenerationInput']['GenerateCSV'].format_custom(RENDER_TYPE='clicks'))
-        for i, mouse_button in enumerate(self.data['Maps']['Click']['Single']):
+        for i, mouse_button in enumerate(MOUSE_BUTTONS):
             CONFIG['GenerateHeatmap']['_MouseButtonLeft'] = i == 0
             CONFIG['GenerateHeatmap']['_MouseButtonMiddle'] = i == 1
             CONFIG['GenerateHeatmap']['_MouseButtonRight'] = i == 2
-            
-            for resolution, array in iteritems(self.data['Maps']['Click']['Single'][mouse_button]):
-                CONFIG['GenerateImages']['_TempResolutionX'], CONFIG['GenerateImages']['_TempResolutionY'] = resolution
-            
-                result = self._generate(resolution, array)
-                if result is not None:
-                    file_name = image_name.generate('csv-clicks', reload=True)
-                    create_folder(file_name)
-                    with open(file_name, 'w') as f:
-                        f.write(result)
-            
-        
-    
+
+            for resolution, maps in iteritems(self.data['Resolution']):
+                CONFIG['GenerateImages']['_OutputResolutionX'], CONFIG['GenerateImages']['_OutputResolutionY'] = resolution
+                self._export_map(image_name, 'csv-clicks', maps['Clicks']['Single'][mouse_button])
+
     def keyboard(self, image_name):
-        
+
         Message(LANGUAGE.strings['GenerationInput']['GenerateCSV'].format_custom(RENDER_TYPE='keyboard'))
-        result = ['Key,Count,Time']
-        for key in self.data['Keys']['All']['Pressed']:
-            result.append('{},{},{}'.format(key, 
-                                            self.data['Keys']['All']['Pressed'][key], 
-                                            self.data['Keys']['All']['Held'][key]))
+        pressed = self.data['Keys']['All']['Pressed']
+        held = self.data['Keys']['All']['Held']
+        rows = []
+        for key in sorted(set(pressed) | set(held)):
+            try:
+                key_name = LANGUAGE.keys[str(key)]
+            except KeyError:
+                key_name = chr(key) if key in KEY_STATS else key
+            key_name = '"{}"'.format(str(key_name).replace('\n', ' ').replace('"', '""'))
+            rows.append((key, key_name, pressed.get(key, 0), held.get(key, 0)))
+        self._export_table(image_name, 'csv-keyboard', ('Key', 'Name', 'Count', 'Time'), rows)
+
+    def gamepad(self, image_name):
+
+        Message(LANGUAGE.strings['GenerationInput']['GenerateCSV'].format_custom(RENDER_TYPE='gamepad'))
+        pressed = self.data['Gamepad']['All']['Buttons']['Pressed']
+        held = self.data['Gamepad']['All']['Buttons']['Held']
+        rows = [(button, pressed.get(button, 0), held.get(button, 0)) for button in sorted(set(pressed) | set(held))]
+        if rows:
+            self._export_table(image_name, 'csv-gamepad', ('Button', 'Count', 'Time'), rows)
+
+        axis = self.data['Gamepad']['All']['Axis']
+        for thumbstick in sorted(THUMBSTICKS):
+            if thumbstick in axis:
+                CONFIG['GenerateCSV']['_GamepadAxis'] = thumbstick
+                self._export_map(image_name, 'csv-thumbsticks', axis[thumbstick])
         
-        file_name = image_name.generate('csv-keyboard', reload=True)
-        create_folder(file_name)
-        with open(file_name, 'w') as f:
-            f.write('\n'.join(result))
\ No newline at end of file
+        #Write the triggers as a single column, so there is one row per bin
+        for trigger in TRIGGERS:
+            if trigger in axis:
+                CONFIG['GenerateCSV']['_GamepadAxis'] = trigger
+                self._export_map(image_name, 'csv-triggers', axis[trigger].reshape(-1, 1))
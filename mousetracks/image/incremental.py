@@ -0,0 +1,105 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Update track images without rendering everything again
+#Track values are the tick each pixel was last visited, so only pixels at or above the previous tick count have changed
+
+from __future__ import absolute_import, division
+
+from PIL import Image
+
+from .colours import ColourRange
+from .parallel import parallel_map
+from .scipy import take_indexes, upscale_indexes
+from ..utils import numpy
+from ..utils.compatibility import range, iteritems
+
+
+class IncrementalTracks(object):
+    """Keep the upscaled values and colours of the last track render,
+    so that the next render only needs to upscale the bands of rows that changed.
+
+    If the range of values has moved, the colour lookup table is rebuilt and
+    the whole image coloured again, but this is much quicker than upscaling.
+    Anything that changes every value, such as compressing the tracks or
+    starting a new session, is detected and causes a full render.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget the last render, so the next one starts from scratch."""
+        self.ticks = None
+        self._layout = None
+        self._checks = None
+        self._colours = None
+        self._field = None
+        self._rgb = None
+
+    def _is_valid(self, tracks, layout, ticks):
+        """Check if the last render can be updated with the new tracks."""
+        if self._field is None or layout != self._layout or ticks < self.ticks:
+            return False
+
+        #Every previous value must be unchanged unless it was visited again
+        for resolution, (index, value) in iteritems(self._checks):
+            new_value = tracks[resolution].flat[index]
+            if new_value != value and new_value < self.ticks:
+                return False
+        return True
+
+    def render(self, track_data, ticks, colour_map, upscale_resolution, band_height, workers=1):
+        """Render the tracks at the upscale resolution, reusing the last render where possible.
+
+        The track data is given in the same format as LoadData.get_tracks,
+        and ticks should be the current tick count in the same range as the values,
+        as any newly visited pixels will be set at or above it.
+        """
+        top_resolution, (min_value, max_value), tracks = track_data
+        width, height = upscale_resolution
+        band_height = band_height or height
+        starts = list(range(0, height, band_height))
+
+        mappings = []
+        for resolution, array in sorted(iteritems(tracks)):
+            rows = upscale_indexes(resolution[1], height / resolution[1])
+            columns = upscale_indexes(resolution[0], width / resolution[0])
+            mappings.append((resolution, array, rows, columns))
+        layout = (tuple(sorted(tracks)), upscale_resolution)
+
+        #Find which bands of rows contain values set since the last render
+        if self._is_valid(tracks, layout, ticks):
+            changed = numpy.array((height,), create=True, dtype='bool_')
+            for resolution, array, rows, columns in mappings:
+                changed_rows = (array >= self.ticks).any(axis=1)
+                changed |= changed_rows[rows] & (rows >= 0)
+            dirty = [start for start in starts if changed[start:start + band_height].any()]
+        else:
+            self._field = numpy.array(upscale_resolution, create=True, dtype=str(mappings[0][1].dtype))
+            self._rgb = None
+            dirty = starts
+
+        def upscale_band(start):
+            bands = [take_indexes(array, rows[start:start + band_height], columns) for _, array, rows, columns in mappings]
+            self._field[start:start + band_height] = numpy.merge(bands, 'max')
+        parallel_map(upscale_band, dirty, workers)
+
+        #Only the changed bands need colouring if the range is the same
+        colours = (colour_map, min_value, max_value)
+        colour_range = ColourRange(min_value, max_value, colour_map)
+        if self._rgb is None or colours != self._colours:
+            self._rgb = colour_range.lookup(self._field, workers=workers)
+        else:
+            def colour_band(start):
+                self._rgb[start:start + band_height] = colour_range.lookup(self._field[start:start + band_height])
+            parallel_map(colour_band, dirty, workers)
+
+        #Remember where the highest value is, as that will change if every value does
+        self._checks = {}
+        for resolution, array, _, _ in mappings:
+            index = int(numpy.argmax(array))
+            self._checks[resolution] = (index, array.flat[index])
+        self._layout = layout
+        self._colours = colours
+        self.ticks = ticks
+        return Image.fromarray(self._rgb)
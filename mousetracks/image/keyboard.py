@@ -7,9 +7,11 @@ from __future__ import absolute_import, division
 
 from PIL import Image, ImageFont, ImageDraw
 
+from .cache import RenderCache
 from .colours import COLOUR_FILE, ColourRange, calculate_colour_map, get_luminance, parse_colour_file
 from .misc import save_image_to_folder
-from ..utils.compatibility import PYTHON_VERSION, Message, range, bytes
+from ..utils import numpy
+from ..utils.compatibility import PYTHON_VERSION, Message, range, bytes, iteritems
 from ..config.settings import CONFIG
 from ..config.language import LANGUAGE
 from ..files import load_data
@@ -53,6 +55,47 @@ _CIRCLE = {
     'BottomLeft': calculate_circle(KEY_CORNER_RADIUS, 'BottomLeft'),
 }
 
+#Corners as arrays of (x, y), for drawing every point at once
+_CIRCLE_POINTS = {direction: {shape: numpy.array(sorted(points), dtype='int64').reshape(-1, 2)
+                              for shape, points in iteritems(circle)}
+                  for direction, circle in iteritems(_CIRCLE)}
+
+#Direction to expand each corner outline by the border
+_CORNER_SIGNS = {
+    'TopRight': (1, -1),
+    'TopLeft': (-1, -1),
+    'BottomRight': (1, 1),
+    'BottomLeft': (-1, 1),
+}
+
+#Masks of each key shape, as most keys are the same size
+_MASKS = {}
+
+#Position of every key for each layout
+_LAYOUTS = {}
+
+#Labels of each part of a keyboard image, with each key numbered after LABEL_KEYS
+LABEL_BACKGROUND = 0
+
+LABEL_SHADOW = 1
+
+LABEL_OUTLINE = 2
+
+LABEL_KEYS = 3
+
+
+def load_font(font, size):
+    """Load a font, or use the default one if it isn't installed."""
+    try:
+        return ImageFont.truetype(font, size=size)
+    except (IOError, OSError):
+        try:
+            return ImageFont.load_default(size=size)
+        
+        #Older versions of Pillow only have a fixed size font
+        except TypeError:
+            return ImageFont.load_default()
+
 
 class KeyboardButton(object):
     def __init__(self, x, y, x_len, y_len=None):
@@ -135,6 +178,64 @@ class KeyboardButton(object):
         
         return coordinates
 
+    def _draw_fill(self, mask):
+        """Draw the same pixels as fill onto a mask."""
+        squares = ((self.cache['y'], self.cache['x']),
+                   (self.cache['y'], self.cache['x_start']),
+                   (self.cache['y'], self.cache['x_end']),
+                   (self.cache['y_start'], self.cache['x']),
+                   (self.cache['y_end'], self.cache['x']))
+        for y_range, x_range in squares:
+            if y_range and x_range:
+                mask[y_range[0]:y_range[-1] + 1, x_range[0]:x_range[-1] + 1] = True
+        
+        for direction in _CIRCLE_POINTS:
+            points = _CIRCLE_POINTS[direction]['Area']
+            x, y = self._circle_offset(0, 0, direction)
+            mask[points[:, 1] + y, points[:, 0] + x] = True
+    
+    def _draw_outline(self, mask, border):
+        """Draw the same pixels as outline onto a mask."""
+        r = tuple(range(border))
+        for direction, (x_sign, y_sign) in iteritems(_CORNER_SIGNS):
+            points = _CIRCLE_POINTS[direction]['Outline']
+            x, y = self._circle_offset(0, 0, direction)
+            for i in r:
+                for j in r:
+                    mask[points[:, 1] + y + y_sign * j, points[:, 0] + x + x_sign * i] = True
+        
+        x_range = self.cache['x']
+        y_range = self.cache['y']
+        for i in r:
+            if x_range:
+                mask[self.y - i, x_range[0]:x_range[-1] + 1] = True
+                mask[self.y + self.y_len + i, x_range[0]:x_range[-1] + 1] = True
+            if y_range:
+                mask[y_range[0]:y_range[-1] + 1, self.x - i] = True
+                mask[y_range[0]:y_range[-1] + 1, self.x + self.x_len + i] = True
+    
+    def _mask(self, key, margin, draw):
+        """Draw a key of the same size onto an empty mask, with a margin for anything outside the key.
+        Returns the position of the top left corner of the mask, and the mask as an image,
+        so it can be used to paste a colour.
+        """
+        key = (key, self.x_len, self.y_len)
+        try:
+            mask = _MASKS[key]
+        except KeyError:
+            array = numpy.array((self.x_len + 2 * margin + 1, self.y_len + 2 * margin + 1), create=True, dtype='bool_')
+            draw(KeyboardButton(margin, margin, self.x_len, self.y_len), array)
+            mask = _MASKS[key] = Image.fromarray(numpy.set_type(array, 'uint8') * 255, 'L')
+        return ((self.x - margin, self.y - margin), mask)
+    
+    def outline_mask(self, border=0):
+        """Get the outline as a mask, in the same format as _mask."""
+        return self._mask(('Outline', border), border, lambda button, mask: button._draw_outline(mask, border))
+    
+    def fill_mask(self):
+        """Get the fill as a mask, in the same format as _mask."""
+        return self._mask('Fill', 0, lambda button, mask: button._draw_fill(mask))
+
 
 class KeyboardGrid(object):
     FILL_COLOUR = (170, 170, 170)
@@ -170,8 +271,8 @@ class KeyboardGrid(object):
         self.row.append(_values)
 
     def generate_coordinates(self):
-        image = {'Fill': {}, 'Outline': [], 'Text': []}
-        max_offset = {'X': 0, 'Y': 0}
+        layout = self.layout()
+        image = {'Fill': {}, 'Text': [], 'Labels': layout['Labels']}
         
         if CONFIG['GenerateKeyboard']['LinearMapping']:
             if CONFIG['GenerateKeyboard']['LinearPower'] != 1:
@@ -213,6 +314,86 @@ class KeyboardGrid(object):
             image['Background'] = self.colours['black']['Colour']
             image['Shadow'] = self.colours['white']['Colour']
         
+        for key in layout['Keys']:
+            hide_background = False
+            
+            #Convert the key number to a name and get stats
+            try:
+                key_name = int(key['Name'])
+            except ValueError:
+                key_name = key['Name']
+            
+            #Get press/time count
+            count_time = self.count_time.get(key_name, 0)
+            count_press = self.count_press.get(key_name, 0)
+            if use_time:
+                key_count = count_time
+            elif use_count:
+                key_count = count_press
+            else:
+                key_count = 0
+
+            #Get key name
+            try:
+                display_name = LANGUAGE.keys[key['Name']]
+            except KeyError:
+                display_name = key['Name']
+            
+            #Calculate colour for key
+            if key['CustomColour'] is None:
+                if mapping == 'standard':
+                    fill_colour = colour_range[lookup[key_count]]
+                elif mapping == 'exponential':
+                    fill_colour = colour_range[key_count ** exponential]
+                else:
+                    fill_colour = colour_range[key_count]
+            else:
+                if key['CustomColour'] == False:
+                    hide_background = True
+                    fill_colour = image['Background']
+                else:
+                    fill_colour = key['CustomColour']
+            
+            #Calculate colour for border
+            if get_luminance(*fill_colour) > 128:
+                text_colour = self.colours['black']['Colour']
+            else:
+                text_colour = self.colours['white']['Colour']
+            
+            #Store values
+            _values = {'Offset': key['Offset'],
+                       'KeyName': display_name,
+                       'Counts': {'press': count_press, 'time': count_time},
+                       'Colour': text_colour,
+                       'Dimensions': key['Dimensions']}
+            image['Text'].append(_values)
+
+            if not hide_background:
+                image['Fill'][key['Label']] = fill_colour
+        
+        return ((layout['Width'], layout['Height']), image)
+
+    def layout(self):
+        """Get the position of every key, and an array of which key each pixel belongs to.
+        This only depends on the keyboard layout and size, not the data, so it is
+        remembered and saved in the render cache.
+        """
+        key = (tuple(tuple((values['Name'], values['DimensionMultipliers'], values['HideBorder'], values['CustomColour'])
+                           for values in row) for row in self.grid),
+               KEY_SIZE, KEY_CORNER_RADIUS, KEY_PADDING, KEY_BORDER, IMAGE_PADDING, DROP_SHADOW_X, DROP_SHADOW_Y)
+        try:
+            return _LAYOUTS[key]
+        except KeyError:
+            layout = _LAYOUTS[key] = RenderCache().cached(('KeyboardLayout', key), self._calculate_layout)
+            return layout
+
+    def _calculate_layout(self):
+        """Calculate the position of every key, and draw the labels.
+        Pixels are labelled in the order they are drawn, with LABEL_BACKGROUND,
+        LABEL_SHADOW and LABEL_OUTLINE used for the parts that aren't a key.
+        """
+        keys = []
+        max_offset = {'X': 0, 'Y': 0}
         y_offset = IMAGE_PADDING
         y_current = 0
         for row in self.grid:
@@ -221,69 +402,13 @@ class KeyboardGrid(object):
             for values in row:
             
                 x, y = values['Dimensions']
-                hide_background = False
-                
-                #Convert the key number to a name and get stats
                 if values['Name'] is not None:
-                    try:
-                        key_name = int(values['Name'])
-                    except ValueError:
-                        key_name = values['Name']
-                    
-                    #Get press/time count
-                    count_time = self.count_time.get(key_name, 0)
-                    count_press = self.count_press.get(key_name, 0)
-                    if use_time:
-                        key_count = count_time
-                    elif use_count:
-                        key_count = count_press
-                    else:
-                        key_count = 0
-
-                    #Get key name
-                    try:
-                        display_name = LANGUAGE.keys[values['Name']]
-                    except KeyError:
-                        display_name = values['Name']
-
-                    button_coordinates = KeyboardButton(x_offset, y_offset, x, y)
-                    
-                    #Calculate colour for key
-                    if values['CustomColour'] is None:
-                        if mapping == 'standard':
-                            fill_colour = colour_range[lookup[key_count]]
-                        elif mapping == 'exponential':
-                            fill_colour = colour_range[key_count ** exponential]
-                        else:
-                            fill_colour = colour_range[key_count]
-                    else:
-                        if values['CustomColour'] == False:
-                            hide_background = True
-                            fill_colour = image['Background']
-                        else:
-                            fill_colour = values['CustomColour']
-                    
-                    #Calculate colour for border
-                    if get_luminance(*fill_colour) > 128:
-                        text_colour = self.colours['black']['Colour']
-                    else:
-                        text_colour = self.colours['white']['Colour']
-                    
-                    #Store values
-                    _values = {'Offset': (x_offset, y_offset),
-                               'KeyName': display_name,
-                               'Counts': {'press': count_press, 'time': count_time},
-                               'Colour': text_colour,
-                               'Dimensions': values['DimensionMultipliers']}
-                    image['Text'].append(_values)
-
-                    if not values['HideBorder']:
-                        image['Outline'] += button_coordinates.outline(KEY_BORDER)
-                    if not hide_background:
-                        try:
-                            image['Fill'][fill_colour] += button_coordinates.fill()
-                        except KeyError:
-                            image['Fill'][fill_colour] = button_coordinates.fill()
+                    keys.append({'Name': values['Name'],
+                                 'Offset': (x_offset, y_offset),
+                                 'Dimensions': values['DimensionMultipliers'],
+                                 'CustomColour': values['CustomColour'],
+                                 'Button': KeyboardButton(x_offset, y_offset, x, y),
+                                 'HideBorder': values['HideBorder']})
                 
                 x_offset += KEY_PADDING + x
                 y_current = max(y_current, KEY_SIZE, y - KEY_PADDING)
@@ -301,7 +426,26 @@ class KeyboardGrid(object):
         #Calculate total size of image
         width = max_offset['X'] + IMAGE_PADDING - KEY_PADDING + 1
         height = max_offset['Y'] + IMAGE_PADDING + y_current - KEY_PADDING + DROP_SHADOW_Y + 1
-        return ((width, height), image)
+        
+        #Draw the shadows, then the keys, then the outlines
+        labels = Image.new('I', (width, height), LABEL_BACKGROUND)
+        filled = [key for key in keys if key['CustomColour'] is not False]
+        for key in filled:
+            (x, y), mask = key['Button'].fill_mask()
+            labels.paste(LABEL_SHADOW, (DROP_SHADOW_X+x, DROP_SHADOW_Y+y), mask)
+        for i, key in enumerate(filled):
+            key['Label'] = LABEL_KEYS + i
+            position, mask = key['Button'].fill_mask()
+            labels.paste(key['Label'], position, mask)
+        for key in keys:
+            if not key['HideBorder']:
+                position, mask = key['Button'].outline_mask(KEY_BORDER)
+                labels.paste(LABEL_OUTLINE, position, mask)
+            del key['Button']
+            del key['HideBorder']
+        
+        dtype = 'uint8' if LABEL_KEYS + len(filled) <= 256 else 'uint16'
+        return {'Width': width, 'Height': height, 'Keys': keys, 'Labels': numpy.set_type(numpy.array(labels), dtype)}
 
 
 def format_amount(value, value_type, max_length=5, min_length=None, decimal_units=False):
@@ -415,37 +559,40 @@ class DrawKeyboard(object):
     def draw_image(self, file_path=None, font='arial.ttf'):
         data = self.calculate()
         
-        #Create image object
-        image = Image.new('RGB', (data['Width'], data['Height']))
-        image.paste(data['Coordinates']['Background'], (0, 0, data['Width'], data['Height']))
-        pixels = image.load()
-
+        #Set the colour of each label
+        coordinates = data['Coordinates']
+        palette = numpy.array((3, LABEL_KEYS + len(coordinates['Fill'])), create=True, dtype='uint8')
+        palette[:] = coordinates['Background'][:3]
+        
         #Add drop shadow
         shadow = (64, 64, 64)
-        if (DROP_SHADOW_X or DROP_SHADOW_Y) and data['Coordinates']['Background'][:3] == (255, 255, 255):
+        if (DROP_SHADOW_X or DROP_SHADOW_Y) and coordinates['Background'][:3] == (255, 255, 255):
             Message(LANGUAGE.strings['Generation']['KeyboardDrawShadow'])
-            #shadow_colour = tuple(int(pow(i + 30, 0.9625)) for i in data['Coordinates']['Shadow'])
-            for colour in data['Coordinates']['Fill']:
-                for x, y in data['Coordinates']['Fill'][colour]:
-                    pixels[DROP_SHADOW_X+x, DROP_SHADOW_Y+y] = shadow
-    
+            #shadow_colour = tuple(int(pow(i + 30, 0.9625)) for i in coordinates['Shadow'])
+            palette[LABEL_SHADOW] = shadow
+        
         #Fill colours
         Message(LANGUAGE.strings['Generation']['KeyboardDrawColour'])
-        for colour in data['Coordinates']['Fill']:
-            for x, y in data['Coordinates']['Fill'][colour]:
-                pixels[x, y] = colour
-
+        for label, colour in iteritems(coordinates['Fill']):
+            palette[label] = colour[:3]
+        
         #Draw border
         Message(LANGUAGE.strings['Generation']['KeyboardDrawOutline'])
-        border = tuple(255 - i for i in data['Coordinates']['Background'])
-        for x, y in data['Coordinates']['Outline']:
-            pixels[x, y] = border
+        palette[LABEL_OUTLINE] = tuple(255 - i for i in coordinates['Background'])[:3]
+        
+        #Create image object, using the labels as a palette image if there are few enough
+        if len(palette) <= 256:
+            image = Image.fromarray(coordinates['Labels'])
+            image.putpalette(palette.ravel().tolist())
+            image = image.convert('RGB')
+        else:
+            image = Image.fromarray(palette.take(coordinates['Labels'], axis=0))
     
         #Draw text
         Message(LANGUAGE.strings['Generation']['KeyboardDrawText'])
         draw = ImageDraw.Draw(image)
-        font_key = ImageFont.truetype(font, size=FONT_SIZE_MAIN)
-        font_amount = ImageFont.truetype(font, size=FONT_SIZE_STATS)
+        font_key = load_font(font, FONT_SIZE_MAIN)
+        font_amount = load_font(font, FONT_SIZE_STATS)
         
         #Generate stats
         time_to_str = ticks_to_seconds(self.ticks, 60)
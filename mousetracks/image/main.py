@@ -8,22 +8,47 @@ from __future__ import absolute_import, division
 from PIL import Image
 import zlib
 
+from .cache import RenderCache, hash_key
 from .export import ExportCSV
+from .incremental import IncrementalTracks
 from .misc import save_image_to_folder
-from .calculate import arrays_to_heatmap, arrays_to_colour, gaussian_size, calculate_resolution, upscale_arrays_to_resolution
+from .calculate import (arrays_to_heatmap, arrays_to_colour, arrays_to_colour_bands, gaussian_size, calculate_resolution,
+                        points_to_heatmap, upscale_arrays_to_resolution)
 from .colours import ColourRange, calculate_colour_map
+from .parallel import render_workers
 from .keyboard import DrawKeyboard
 from ..config.language import LANGUAGE
 from ..config.settings import CONFIG
 from ..misc import format_file_path
 from ..constants import UPDATES_PER_SECOND, DEFAULT_NAME
-from ..files import LoadData, format_name
+from ..files import LoadData, format_name, get_file_state
+from ..gamepad import AXIS_BINS
 from ..utils.compatibility import Message, pickle, iteritems
 from ..utils.maths import round_int
 from ..utils.os import remove_file, join_path
 from ..versions import VERSION
 
 
+#ANTIALIAS was renamed to LANCZOS, and the old name removed in Pillow 10
+RESIZE_FILTER = getattr(Image, 'LANCZOS', None) or Image.ANTIALIAS
+
+#Config section for each type of render
+RENDER_CONFIG_HEADINGS = {
+    'tracks': 'GenerateTracks',
+    'speed': 'GenerateSpeed',
+    'strokes': 'GenerateStrokes',
+    'clicks': 'GenerateHeatmap',
+    'keyboard': 'GenerateKeyboard',
+    'thumbsticks': 'GenerateThumbsticks'
+}
+
+
+def _resolution_settings():
+    """Get the settings used when calculating the output and upscale resolution."""
+    g_im = CONFIG['GenerateImages']
+    return (g_im['OutputResolutionX'], g_im['OutputResolutionY'], g_im['AutomaticResolution'], g_im['HighPrecision'])
+
+
 class ImageName(object):
     """Generate an image name using values defined in the config.
     
@@ -83,6 +108,7 @@ class ImageName(object):
         g_sp = CONFIG['GenerateSpeed']
         g_st = CONFIG['GenerateStrokes']
         g_kb = CONFIG['GenerateKeyboard']
+        g_ts = CONFIG['GenerateThumbsticks']
     
         self.width = str(g_im['_OutputResolutionX'])
         self.height = str(g_im['_OutputResolutionY'])
@@ -119,6 +145,10 @@ class ImageName(object):
         self.keyboard_size_mult = str(g_kb['SizeMultiplier'])
         self.keyboard_extended = 'Extended' if g_kb['ExtendedKeyboard'] else 'Compact'
 
+        self.thumbstick_colour = str(g_ts['ColourProfile'])
+        
+        self.gamepad_axis = str(CONFIG['GenerateCSV']['_GamepadAxis'])
+
     def generate(self, image_type=None, reload=False):
         """Generate and format a folder/image path."""
         name = self._generate(image_type=image_type, reload=reload)
@@ -145,9 +175,13 @@ class ImageName(object):
                   'speed': 'GenerateSpeed',
                   'strokes': 'GenerateStrokes',
                   'keyboard': 'GenerateKeyboard',
+                  'thumbsticks': 'GenerateThumbsticks',
                   'csv-tracks': 'FileNameTracks',
                   'csv-clicks': 'FileNameClicks',
-                  'csv-keyboard': 'FileNameKeyboard'}
+                  'csv-keyboard': 'FileNameKeyboard',
+                  'csv-gamepad': 'FileNameGamepad',
+                  'csv-thumbsticks': 'FileNameThumbsticks',
+                  'csv-triggers': 'FileNameTriggers'}
         try:
             name = CONFIG[lookup[image_type]]['FileName']
             
@@ -217,6 +251,9 @@ class ImageName(object):
             name = name.replace('[DataSet]', self.keyboard_set)
             name = name.replace('[Size]', self.keyboard_size_mult)
             name = name.replace('[Extended]', self.keyboard_extended)
+            
+        elif image_type == 'thumbsticks':
+            name = name.replace('[Colours]', self.thumbstick_colour)
         
         elif image_type.startswith('csv'):
             if image_type == 'csv-clicks':
@@ -225,10 +262,15 @@ class ImageName(object):
                 #but the config will need edited first to only have one button selected.
                 name = name.replace('[MouseButton]', self.heatmap_button_group)
             
+            elif image_type in ('csv-thumbsticks', 'csv-triggers'):
+                name = name.replace('[Axis]', self.gamepad_axis)
+            
         else:
             raise ValueError('incorred image type: {}'.format(image_type))
                 
-        if image_type.startswith('csv'):
+        if image_type in ('csv-tracks', 'csv-clicks', 'csv-thumbsticks', 'csv-triggers') and CONFIG['GenerateCSV']['FileType'].lower() in ('npz', 'columns'):
+            ext = 'npz'
+        elif image_type.startswith('csv'):
             ext = 'csv'
         else:
             ext = CONFIG['GenerateImages']['FileType']
@@ -243,15 +285,36 @@ class RenderImage(object):
         if isinstance(profile, LoadData):
             self.profile = profile.name
             self.data = profile
+            self._file_state = None
         else:
             self.profile = profile
         
-            self.data = LoadData(profile, _update_metadata=False)
+            self.data, self._file_state = self._load_data()
             if self.data is None:
                 raise ValueError('profile doesn\'t exist')
             
         self.name = ImageName(self.profile, data=self.data)
         self.save = allow_save
+        self.cache = RenderCache()
+        self._cache = None
+        self._incremental = {}
+
+    def _load_data(self):
+        """Load the saved data for the profile, along with the state of the file it was loaded from.
+        The state is None if the file doesn't exist or was saved again while loading.
+        """
+        file_state = get_file_state(self.profile)
+        data = LoadData(self.profile, _update_metadata=False)
+        if file_state is not None and get_file_state(self.profile) != file_state:
+            file_state = None
+        return data, file_state
+
+    def reload(self):
+        """Load the latest saved data for the profile."""
+        data, file_state = self._load_data()
+        if data is not None:
+            self.data = self.name.data = data
+            self._file_state = file_state
 
     def keys_per_hour(self, session=False):
         """Detect if the game has keyboard tracking or not.
@@ -286,92 +349,205 @@ class RenderImage(object):
             
         if CONFIG['GenerateCSV']['_GenerateKeyboard']:
             export.keyboard(self.name)
+            
+        if CONFIG['GenerateCSV']['_GenerateGamepad']:
+            export.gamepad(self.name)
 
-    def _get_colour_range(self, min_value, max_value, config_heading, custom_map=None):
-        """Get the colour range for the chosen config heading,
+    def batch(self, render_types, last_session=False, file_types=None):
+        """Render multiple image types, colour maps and file types at once.
+        Each render type is given as (type, [colour maps]), such as ('tracks', ['Citrus', 'Ice']).
+        
+        The data for each type is only loaded, upscaled and merged once,
+        so each extra colour map only needs the colours calculating again,
+        and each extra file type only needs saving again.
+        """
+        if file_types is None:
+            file_types = [CONFIG['GenerateImages']['FileType']]
+        original_file_type = CONFIG['GenerateImages']['FileType']
+        
+        self._cache = {}
+        try:
+            for render_type, colour_maps in render_types:
+                config_heading = RENDER_CONFIG_HEADINGS[render_type]
+                for colour_map in colour_maps:
+                    CONFIG[config_heading]['ColourProfile'] = colour_map
+                    CONFIG['GenerateImages']['FileType'] = file_types[0]
+                    image_output = getattr(self, render_type)(last_session)
+                    
+                    if image_output is not None and self.save:
+                        for file_type in file_types[1:]:
+                            CONFIG['GenerateImages']['FileType'] = file_type
+                            save_image_to_folder(image_output, self.name.generate(render_type, reload=True))
+                    Message()
+        finally:
+            self._cache = None
+            CONFIG['GenerateImages']['FileType'] = original_file_type
+    
+    def _cached(self, key, func):
+        """Reuse a result while rendering a batch, otherwise just calculate it."""
+        if self._cache is None:
+            return func()
+        try:
+            return self._cache[key]
+        except KeyError:
+            result = self._cache[key] = func()
+            return result
+
+    def _content_key(self, key, arrays):
+        """Hash the contents of arrays for the render cache, or return None if it's disabled.
+        The hash is reused while rendering a batch.
+        """
+        if not self.cache.enabled:
+            return None
+        return self._cached(('Hash',) + key, lambda: hash_key(arrays))
+
+    def _source_key(self, key, last_session=False):
+        """Identify the data by the profile file it was loaded from, or return None if it's unknown.
+        This is much faster than hashing the contents, as nothing needs to be loaded.
+        """
+        if self._file_state is None or not self.cache.enabled:
+            return None
+
+        #Loading may start a new session, so the same file can give different session data
+        if last_session:
+            return key + (self._file_state, self.data['Ticks']['Session'])
+        return key + (self._file_state,)
+
+    def _cached_result(self, key, getter, func, settings, last_session=False):
+        """Calculate a result from some data, or load it from the render cache.
+        The function is given the data and a key to identify it, and the settings should contain anything else that affects the result.
+        If the profile file is known, a cached result is found without touching the data.
+        Returns None if the getter finds no data.
+        """
+        data_key = self._source_key(key, last_session=last_session)
+        if data_key is None:
+            data = self._cached(key, getter)
+            if data is None:
+                return None
+            data_key = key + (self._content_key(key, data),)
+            get_data = lambda: data
+        else:
+            get_data = lambda: self._cached(key, getter)
+
+        def calculate():
+            data = get_data()
+            if data is not None:
+                return func(data, data_key)
+        return self.cache.cached(data_key + settings, calculate)
+
+    def _set_resolution(self, image, resolution):
+        """Set the resolution an image was rendered at, which is needed for the image name.
+        This is normally done while calculating the resolution, so must be repeated for cached images.
+        """
+        output_resolution, upscale_resolution = resolution
+        CONFIG['GenerateImages']['_OutputResolutionX'], CONFIG['GenerateImages']['_OutputResolutionY'] = output_resolution
+        CONFIG['GenerateImages']['_UpscaleResolutionX'], CONFIG['GenerateImages']['_UpscaleResolutionY'] = upscale_resolution
+        return image
+
+    def _get_colour_map(self, config_heading, custom_map=None):
+        """Get the colour map for the chosen config heading,
         or revert back to the default one if it is invalid.
         """
         try:
-            colour_map = calculate_colour_map(CONFIG[config_heading]['ColourProfile'])
+            return calculate_colour_map(CONFIG[config_heading]['ColourProfile'])
         except ValueError:
             try:
-                colour_map = calculate_colour_map(CONFIG[config_heading]['ColourProfile'].default)
+                return calculate_colour_map(CONFIG[config_heading]['ColourProfile'].default)
             except ValueError:
                 if custom_map is None:
                     raise
-                colour_map = calculate_colour_map(custom_map)
-        return ColourRange(min_value, max_value, colour_map)
+                return calculate_colour_map(custom_map)
+
+    def _get_colour_range(self, min_value, max_value, config_heading, custom_map=None):
+        """Get the colour range for the chosen config heading."""
+        return ColourRange(min_value, max_value, self._get_colour_map(config_heading, custom_map=custom_map))
     
-    def tracks(self, last_session=False, file_path=None, colour_override=None):
-        """Render track image."""
-        track_data = self.data.get_tracks()
-        if track_data is None:
+    def _render_track_map(self, name, getter, config_heading, last_session=False, file_path=None, colour_override=None):
+        """Render one of the track maps (tracks, speed or strokes).
+        The getter should return the top resolution, range of values and arrays for each resolution.
+        """
+        colour_map = self._get_colour_map(config_heading, custom_map=colour_override)
+        
+        def render(track_data, data_key):
+            top_resolution, (min_value, max_value), tracks = track_data
+            output_resolution, upscale_resolution = calculate_resolution(tracks.keys(), top_resolution)
+            colour_range = ColourRange(min_value, max_value, colour_map)
+            band_height = CONFIG['GenerateImages']['BandHeight']
+            workers = render_workers()
+            if self._cache is not None:
+                upscaled_array = self._cached((name, last_session, upscale_resolution),
+                                              lambda: upscale_arrays_to_resolution(tracks, upscale_resolution, merge='max', workers=workers))
+                image_output = arrays_to_colour(colour_range, upscaled_array, workers=workers)
+            elif band_height:
+                image_output = arrays_to_colour_bands(colour_range, tracks, upscale_resolution, band_height, workers=workers)
+            else:
+                upscaled_arrays = upscale_arrays_to_resolution(tracks, upscale_resolution, merge='max', workers=workers)
+                image_output = arrays_to_colour(colour_range, upscaled_arrays, workers=workers)
+            return image_output.resize(output_resolution, RESIZE_FILTER), (output_resolution, upscale_resolution)
+        result = self._cached_result((name, last_session), getter, render, (colour_map, _resolution_settings()), last_session=last_session)
+        if result is None:
             Message(LANGUAGE.strings['Generation']['NoData'])
             return None
-            
-        top_resolution, (min_value, max_value), tracks = track_data
-        
-        output_resolution, upscale_resolution = calculate_resolution(tracks.keys(), top_resolution)
-        upscaled_arrays = upscale_arrays_to_resolution(tracks, upscale_resolution)
-
-        colour_range = self._get_colour_range(min_value, max_value, 'GenerateTracks', custom_map=colour_override)
-        
-        image_output = arrays_to_colour(colour_range, upscaled_arrays)
-        image_output = image_output.resize(output_resolution, Image.ANTIALIAS)
+        image_output = self._set_resolution(*result)
 
         if file_path is None:
-            file_path = self.name.generate('Tracks', reload=True)
+            file_path = self.name.generate(name, reload=True)
             
         if self.save:
             save_image_to_folder(image_output, file_path)
+        return image_output
+
+    def tracks(self, last_session=False, file_path=None, colour_override=None):
+        """Render track image."""
+        return self._render_track_map('Tracks', lambda: self.data.get_tracks(session=last_session), 'GenerateTracks', last_session=last_session,
+                                      file_path=file_path, colour_override=colour_override)
     
-    def speed(self, last_session=False, file_path=None, colour_override=None):
-        """Render speed track image."""
-    
-        track_data = self.data.get_speed()
+    def update_tracks(self, last_session=False, file_path=None, colour_override=None):
+        """Render track image, only updating the parts that changed since the last call.
+        This is for rendering the same profile repeatedly, such as calling reload every few minutes.
+        """
+        track_data = self.data.get_tracks(session=last_session)
         if track_data is None:
             Message(LANGUAGE.strings['Generation']['NoData'])
             return None
-            
-        top_resolution, (min_value, max_value), tracks = track_data
         
+        top_resolution, _, tracks = track_data
         output_resolution, upscale_resolution = calculate_resolution(tracks.keys(), top_resolution)
-        upscaled_arrays = upscale_arrays_to_resolution(tracks, upscale_resolution)
-
-        colour_range = self._get_colour_range(min_value, max_value, 'GenerateSpeed', custom_map=colour_override)
+        colour_map = self._get_colour_map('GenerateTracks', custom_map=colour_override)
         
-        image_output = arrays_to_colour(colour_range, upscaled_arrays)
-        image_output = image_output.resize(output_resolution, Image.ANTIALIAS)
+        #Newly visited pixels will be at or above the current tick count
+        ticks = self.data['Ticks']['Tracks']
+        if last_session:
+            ticks -= self.data['Ticks']['Session']['Tracks']
+        
+        try:
+            incremental = self._incremental[last_session]
+        except KeyError:
+            incremental = self._incremental[last_session] = IncrementalTracks()
+        image_output = incremental.render(track_data, ticks, colour_map, upscale_resolution,
+                                          CONFIG['GenerateImages']['BandHeight'], workers=render_workers())
+        image_output = image_output.resize(output_resolution, RESIZE_FILTER)
 
         if file_path is None:
-            file_path = self.name.generate('Speed', reload=True)
+            file_path = self.name.generate('Tracks', reload=True)
             
         if self.save:
             save_image_to_folder(image_output, file_path)
+        return image_output
     
-    def strokes(self, last_session=False, file_path=None, colour_override=None):
-        """Render brush strokes image."""
+    def speed(self, last_session=False, file_path=None, colour_override=None):
+        """Render speed track image.
+        The speed is stored instead of the time, so the last session can't be separated from the rest.
+        """
+        return self._render_track_map('Speed', self.data.get_speed, 'GenerateSpeed', last_session=last_session,
+                                      file_path=file_path, colour_override=colour_override)
     
-        track_data = self.data.get_strokes()
-        if track_data is None:
-            Message(LANGUAGE.strings['Generation']['NoData'])
-            return None
-            
-        top_resolution, (min_value, max_value), tracks = track_data
-        
-        output_resolution, upscale_resolution = calculate_resolution(tracks.keys(), top_resolution)
-        upscaled_arrays = upscale_arrays_to_resolution(tracks, upscale_resolution)
-
-        colour_range = self._get_colour_range(min_value, max_value, 'GenerateStrokes', custom_map=colour_override)
-        
-        image_output = arrays_to_colour(colour_range, upscaled_arrays)
-        image_output = image_output.resize(output_resolution, Image.ANTIALIAS)
-
-        if file_path is None:
-            file_path = self.name.generate('Strokes', reload=True)
-            
-        if self.save:
-            save_image_to_folder(image_output, file_path)
+    def strokes(self, last_session=False, file_path=None, colour_override=None):
+        """Render brush strokes image.
+        The speed is stored instead of the time, so the last session can't be separated from the rest.
+        """
+        return self._render_track_map('Strokes', self.data.get_strokes, 'GenerateStrokes', last_session=last_session,
+                                      file_path=file_path, colour_override=colour_override)
 
     def double_clicks(self, last_session=False, file_path=None, colour_override=None):
         """Render heatmap of double clicks."""
@@ -380,9 +556,6 @@ class RenderImage(object):
     def clicks(self, last_session=False, file_path=None, colour_override=None, _double_click=False):
         """Render heatmap of clicks."""
 
-        top_resolution, (min_value, max_value), clicks = self.data.get_clicks(session=last_session, double_click=_double_click)
-        output_resolution, upscale_resolution = calculate_resolution(clicks.keys(), top_resolution)
-
         lmb = CONFIG['GenerateHeatmap']['_MouseButtonLeft']
         mmb = CONFIG['GenerateHeatmap']['_MouseButtonMiddle']
         rmb = CONFIG['GenerateHeatmap']['_MouseButtonRight']
@@ -394,31 +567,98 @@ class RenderImage(object):
                 skip.append(1)
             if not rmb:
                 skip.append(2)
-        upscaled_arrays = upscale_arrays_to_resolution(clicks, upscale_resolution, skip=skip)
-
-        (min_value, max_value), heatmap = arrays_to_heatmap(upscaled_arrays,
-                               gaussian_size=gaussian_size(upscale_resolution[0], upscale_resolution[1]),
-                               clip=1-CONFIG['Advanced']['HeatmapRangeClipping'])
-
-        colour_range = self._get_colour_range(min_value, max_value, 'GenerateHeatmap', custom_map=colour_override)
-        
-        image_output = Image.fromarray(colour_range.convert_to_rgb(heatmap))
-        image_output = image_output.resize(output_resolution, Image.ANTIALIAS)
+        clip = 1 - CONFIG['Advanced']['HeatmapRangeClipping']
+        blur_precision = CONFIG['GenerateHeatmap']['BlurPrecision']
+        colour_map = self._get_colour_map('GenerateHeatmap', custom_map=colour_override)
+        workers = render_workers()
+        
+        def render(click_data, data_key):
+            top_resolution, _, clicks = click_data
+            output_resolution, upscale_resolution = calculate_resolution(clicks.keys(), top_resolution)
+            blur_size = gaussian_size(upscale_resolution[0], upscale_resolution[1])
+            
+            def calculate_heatmap():
+                if blur_precision and blur_size:
+                    return points_to_heatmap(clicks, upscale_resolution, output_resolution,
+                                             gaussian_size=blur_size, clip=clip, skip=skip, workers=workers)
+                upscaled_arrays = upscale_arrays_to_resolution(clicks, upscale_resolution, skip=skip, merge='add', workers=workers)
+                return arrays_to_heatmap(upscaled_arrays, gaussian_size=blur_size, clip=clip, workers=workers)
+            heatmap_key = ('Heatmap', data_key, tuple(skip), output_resolution, upscale_resolution,
+                           blur_size, clip, blur_precision, CONFIG['Advanced']['HeatmapRangeSample'])
+            (min_value, max_value), heatmap = self._cached(('Clicks', last_session, _double_click, tuple(skip), output_resolution,
+                                                            upscale_resolution, blur_size, clip),
+                                                           lambda: self.cache.cached(heatmap_key, calculate_heatmap))
+            colour_range = ColourRange(min_value, max_value, colour_map)
+            image_output = Image.fromarray(colour_range.convert_to_rgb(heatmap, workers=workers))
+            return image_output.resize(output_resolution, RESIZE_FILTER), (output_resolution, upscale_resolution)
+        settings = (colour_map, tuple(skip), clip, blur_precision, CONFIG['Advanced']['HeatmapRangeSample'],
+                    CONFIG['GenerateHeatmap']['_GaussianBlurBase'], CONFIG['GenerateHeatmap']['GaussianBlurMultiplier'],
+                    _resolution_settings())
+        result = self._cached_result(('Clicks', last_session, _double_click),
+                                     lambda: self.data.get_clicks(session=last_session, double_click=_double_click),
+                                     render, settings, last_session=last_session)
+        if result is None:
+            Message(LANGUAGE.strings['Generation']['NoData'])
+            return None
+        image_output = self._set_resolution(*result)
 
         if file_path is None:
             file_path = self.name.generate('Clicks', reload=True)
             
         if self.save:
             save_image_to_folder(image_output, file_path)
+        return image_output
         
     def keyboard(self, last_session=False, file_path=None, colour_override=None):
         """Render keyboard image."""
-        kb = DrawKeyboard(self.profile, self.data, last_session=last_session)
+        data_set = 'Session' if last_session else 'All'
+        
+        def render(key_data, data_key):
+            return DrawKeyboard(self.profile, self.data, last_session=last_session).draw_image()
         
-        image_output = kb.draw_image()
+        #The layout and sizes depend on the language and advanced settings, and the profile name is drawn on the image
+        settings = (self.profile, CONFIG['Main']['Language'], CONFIG['GenerateKeyboard'], CONFIG['Advanced'],
+                    CONFIG['GenerateImages']['HighPrecision'])
+        image_output = self._cached_result(('Keyboard', last_session), lambda: (self.data['Keys'][data_set], self.data['Ticks']),
+                                           render, settings, last_session=last_session)
 
         if file_path is None:
             file_path = self.name.generate('Keyboard', reload=True)
             
         if self.save:
-            save_image_to_folder(image_output, file_path)
\ No newline at end of file
+            save_image_to_folder(image_output, file_path)
+        return image_output
+
+    def thumbsticks(self, last_session=False, file_path=None, colour_override=None):
+        """Render heatmap of thumbstick positions, with each thumbstick side by side."""
+        size = CONFIG['GenerateThumbsticks']['Resolution']
+        clip = 1 - CONFIG['Advanced']['HeatmapRangeClipping']
+        colour_map = self._get_colour_map('GenerateThumbsticks', custom_map=colour_override)
+        
+        def render(thumbsticks, data_key):
+            image_output = Image.new('RGB', (size * len(thumbsticks), size))
+            for i, thumbstick in enumerate(sorted(thumbsticks)):
+            
+                #Flip vertically so that up on the thumbstick is at the top
+                histogram = thumbsticks[thumbstick][::-1]
+                upscaled_arrays = upscale_arrays_to_resolution({(AXIS_BINS, AXIS_BINS): histogram}, (size, size), merge='add')
+                
+                (min_value, max_value), heatmap = arrays_to_heatmap(upscaled_arrays, gaussian_size=gaussian_size(size, size), clip=clip)
+                
+                colour_range = ColourRange(min_value, max_value, colour_map)
+                image_output.paste(Image.fromarray(colour_range.convert_to_rgb(heatmap)).convert('RGB'), (size * i, 0))
+            return image_output
+        settings = (size, clip, colour_map, CONFIG['Advanced']['HeatmapRangeSample'],
+                    CONFIG['GenerateHeatmap']['_GaussianBlurBase'], CONFIG['GenerateHeatmap']['GaussianBlurMultiplier'])
+        image_output = self._cached_result(('Thumbsticks', last_session), lambda: self.data.get_thumbsticks(session=last_session),
+                                           render, settings, last_session=last_session)
+        if image_output is None:
+            Message(LANGUAGE.strings['Generation']['NoData'])
+            return None
+
+        if file_path is None:
+            file_path = self.name.generate('Thumbsticks', reload=True)
+            
+        if self.save:
+            save_image_to_folder(image_output, file_path)
+        return image_output
@@ -0,0 +1,51 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Split render stages between multiple workers
+#Threads are used as numpy releases the GIL, so arrays can be shared without copying
+
+from __future__ import absolute_import, division
+
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+from ..config.settings import CONFIG
+from ..utils.compatibility import range
+
+
+def render_workers():
+    """Get the number of workers to use when rendering."""
+    workers = CONFIG['GenerateImages']['RenderWorkers']
+    if not workers:
+        try:
+            return cpu_count()
+        except NotImplementedError:
+            return 1
+    return workers
+
+
+def row_chunks(length, workers):
+    """Split a length into a (start, end) chunk for each worker."""
+    if not length:
+        return []
+    chunks = max(1, min(workers, length))
+    size = -(-length // chunks)
+    return [(start, min(start + size, length)) for start in range(0, length, size)]
+
+
+def parallel_map(func, items, workers=None):
+    """Run a function on every item and return the results in order.
+    The items are split between the workers if there is more than one.
+    """
+    if workers is None:
+        workers = render_workers()
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    pool = ThreadPool(min(workers, len(items)))
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.close()
+        pool.join()
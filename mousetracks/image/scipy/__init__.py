@@ -5,22 +5,74 @@ Source: https://github.com/Peter92/MouseTracks
 
 from __future__ import absolute_import
 
+from ...utils import numpy
 from ...utils.numpy import process_numpy_array
+from ..parallel import parallel_map, row_chunks
 try:
-    from .gaussian import gaussian_filter
+    from .gaussian import gaussian_filter, gaussian_filter1d
     from .zoom import zoom
 except ImportError:
-    from scipy.ndimage.filters import gaussian_filter
+    from scipy.ndimage.filters import gaussian_filter, gaussian_filter1d
     from scipy.ndimage.interpolation import zoom
     
 
+_UPSCALE_INDEXES = {}
+
+
+@process_numpy_array
+def blur(array, size, workers=1):
+    """Apply a gaussian blur.
+    With multiple workers, each axis is blurred separately in the same way
+    as gaussian_filter, with the other axis split between the workers.
+    """
+    if workers <= 1 or array.ndim != 2:
+        return gaussian_filter(array, sigma=size)
+    
+    height, width = array.shape
+    columns = numpy.array((width, height), create=True, dtype=str(array.dtype))
+    def blur_columns(chunk):
+        columns[:, chunk[0]:chunk[1]] = gaussian_filter1d(array[:, chunk[0]:chunk[1]], size, axis=0)
+    parallel_map(blur_columns, row_chunks(width, workers), workers)
+    
+    output = numpy.array((width, height), create=True, dtype=str(array.dtype))
+    def blur_rows(chunk):
+        output[chunk[0]:chunk[1]] = gaussian_filter1d(columns[chunk[0]:chunk[1]], size, axis=1)
+    parallel_map(blur_rows, row_chunks(height, workers), workers)
+    return output
+
+
+def upscale_indexes(size, factor):
+    """Find which index zoom uses for each position when upscaling one axis.
+    Any positions that zoom leaves empty at the edge are set to -1.
+    """
+    try:
+        return _UPSCALE_INDEXES[(size, factor)]
+    except KeyError:
+        pass
+    
+    #Zoom two rows, as zoom can't handle a single one
+    indexes = numpy.arange(1, size + 1)
+    result = _UPSCALE_INDEXES[(size, factor)] = zoom(numpy.array([indexes, indexes]), (1, factor), order=0)[0] - 1
+    return result
+
+
 @process_numpy_array
-def blur(array, size):
-    return gaussian_filter(array, sigma=size)
+def take_indexes(array, rows, columns):
+    """Build an upscaled array from the row and column indexes."""
+    result = array.take(rows, axis=0).take(columns, axis=1)
+    result[rows < 0] = 0
+    result[:, columns < 0] = 0
+    return result
 
 
 @process_numpy_array
 def upscale(array, factor):
+    """Nearest neighbour upscale, giving the same result as zoom.
+    Each row and column of the output comes from a single row and column of
+    the input, so the indexes can be calculated once and gathered.
+    """
     if factor[0] == 1 and factor[1] == 1:
         return array
-    return zoom(array, factor, order=0)
\ No newline at end of file
+    if array.ndim != 2:
+        return zoom(array, factor, order=0)
+    return take_indexes(array, upscale_indexes(array.shape[0], factor[0]), upscale_indexes(array.shape[1], factor[1]))
\ No newline at end of file
@@ -185,5 +185,10 @@ def zoom(input, zoom, output=None, order=3, mode='constant', cval=0.0,
                                                    shape=output_shape)
     zoom = numpy.asarray(zoom, dtype=numpy.float64)
     zoom = numpy.ascontiguousarray(zoom)
-    _nd_image.zoom_shift(filtered, zoom, None, output, order, mode, cval)
+    try:
+        _nd_image.zoom_shift(filtered, zoom, None, output, order, mode, cval)
+    
+    #Newer versions of scipy have extra padding and grid mode arguments
+    except TypeError:
+        _nd_image.zoom_shift(filtered, zoom, None, output, order, mode, cval, 0, False)
     return return_value
@@ -0,0 +1,134 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Append only journal of the frames sent to the background process
+#Anything recorded since the last save can be recovered after a crash
+
+from __future__ import absolute_import
+
+import os
+import struct
+import time
+import zlib
+
+from .files import DATA_FOLDER, DATA_TEMP_FOLDER, DATA_CORRUPT_FOLDER, PICKLE_PROTOCOL
+from .utils.compatibility import pickle
+from .utils.os import create_folder, hide_file, list_directory, rename_file
+
+
+JOURNAL_FOLDER = '{}/{}'.format(DATA_FOLDER, DATA_TEMP_FOLDER)
+
+JOURNAL_PREFIX = 'journal-'
+
+JOURNAL_EXTENSION = '.mtj'
+
+#Frames that must never be written or replayed
+JOURNAL_IGNORE = ('Save', 'Quit', 'Exit')
+
+#Each record is the length and checksum of the pickled frame
+_RECORD_HEADER = struct.Struct('<II')
+
+
+def encode_frame(frame):
+    """Convert a frame into a journal record."""
+    pickled = pickle.dumps(frame, PICKLE_PROTOCOL)
+    return _RECORD_HEADER.pack(len(pickled), zlib.crc32(pickled) & 0xffffffff) + pickled
+
+
+def read_journal(path):
+    """Read every complete frame from a journal.
+    Reading stops at the first incomplete or corrupt record,
+    as that will be the write that was interrupted.
+    """
+    try:
+        f = open(path, 'rb')
+    except (IOError, OSError):
+        return
+    with f:
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            length, checksum = _RECORD_HEADER.unpack(header)
+            pickled = f.read(length)
+            if len(pickled) < length or zlib.crc32(pickled) & 0xffffffff != checksum:
+                return
+            yield pickle.loads(pickled)
+
+
+def list_journals():
+    """Get the paths of any journals left over from previous runs, oldest first."""
+    files = list_directory(JOURNAL_FOLDER, force_extension=JOURNAL_EXTENSION)
+    if not files:
+        return []
+    journals = sorted(f for f in files if f.startswith(JOURNAL_PREFIX))
+    return ['{}/{}'.format(JOURNAL_FOLDER, f) for f in journals]
+
+
+def discard_journal(path):
+    """Move a journal that could not be replayed out of the way."""
+    corrupted_folder = '{}/{}'.format(DATA_FOLDER, DATA_CORRUPT_FOLDER)
+    if create_folder(corrupted_folder, is_file=False):
+        hide_file(corrupted_folder)
+    return rename_file(path, '{}/{}'.format(corrupted_folder, os.path.basename(path)))
+
+
+class Journal(object):
+    """Write frames to disk as they are received.
+    Frames are buffered and only synced to disk every few seconds,
+    and the journal is reset each time the profiles have been saved.
+    """
+    def __init__(self, sync_frequency=5, path=None):
+        if path is None:
+            path = '{}/{}{}{}'.format(JOURNAL_FOLDER, JOURNAL_PREFIX, int(time.time() * 1000), JOURNAL_EXTENSION)
+        self.path = path
+        self.sync_frequency = sync_frequency
+        self.last_sync = time.time()
+        self.pending = 0
+
+        if create_folder(JOURNAL_FOLDER, is_file=False):
+            hide_file(JOURNAL_FOLDER)
+        self._file = open(self.path, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, frame):
+        """Add a frame to the journal."""
+        frame = {k: v for k, v in frame.items() if k not in JOURNAL_IGNORE}
+        if not frame:
+            return
+        self._file.write(encode_frame(frame))
+        self.pending += 1
+
+        if time.time() - self.last_sync >= self.sync_frequency:
+            self.sync()
+
+    def sync(self):
+        """Force all pending frames to be written to disk."""
+        if self.pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.pending = 0
+        self.last_sync = time.time()
+
+    def reset(self, frame=None):
+        """Clear the journal once everything has been saved.
+        The frame given will become the first record, and should contain
+        anything needed to restore the current state during a replay.
+        """
+        self._file.seek(0)
+        self._file.truncate()
+        self.pending = 1
+        if frame:
+            self.append(frame)
+        self.sync()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
@@ -15,6 +15,15 @@ from .utils.compatibility import PYTHON_VERSION, BytesIO
 from .utils.os import get_documents_path, read_env_var
 
 
+#The 'ansi' codec only exists on Windows
+try:
+    codecs.lookup('ansi')
+except LookupError:
+    ANSI_ENCODING = 'latin-1'
+else:
+    ANSI_ENCODING = 'ansi'
+
+
 def format_name(name, extra_chars=''):
     """Remove any invalid characters for file name."""
     try:
@@ -93,7 +102,7 @@ class TextFile(object):
                 with codecs.open(self.file_name, self.mode) as f:
                     header = f.read(3)
             else:
-                with codecs.open(self.file_name, self.mode, encoding='ansi') as f:
+                with codecs.open(self.file_name, self.mode, encoding=ANSI_ENCODING) as f:
                     header = f.read(3)
             if header.startswith(self.UTF8_MARKER):
                 self.encoding = 'utf8'
@@ -110,7 +119,7 @@ class TextFile(object):
             if PYTHON_VERSION < 3:
                 self.file_object = codecs.open(self.file_name, self.mode)
             else:
-                self.file_object = codecs.open(self.file_name, self.mode, encoding='ansi')
+                self.file_object = codecs.open(self.file_name, self.mode, encoding=ANSI_ENCODING)
         else:
             self.file_object = codecs.open(self.file_name, self.mode, encoding=self.encoding)
 
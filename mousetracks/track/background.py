@@ -12,14 +12,16 @@ import traceback
 
 from ..utils import numpy
 from ..applications import RunningApplications
-from ..utils.compatibility import range, iteritems
+from ..utils.compatibility import range, iteritems, queue
 from ..config.settings import CONFIG
 from ..constants import MAX_INT, TRACKING_DISABLE, TRACKING_IGNORE, UPDATES_PER_SECOND, KEY_STATS, DEFAULT_NAME
 from ..files import LoadData, save_data, prepare_file
+from ..gamepad import record_axis_histograms
+from ..journal import Journal, read_journal, list_journals, discard_journal
 from ..config.language import LANGUAGE
 from ..utils.maths import find_distance, calculate_line, round_int
 from ..notify import NOTIFY
-from ..utils.os import MULTI_MONITOR, monitor_info, set_priority
+from ..utils.os import MULTI_MONITOR, monitor_info, set_priority, remove_file
     
 
 def running_processes(q_recv, q_send, background_send):
@@ -133,10 +135,12 @@ def running_processes(q_recv, q_send, background_send):
 
 
 def _save_wrapper(q_send, program_name, data):
-    """Handle saving the data files from the thread."""
+    """Handle saving the data files from the thread.
+    Returns False if the data could not be saved.
+    """
     
     if program_name is not None and program_name[0] == TRACKING_DISABLE:
-        return
+        return True
     
     NOTIFY(LANGUAGE.strings['Tracking']['SavePrepare']).put(q_send)
     saved = False
@@ -157,7 +161,7 @@ def _save_wrapper(q_send, program_name, data):
         else:
             if max_attempts == 1:
                 NOTIFY(LANGUAGE.strings['Tracking']['SaveIncompleteNoRetry']).put(q_send)
-                return
+                return False
 
             seconds = round_int(CONFIG['Save']['WaitAfterFail'])
             minutes = round_int(CONFIG['Save']['WaitAfterFail'] / 60)
@@ -169,10 +173,13 @@ def _save_wrapper(q_send, program_name, data):
             
     if not saved:
         NOTIFY(LANGUAGE.strings['Tracking']['SaveIncompleteRetryFail']).put(q_send)
+    return saved
 
 
 def _notify_queue_size(queue_main, queue_send=None):
     """Add number of queued commands to Notify class."""
+    if queue_main is None:
+        return
     try:
         remaining_commands = queue_main.qsize()
     except NotImplementedError:
@@ -181,280 +188,401 @@ def _notify_queue_size(queue_main, queue_send=None):
             COMMANDS_PLURAL=LANGUAGE.strings['Words'][('CommandSingle', 'CommandPlural')[remaining_commands != 1]]).put(queue_send)
 
 
+def _create_store(new_sessions=True):
+    """Create the initial state of the background process.
+    Disable new_sessions when replaying old data into existing profiles.
+    """
+    return {'Data': {None: LoadData(_reset_sessions=new_sessions)},
+            'Applications': {
+                DEFAULT_NAME: {
+                   'Data': LoadData(_reset_sessions=new_sessions),
+                   'ActivitySinceLastSave': False,
+                   'SavesSinceLastActivity': 0,
+                },
+            },
+            'CurrentProgram': None,
+            'CurrentProgramName': DEFAULT_NAME,
+            'Resolution': None,
+            'MonitorLimits': None,
+            'Offset': (0, 0),
+            'LastResolution': None,
+            'ActivitySinceLastSave': False,
+            'ApplicationResolution': None,
+            'LastClick': None,
+            'KeyTrack': {'LastKey': None,
+                         'Time': None,
+                         'Backspace': False},
+            'FirstLoad': True,
+            'LastTrackUpdate': 0,
+            'LastIdle': 0,
+            'ProcessIDs': defaultdict(set),
+            'NewSessions': new_sessions
+           }
+
+
+def _journal_checkpoint(store, received_data):
+    """Get the frame needed to restore the current state when replaying a journal.
+    Anything in the current frame that hasn't been processed yet is also included.
+    """
+    checkpoint = {'Program': (None, store['CurrentProgram']),
+                  'ApplicationResolution': store['ApplicationResolution'],
+                  'Resolution': store['Resolution'],
+                  'MonitorLimits': store['MonitorLimits']}
+    for k, v in iteritems(received_data):
+        if k not in ('Ticks', 'Save'):
+            checkpoint[k] = v
+    return checkpoint
+
+
+def recover_journals(q_send=None):
+    """Replay any journals left over from a previous run and save the result.
+    This must be done before any profiles are loaded, otherwise they will be out of date.
+    """
+    from .replay import ReplayEngine
+    
+    for path in list_journals():
+        NOTIFY(LANGUAGE.strings['Tracking']['JournalReplayStart']).put(q_send)
+        store = _create_store(new_sessions=False)
+        
+        engine = ReplayEngine(store)
+        try:
+            engine.replay(read_journal(path))
+        except Exception:
+            discard_journal(path)
+            NOTIFY(LANGUAGE.strings['Tracking']['JournalReplayFail']).put(q_send)
+            continue
+        
+        #Only delete the journal if every profile was saved
+        results = [_save_wrapper(q_send, application_name, application_data['Data'])
+                   for application_name, application_data in store['Applications'].items()
+                   if application_data['ActivitySinceLastSave']]
+        if all(results):
+            remove_file(path)
+        NOTIFY(LANGUAGE.strings['Tracking']['JournalReplayEnd'], NUMBER=engine.frames,
+               COMMANDS_PLURAL=LANGUAGE.strings['Words'][('CommandSingle', 'CommandPlural')[engine.frames != 1]]).put(q_send)
+
+
 def background_process(q_recv, q_send):
     """Function to handle all the data from the main thread."""
     try:
         NOTIFY(LANGUAGE.strings['Tracking']['ScriptThreadStart']).put(q_send)
         set_priority('low')
         
-        store = {'Data': {None: LoadData()},
-                 'Applications': {
-                     DEFAULT_NAME: {
-                        'Data': LoadData(),
-                        'ActivitySinceLastSave': False,
-                        'SavesSinceLastActivity': 0,
-                     },
-                 },
-                 'CurrentProgram': None,
-                 'CurrentProgramName': DEFAULT_NAME,
-                 'Resolution': None,
-                 'MonitorLimits': None,
-                 'Offset': (0, 0),
-                 'LastResolution': None,
-                 'ActivitySinceLastSave': False,
-                 'ApplicationResolution': None,
-                 'LastClick': None,
-                 'KeyTrack': {'LastKey': None,
-                              'Time': None,
-                              'Backspace': False},
-                 'FirstLoad': True,
-                 'LastTrackUpdate': 0,
-                 'LastIdle': 0,
-                 'ProcessIDs': defaultdict(set)
-                }
+        recover_journals(q_send)
+        store = _create_store()
         
         NOTIFY(LANGUAGE.strings['Tracking']['ProfileLoad'])
         _notify_queue_size(q_recv)
         NOTIFY.put(q_send)
         
-        while True:
-            received_data = q_recv.get()
-            data = store['Applications'][store['CurrentProgramName']]['Data']
-            
-            #Increment the amount of time the script has been running for
-            if 'Ticks' in received_data:
-                data['Ticks']['Total'] += received_data['Ticks']['Total']
-                data['Sessions'][-1][1] += received_data['Ticks']['Total']
-                
-                #Increment idle time if it reaches a threshold (>10 seconds)
-                if store['LastIdle'] > received_data['Ticks']['Idle'] and store['LastIdle'] > CONFIG['Advanced']['IdleTime']:
-                    data['Sessions'][-1][2] += store['LastIdle'] + CONFIG['Advanced']['IdleTime']
-                store['LastIdle'] = received_data['Ticks']['Idle']
-            
-            #Save the data
-            if 'Save' in received_data:
-                remove_applications = []
-                for application_name, application_data in store['Applications'].items():
-
-                    #Data has been modified
-                    if application_data['ActivitySinceLastSave']:
-                        _save_wrapper(q_send, application_name, application_data['Data'])
-                        application_data['ActivitySinceLastSave'] = False
-                        application_data['SavesSinceLastActivity'] = 0
-                        _notify_queue_size(q_recv)
-
-                    #Data hasn't been modified
-                    else:
-                        application_data['SavesSinceLastActivity'] += 1
-                        
-                        #Mark the data for deletion to free up memory
-                        NOTIFY('{}: {}'.format(application_name, application_data['SavesSinceLastActivity']), 2)
-                        if application_data['SavesSinceLastActivity'] > CONFIG['Save']['SavesBeforeUnload']:
-                            if application_name != store['CurrentProgramName']:
-                                remove_applications.append(application_name)
-
-                        #Detect why the save was skipped
-                        try:
-                            queue_size = q_recv.qsize()
-                        except NotImplementedError:
-                            queue_size = 0
-                        
-                        #Only show inactivity on the current program
-                        #There shouldn't be any case where the current program is inactive and any others aren't
-                        if application_name == store['CurrentProgramName']:
-                            #Two different save commands probably next to each other
-                            if queue_size > 2:
-                                NOTIFY(LANGUAGE.strings['Tracking']['SaveSkipNoChange'], APPLICATION_NAME=application_name)
-                            
-                            #No activity since previous save
-                            else:
-                                time_since_save = CONFIG['Save']['Frequency'] * application_data['SavesSinceLastActivity']
-                                seconds = int(time_since_save)
-                                minutes = round(time_since_save / 60, 2)
-                                if not minutes % 1:
-                                    minutes = int(minutes)
-                                hours = round(time_since_save / 3600, 2)
-                                if not hours % 1:
-                                    hours = int(hours)
-                                seconds_plural = LANGUAGE.strings['Words'][('TimeSecondSingle', 'TimeSecondPlural')[seconds != 1]]
-                                minutes_plural = LANGUAGE.strings['Words'][('TimeMinuteSingle', 'TimeMinutePlural')[minutes != 1]]
-                                hours_plural = LANGUAGE.strings['Words'][('TimeHourSingle', 'TimeHourPlural')[hours != 1]]
-                                NOTIFY(LANGUAGE.strings['Tracking']['SaveSkipInactivity'], 
-                                    SECONDS=seconds, SECONDS_PLURAL=seconds_plural,
-                                    MINUTES=minutes, MINUTES_PLURAL=minutes_plural,
-                                    HOURS=hours, HOURS_PLURAL=hours_plural,
-                                    APPLICATION_NAME=application_name
-                                )
-                q_send.put({'SaveFinished': None})
-
-                NOTIFY(str(remove_applications), 2)
-                for application_name in remove_applications:
-                    del store['Applications'][application_name]
-                    NOTIFY(LANGUAGE.strings['Tracking']['ApplicationUnload'], APPLICATION_NAME=application_name)
-
-            update_resolution = False
+        journal = None
+        if CONFIG['Save']['Journal']:
+            journal = Journal(CONFIG['Save']['JournalSync'])
+        
+        try:
+            if process_queue(store, q_recv, q_send, journal=journal):
+                return
+        finally:
+            if journal is not None:
+                journal.close()
+        
+        #Exit process (this shouldn't happen for now)
+        NOTIFY(LANGUAGE.strings['Tracking']['ScriptThreadEnd']).put(q_send)
+        _save_wrapper(q_send, store['CurrentProgramName'], store['Applications'][store['CurrentProgramName']]['Data'])
             
-            #Check for new program loaded
-            if 'Program' in received_data:
-                process_id, current_program = received_data['Program']
-                
-                if current_program != store['CurrentProgram']:
-                    update_resolution = True
-                    
-                    store['CurrentProgramName'] = current_program[0] if current_program is not None else DEFAULT_NAME
-                    NOTIFY(LANGUAGE.strings['Tracking']['ApplicationLoad'], APPLICATION_NAME=store['CurrentProgramName']).put(q_send)
+    except Exception:
+        q_send.put(traceback.format_exc())
+        
+    except KeyboardInterrupt:
+        pass
+        
 
-                    # Load from cache
-                    if store['CurrentProgramName'] in store['Applications']:
-                        store['CurrentProgram'] = current_program
-                        data = store['Applications'][store['CurrentProgramName']]['Data']
+def process_queue(store, q_recv, q_send=None, journal=None):
+    """Record each frame from the queue until told to quit.
+    Returns True if the process should quit.
+    """
+    while True:
 
-                    # Load from file
-                    else:
-                        #Load new profile
-                        allow_new_session = current_program is not None or current_program is None and store['CurrentProgram'] is None
-                        try:
-                            if process_id is not None and process_id in store['ProcessIDs'][current_program]:
-                                allow_new_session = False
-                        except KeyError:
-                            pass
-                        if process_id is not None:
-                            store['ProcessIDs'][current_program].add(process_id)
-                        data = LoadData(current_program, _reset_sessions=allow_new_session)
-                        store['CurrentProgram'] = current_program
-                        store['Applications'][store['CurrentProgramName']] = {
-                            'Data': data,
-                            'ActivitySinceLastSave': False,
-                            'SavesSinceLastActivity': 0,
-                        }
-                        
-                        #Check new resolution
-                        try:
-                            store['ApplicationResolution'] = received_data['ApplicationResolution']
-                        except KeyError:
-                            pass
-                        if store['ApplicationResolution'] is None:
-                            check_resolution(data, store['Resolution'])
-                        else:
-                            check_resolution(data, store['ApplicationResolution'][1])
-                            
-                        if data['Ticks']['Total']:
-                            NOTIFY(LANGUAGE.strings['Tracking']['ProfileLoad'])
-                        else:
-                            NOTIFY(LANGUAGE.strings['Tracking']['ProfileNew'])
+        #Frames are only sent when there is input, so sync the journal if nothing arrives in time
+        #Otherwise the last frames before going idle could stay unwritten for hours
+        if journal is not None and journal.pending:
+            try:
+                received_data = q_recv.get(timeout=journal.sync_frequency)
+            except queue.Empty:
+                journal.sync()
+                continue
+        else:
+            received_data = q_recv.get()
 
-                    _notify_queue_size(q_recv)
-                NOTIFY.put(q_send)
-            
-            if 'ApplicationResolution' in received_data:
-                store['ApplicationResolution'] = received_data['ApplicationResolution']
-                if store['ApplicationResolution'] is not None:
-                    check_resolution(data, store['ApplicationResolution'][1])
-                    update_resolution = True
-
-            if 'Resolution' in received_data:
-                store['Resolution'] = received_data['Resolution']
-                check_resolution(data, received_data['Resolution'])
-                update_resolution = True
-            
-            if 'MonitorLimits' in received_data:
-                store['MonitorLimits'] = received_data['MonitorLimits']
-                update_resolution = True
-            
-            #Keep the history tracking the correct resolution
-            if update_resolution and CONFIG['Main']['HistoryLength']:
-                if store['ApplicationResolution'] is not None:
-                    history_resolution = store['ApplicationResolution']
-                elif MULTI_MONITOR:
-                    history_resolution = store['MonitorLimits']
+        if process_frame(store, received_data, q_recv, q_send, journal=journal):
+            return True
+
+
+def _reload_saved_applications(store, application_names):
+    """Load saved profiles again when replaying a journal.
+    Any frames before the save are already in the file, so replaying them again would count them twice.
+    """
+    for application_name in application_names:
+        try:
+            application_data = store['Applications'][application_name]
+        except KeyError:
+            continue
+        data = LoadData(application_name, _reset_sessions=store['NewSessions'])
+        application_data['Data'] = data
+        application_data['ActivitySinceLastSave'] = False
+
+        if application_name == store['CurrentProgramName']:
+            if store['ApplicationResolution'] is None:
+                check_resolution(data, store['Resolution'])
+            else:
+                check_resolution(data, store['ApplicationResolution'][1])
+
+
+def process_frame(store, received_data, q_recv=None, q_send=None, journal=None):
+    """Record a single frame of data sent from the main thread.
+    Returns True if the process should quit.
+    """
+    #Only found in journals where some of the profiles failed to save
+    if 'JournalSaved' in received_data:
+        _reload_saved_applications(store, received_data['JournalSaved'])
+
+    data = store['Applications'][store['CurrentProgramName']]['Data']
+    
+    if journal is not None:
+        journal.append(received_data)
+    
+    #Increment the amount of time the script has been running for
+    if 'Ticks' in received_data:
+        record_ticks(store, received_data['Ticks'])
+    
+    #Save the data
+    if 'Save' in received_data:
+        remove_applications = []
+        saved_applications = []
+        all_saved = True
+        for application_name, application_data in store['Applications'].items():
+
+            #Data has been modified
+            if application_data['ActivitySinceLastSave']:
+                if _save_wrapper(q_send, application_name, application_data['Data']):
+                    saved_applications.append(application_name)
                 else:
-                    history_resolution = store['Resolution']
-                try:
-                    if data['HistoryAnimation']['Tracks'][-1][0] != history_resolution:
-                        raise IndexError
-                except IndexError:
-                    data['HistoryAnimation']['Tracks'].append([history_resolution])
-            
-            #Record key presses
-            if 'KeyPress' in received_data:
-                store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
-                record_key_press(store, received_data['KeyPress'])
-            
-            #Record time keys are held down
-            if 'KeyHeld' in received_data:
-                record_key_held(store, received_data['KeyHeld'])
-                store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
-            
-            #Record button presses
-            if 'GamepadButtonPress' in received_data:
-                store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
-                record_gamepad_pressed(store, received_data['GamepadButtonPress'])
-            
-            #Record how long buttons are held
-            if 'GamepadButtonHeld' in received_data:
-                store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
-                record_gamepad_held(store, received_data['GamepadButtonHeld'])
-                        
-            #Axis updates
-            if 'GamepadAxis' in received_data:
-                store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
-                record_gamepad_axis(store, received_data['GamepadAxis'])
-            
-            #Calculate and track mouse movement
-            if 'MouseMove' in received_data:
-                store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
-                record_mouse_move(store, received_data['MouseMove'])
+                    all_saved = False
+                application_data['ActivitySinceLastSave'] = False
+                application_data['SavesSinceLastActivity'] = 0
+                _notify_queue_size(q_recv)
+
+            #Data hasn't been modified
+            else:
+                application_data['SavesSinceLastActivity'] += 1
                 
-                #Add to history if set
-                if CONFIG['Main']['HistoryLength']:
-                    data['HistoryAnimation']['Tracks'][-1].append(received_data['MouseMove'][1])
-                
-                #Compress tracks if the count gets too high
-                max_track_value = CONFIG['Advanced']['CompressTrackMax']
-                if not max_track_value:
-                    max_track_value = MAX_INT
+                #Mark the data for deletion to free up memory
+                NOTIFY('{}: {}'.format(application_name, application_data['SavesSinceLastActivity']), 2)
+                if application_data['SavesSinceLastActivity'] > CONFIG['Save']['SavesBeforeUnload']:
+                    if application_name != store['CurrentProgramName']:
+                        remove_applications.append(application_name)
+
+                #Detect why the save was skipped
+                try:
+                    queue_size = q_recv.qsize()
+                except NotImplementedError:
+                    queue_size = 0
                 
-                if data['Ticks']['Tracks'] > max_track_value:
-                    NOTIFY(LANGUAGE.strings['Tracking']['CompressStart'], TRACK_TYPE='tracks').put(q_send)
+                #Only show inactivity on the current program
+                #There shouldn't be any case where the current program is inactive and any others aren't
+                if application_name == store['CurrentProgramName']:
+                    #Two different save commands probably next to each other
+                    if queue_size > 2:
+                        NOTIFY(LANGUAGE.strings['Tracking']['SaveSkipNoChange'], APPLICATION_NAME=application_name)
                     
-                    compress_tracks(store, CONFIG['Advanced']['CompressTrackAmount'])
+                    #No activity since previous save
+                    else:
+                        time_since_save = CONFIG['Save']['Frequency'] * application_data['SavesSinceLastActivity']
+                        seconds = int(time_since_save)
+                        minutes = round(time_since_save / 60, 2)
+                        if not minutes % 1:
+                            minutes = int(minutes)
+                        hours = round(time_since_save / 3600, 2)
+                        if not hours % 1:
+                            hours = int(hours)
+                        seconds_plural = LANGUAGE.strings['Words'][('TimeSecondSingle', 'TimeSecondPlural')[seconds != 1]]
+                        minutes_plural = LANGUAGE.strings['Words'][('TimeMinuteSingle', 'TimeMinutePlural')[minutes != 1]]
+                        hours_plural = LANGUAGE.strings['Words'][('TimeHourSingle', 'TimeHourPlural')[hours != 1]]
+                        NOTIFY(LANGUAGE.strings['Tracking']['SaveSkipInactivity'], 
+                            SECONDS=seconds, SECONDS_PLURAL=seconds_plural,
+                            MINUTES=minutes, MINUTES_PLURAL=minutes_plural,
+                            HOURS=hours, HOURS_PLURAL=hours_plural,
+                            APPLICATION_NAME=application_name
+                        )
+        q_send.put({'SaveFinished': None})
+
+        #Everything up to this point is on disk, so start the journal again
+        if journal is not None and all_saved:
+            journal.reset(_journal_checkpoint(store, received_data))
+
+        #Keep the journal for the profiles that failed, and mark which ones are now on disk
+        elif journal is not None and saved_applications:
+            journal.append({'JournalSaved': saved_applications})
+            journal.sync()
+
+        NOTIFY(str(remove_applications), 2)
+        for application_name in remove_applications:
+            del store['Applications'][application_name]
+            NOTIFY(LANGUAGE.strings['Tracking']['ApplicationUnload'], APPLICATION_NAME=application_name)
+
+    update_resolution = False
+    
+    #Check for new program loaded
+    if 'Program' in received_data:
+        process_id, current_program = received_data['Program']
+        
+        if current_program != store['CurrentProgram']:
+            update_resolution = True
+            
+            store['CurrentProgramName'] = current_program[0] if current_program is not None else DEFAULT_NAME
+            NOTIFY(LANGUAGE.strings['Tracking']['ApplicationLoad'], APPLICATION_NAME=store['CurrentProgramName']).put(q_send)
+
+            # Load from cache
+            if store['CurrentProgramName'] in store['Applications']:
+                store['CurrentProgram'] = current_program
+                data = store['Applications'][store['CurrentProgramName']]['Data']
+
+            # Load from file
+            else:
+                #Load new profile
+                allow_new_session = current_program is not None or current_program is None and store['CurrentProgram'] is None
+                try:
+                    if process_id is not None and process_id in store['ProcessIDs'][current_program]:
+                        allow_new_session = False
+                except KeyError:
+                    pass
+                if process_id is not None:
+                    store['ProcessIDs'][current_program].add(process_id)
+                data = LoadData(current_program, _reset_sessions=allow_new_session and store['NewSessions'])
+                store['CurrentProgram'] = current_program
+                store['Applications'][store['CurrentProgramName']] = {
+                    'Data': data,
+                    'ActivitySinceLastSave': False,
+                    'SavesSinceLastActivity': 0,
+                }
                     
-                    NOTIFY(LANGUAGE.strings['Tracking']['CompressEnd'], TRACK_TYPE='tracks')
-                    _notify_queue_size(q_recv)
+                if data['Ticks']['Total']:
+                    NOTIFY(LANGUAGE.strings['Tracking']['ProfileLoad'])
+                else:
+                    NOTIFY(LANGUAGE.strings['Tracking']['ProfileNew'])
                 
-            #Record mouse clicks
-            if 'MouseClick' in received_data:
-                store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
-                record_click_single(store, received_data['MouseClick'])
-                    
-            #Record double clicks
-            if 'DoubleClick' in received_data:
-                store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
-                record_click_double(store, received_data['DoubleClick'])
-            
-            #Trim the history list if too long
-            if 'HistoryCheck' in received_data:
-                max_length = CONFIG['Main']['HistoryLength'] * UPDATES_PER_SECOND
-                history_trim(store, max_length)
-                        
-            data['Ticks']['Recorded'] += 1
-            
-            if 'Quit' in received_data or 'Exit' in received_data:
-                return
+            #Check new resolution, as it may have changed since a cached profile was last used
+            try:
+                store['ApplicationResolution'] = received_data['ApplicationResolution']
+            except KeyError:
+                pass
+            if store['ApplicationResolution'] is None:
+                check_resolution(data, store['Resolution'])
+            else:
+                check_resolution(data, store['ApplicationResolution'][1])
 
-            NOTIFY.put(q_send)
+            _notify_queue_size(q_recv)
+        NOTIFY.put(q_send)
+    
+    if 'ApplicationResolution' in received_data:
+        store['ApplicationResolution'] = received_data['ApplicationResolution']
+        if store['ApplicationResolution'] is not None:
+            check_resolution(data, store['ApplicationResolution'][1])
+            update_resolution = True
+
+    if 'Resolution' in received_data:
+        store['Resolution'] = received_data['Resolution']
+        check_resolution(data, received_data['Resolution'])
+        update_resolution = True
+    
+    if 'MonitorLimits' in received_data:
+        store['MonitorLimits'] = received_data['MonitorLimits']
+        update_resolution = True
+    
+    #Keep the history tracking the correct resolution
+    if update_resolution and CONFIG['Main']['HistoryLength']:
+        if store['ApplicationResolution'] is not None:
+            history_resolution = store['ApplicationResolution']
+        elif MULTI_MONITOR:
+            history_resolution = store['MonitorLimits']
+        else:
+            history_resolution = store['Resolution']
+        try:
+            if data['HistoryAnimation']['Tracks'][-1][0] != history_resolution:
+                raise IndexError
+        except IndexError:
+            data['HistoryAnimation']['Tracks'].append([history_resolution])
+    
+    #Record key presses
+    if 'KeyPress' in received_data:
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+        record_key_press(store, received_data['KeyPress'])
+    
+    #Record time keys are held down
+    if 'KeyHeld' in received_data:
+        record_key_held(store, received_data['KeyHeld'])
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+    
+    #Record button presses
+    if 'GamepadButtonPress' in received_data:
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+        record_gamepad_pressed(store, received_data['GamepadButtonPress'])
+    
+    #Record how long buttons are held
+    if 'GamepadButtonHeld' in received_data:
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+        record_gamepad_held(store, received_data['GamepadButtonHeld'])
+                
+    #Axis updates
+    if 'GamepadAxis' in received_data:
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+        record_gamepad_axis(store, received_data['GamepadAxis'])
+    
+    #Calculate and track mouse movement
+    if 'MouseMove' in received_data:
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+        record_mouse_move(store, received_data['MouseMove'])
         
-        #Exit process (this shouldn't happen for now)
-        NOTIFY(LANGUAGE.strings['Tracking']['ScriptThreadEnd']).put(q_send)
-        _save_wrapper(q_send, store['CurrentProgramName'], data)
-            
-    except Exception:
-        q_send.put(traceback.format_exc())
+        #Add to history if set
+        if CONFIG['Main']['HistoryLength']:
+            data['HistoryAnimation']['Tracks'][-1].append(received_data['MouseMove'][1])
         
-    except KeyboardInterrupt:
-        pass
+        #Compress tracks if the count gets too high
+        max_track_value = CONFIG['Advanced']['CompressTrackMax']
+        if not max_track_value:
+            max_track_value = MAX_INT
         
+        if data['Ticks']['Tracks'] > max_track_value:
+            NOTIFY(LANGUAGE.strings['Tracking']['CompressStart'], TRACK_TYPE='tracks').put(q_send)
+            
+            compress_tracks(store, CONFIG['Advanced']['CompressTrackAmount'])
+            
+            NOTIFY(LANGUAGE.strings['Tracking']['CompressEnd'], TRACK_TYPE='tracks')
+            _notify_queue_size(q_recv)
         
+    #Record mouse clicks
+    if 'MouseClick' in received_data:
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+        record_click_single(store, received_data['MouseClick'])
+            
+    #Record double clicks
+    if 'DoubleClick' in received_data:
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+        record_click_double(store, received_data['DoubleClick'])
+    
+    #Trim the history list if too long
+    if 'HistoryCheck' in received_data:
+        max_length = CONFIG['Main']['HistoryLength'] * UPDATES_PER_SECOND
+        history_trim(store, max_length)
+                
+    data['Ticks']['Recorded'] += 1
+    
+    if 'Quit' in received_data or 'Exit' in received_data:
+        return True
+
+    NOTIFY.put(q_send)
+
+
 def check_resolution(data, resolution):
     """Make sure resolution exists in data."""
     if resolution is None:
@@ -550,6 +678,17 @@ def history_trim(store, desired_length):
     return False
 
 
+def record_ticks(store, received_data):
+    data = store['Applications'][store['CurrentProgramName']]['Data']
+    data['Ticks']['Total'] += received_data['Total']
+    data['Sessions'][-1][1] += received_data['Total']
+    
+    #Increment idle time if it reaches a threshold (>10 seconds)
+    if store['LastIdle'] > received_data['Idle'] and store['LastIdle'] > CONFIG['Advanced']['IdleTime']:
+        data['Sessions'][-1][2] += store['LastIdle'] + CONFIG['Advanced']['IdleTime']
+    store['LastIdle'] = received_data['Idle']
+
+
 def _record_click(store, received_data, click_type):
     for mouse_button_index, (x, y) in received_data:
         
@@ -607,22 +746,8 @@ def record_gamepad_held(store, received_data):
 
 def record_gamepad_axis(store, received_data):
     data = store['Applications'][store['CurrentProgramName']]['Data']
-    for controller_axis in received_data:
-        for axis, amount in iteritems(controller_axis):
-            try:
-                data['Gamepad']['All']['Axis'][axis][amount] += 1
-            except KeyError:
-                try:
-                    data['Gamepad']['All']['Axis'][axis][amount] = 1
-                except KeyError:
-                    data['Gamepad']['All']['Axis'][axis] = {amount: 1}
-            try:
-                data['Gamepad']['Session']['Axis'][axis][amount] += 1
-            except KeyError:
-                try:
-                    data['Gamepad']['Session']['Axis'][axis][amount] = 1
-                except KeyError:
-                    data['Gamepad']['Session']['Axis'][axis] = {amount: 1}    
+    record_axis_histograms(data['Gamepad']['All']['Axis'], received_data)
+    record_axis_histograms(data['Gamepad']['Session']['Axis'], received_data)
 
 
 def _record_keypress(key_dict, *args):
@@ -100,7 +100,8 @@ def _track(web_port=None, message_port=None, server_secret=None):
             message_thread = None
 
         #Setup web server
-        if CONFIG['API']['WebServer']:
+        app = load_web_app() if CONFIG['API']['WebServer'] else None
+        if app is not None:
             app.config.update(create_pipe('REQUEST', duplex=False))
             app.config.update(create_pipe('CONTROL', duplex=False))
             app.config.update(create_pipe('STATUS', duplex=False))
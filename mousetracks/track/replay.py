@@ -0,0 +1,488 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Rebuild profiles from recorded frames
+#Mouse data is queued up and written to the maps in batches, everything else is passed to the background process
+
+from __future__ import absolute_import, division
+
+from .background import process_frame, record_ticks, check_resolution, compress_tracks, history_trim, _create_store
+from ..config.settings import CONFIG
+from ..constants import MAX_INT, UPDATES_PER_SECOND
+from ..journal import JOURNAL_IGNORE, read_journal
+from ..utils import numpy
+from ..utils.compatibility import range
+from ..utils.maths import find_distance
+from ..utils.os import MULTI_MONITOR
+
+
+#Number of mouse movements to queue before writing to the maps
+REPLAY_BATCH_SIZE = 65536
+
+#Maximum number of line pixels to remember
+LINE_CACHE_SIZE = 4194304
+
+#Once this few lines are left, it's quicker to finish them one by one
+_LINE_VECTORIZE_MIN = 64
+
+#Used to combine the x and y difference into a single number
+_LINE_KEY = 2 ** 32
+
+#Any pending data must be written before these change
+CONTEXT_KEYS = ('Program', 'ApplicationResolution', 'Resolution', 'MonitorLimits', 'JournalSaved')
+
+MOUSE_KEYS = ('MouseMove', 'MouseClick', 'DoubleClick', 'HistoryCheck')
+
+#Frames that only contain these can be processed without the background process
+SIMPLE_KEYS = ('Ticks', 'MouseMove')
+
+MOUSE_BUTTONS = ('Left', 'Middle', 'Right')
+
+
+def frames_from_history(history):
+    """Convert the history animation into frames of mouse movement.
+    Each record starts with the resolution at that time, followed by the cursor positions.
+    """
+    for record in history:
+        if not record:
+            continue
+        history_resolution = record[0]
+
+        #Application resolution is stored as (rect, resolution)
+        if isinstance(history_resolution, tuple) and len(history_resolution) == 2 and isinstance(history_resolution[1], tuple):
+            yield {'ApplicationResolution': history_resolution}
+        elif isinstance(history_resolution, list):
+            yield {'MonitorLimits': history_resolution}
+        elif history_resolution is not None:
+            yield {'Resolution': history_resolution}
+
+        previous = None
+        for position in record[1:]:
+            yield {'Ticks': {'Total': 1, 'Idle': 0},
+                   'MouseMove': (previous, position, [])}
+            previous = position
+
+
+def _finish_line(x, y, count, slope, x_step, y_step, x_end, y_end, step):
+    """Continue calculating a line from where calculate_lines left off."""
+    x_result = []
+    y_result = []
+    steps = []
+    while True:
+        step += 1
+        if step > 100000:
+            raise ValueError('failed to find path to {}, {}'.format(x_end, y_end))
+        if count >= 1:
+            y += y_step
+            count -= 1
+        elif count <= -1:
+            y += y_step
+            count += 1
+        else:
+            x += x_step
+            count += slope
+        if x == x_end and y == y_end:
+            break
+        x_result.append(x)
+        y_result.append(y)
+        steps.append(step)
+        if -1 <= x_end - x <= 1 and -1 <= y_end - y <= 1:
+            break
+    return x_result, y_result, steps
+
+
+def calculate_lines(x_difference, y_difference):
+    """Calculate the pixels of many lines at once, all starting from (0, 0).
+    This steps through every line together using the same method as calculate_line,
+    so the result is identical, but includes both the start and end point.
+    Returns the line index of each pixel along with its coordinates, in order.
+    """
+    x_difference = numpy.array(x_difference, dtype='int64')
+    y_difference = numpy.array(y_difference, dtype='int64')
+    num_lines = len(x_difference)
+    lines = [numpy.arange(num_lines, dtype='int64')]
+    x_result = [numpy.array((num_lines,), create=True, dtype='int64')]
+    y_result = [numpy.array((num_lines,), create=True, dtype='int64')]
+    steps = [numpy.array((num_lines,), create=True, dtype='int64')]
+
+    #Straight lines can be calculated directly
+    x_sign = numpy.sign(x_difference, dtype='int64')
+    y_sign = numpy.sign(y_difference, dtype='int64')
+    for straight, distance in ((x_difference == 0, y_difference), (y_difference == 0, x_difference)):
+        lengths = abs(distance) - 1
+        lengths[~straight | (lengths < 0)] = 0
+        line_index = numpy.repeat(lines[0], lengths)
+        step = numpy.arange(lengths.sum(), dtype='int64') - numpy.repeat(numpy.cumsum(lengths) - lengths, lengths) + 1
+        lines.append(line_index)
+        x_result.append(x_sign[line_index] * step)
+        y_result.append(y_sign[line_index] * step)
+        steps.append(step)
+
+    #Follow every diagonal line until it reaches the end
+    line_index = lines[0][(x_difference != 0) & (y_difference != 0)]
+    x_end = x_difference[line_index]
+    y_end = y_difference[line_index]
+    x_step = x_sign[line_index]
+    y_step = y_sign[line_index]
+    slope = y_end / x_end
+    count = slope.copy()
+    x = numpy.array((len(line_index),), create=True, dtype='int64')
+    y = numpy.array((len(line_index),), create=True, dtype='int64')
+    i = 0
+    while len(line_index) >= _LINE_VECTORIZE_MIN:
+        i += 1
+
+        increase = count >= 1
+        decrease = ~increase & (count <= -1)
+        move_x = ~(increase | decrease)
+        y[~move_x] += y_step[~move_x]
+        count[increase] -= 1
+        count[decrease] += 1
+        x[move_x] += x_step[move_x]
+        count[move_x] += slope[move_x]
+
+        not_end = (x != x_end) | (y != y_end)
+        lines.append(line_index[not_end])
+        x_result.append(x[not_end])
+        y_result.append(y[not_end])
+        steps.append(numpy.array((not_end.sum(),), create=True, dtype='int64') + i)
+
+        remaining = not_end & ((abs(x_end - x) > 1) | (abs(y_end - y) > 1))
+        line_index = line_index[remaining]
+        x_end = x_end[remaining]
+        y_end = y_end[remaining]
+        x_step = x_step[remaining]
+        y_step = y_step[remaining]
+        slope = slope[remaining]
+        count = count[remaining]
+        x = x[remaining]
+        y = y[remaining]
+
+    #Finish off any long lines
+    for j in range(len(line_index)):
+        line_x, line_y, line_step = _finish_line(int(x[j]), int(y[j]), float(count[j]), float(slope[j]), int(x_step[j]), int(y_step[j]),
+                                                 int(x_end[j]), int(y_end[j]), i)
+        lines.append(numpy.array((len(line_x),), create=True, dtype='int64') + line_index[j])
+        x_result.append(numpy.array(line_x, dtype='int64'))
+        y_result.append(numpy.array(line_y, dtype='int64'))
+        steps.append(numpy.array(line_step, dtype='int64'))
+
+    #Add the end points and sort everything into order
+    lines.append(lines[0])
+    x_result.append(x_difference)
+    y_result.append(y_difference)
+    lines = numpy.concatenate(lines)
+    steps.append(numpy.array((num_lines,), create=True, dtype='int64') + numpy.max(numpy.concatenate(steps)) + 1)
+    steps = numpy.concatenate(steps)
+    order = numpy.argsort(lines * (numpy.max(steps) + 1) + steps)
+    return lines[order], numpy.concatenate(x_result)[order], numpy.concatenate(y_result)[order]
+
+
+class ReplayEngine(object):
+    """Run frames through the background process, writing the mouse data in batches.
+    The result matches recording the same frames live, with the exception that
+    any cursor positions outside the known monitors are ignored instead of
+    triggering a new check of the monitor layout.
+    """
+    def __init__(self, store=None, batch_size=REPLAY_BATCH_SIZE):
+        if store is None:
+            store = _create_store(new_sessions=False)
+        self.store = store
+        self.batch_size = batch_size
+        self.frames = 0
+        self._moves = []
+        self._clicks = []
+        self._reset_lines()
+
+        self.history_length = CONFIG['Main']['HistoryLength']
+        self.max_track_value = CONFIG['Advanced']['CompressTrackMax'] or MAX_INT
+        self.compress_amount = CONFIG['Advanced']['CompressTrackAmount']
+
+    @property
+    def data(self):
+        return self.store['Applications'][self.store['CurrentProgramName']]['Data']
+
+    def replay(self, frames):
+        """Process every frame and write all remaining data."""
+        for frame in frames:
+            self.process(frame)
+        self.flush()
+        return self.store
+
+    def process(self, received_data):
+        """Process a single frame."""
+        store = self.store
+        self.frames += 1
+
+        #Skip the background process for the most common frames
+        for key in received_data:
+            if key not in SIMPLE_KEYS:
+                break
+        else:
+            data = self.data
+            if 'Ticks' in received_data:
+                record_ticks(store, received_data['Ticks'])
+            if 'MouseMove' in received_data:
+                self._queue_move(store, data, received_data['MouseMove'])
+            data['Ticks']['Recorded'] += 1
+            return
+
+        #Finish off anything recorded under the previous program or resolution
+        for key in CONTEXT_KEYS:
+            if key in received_data:
+                self.flush()
+                break
+
+        other_data = dict(received_data)
+        for key in MOUSE_KEYS + JOURNAL_IGNORE:
+            other_data.pop(key, None)
+
+        process_frame(store, other_data)
+        data = self.data
+
+        if 'MouseMove' in received_data:
+            self._queue_move(store, data, received_data['MouseMove'])
+
+        if 'MouseClick' in received_data:
+            self._queue_clicks(store, received_data['MouseClick'], 'Single')
+
+        if 'DoubleClick' in received_data:
+            self._queue_clicks(store, received_data['DoubleClick'], 'Double')
+
+        if 'HistoryCheck' in received_data:
+            history_trim(store, self.history_length * UPDATES_PER_SECOND)
+
+        if len(self._moves) >= self.batch_size or len(self._clicks) >= self.batch_size:
+            self.flush()
+
+    def _queue_move(self, store, data, received_data):
+        """Calculate everything needed for a mouse movement, apart from the pixels."""
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+
+        start, end, clicked = received_data
+        distance = find_distance(end, start)
+        data['Distance']['Tracks'] += distance
+        continuous = store['LastTrackUpdate'] + 1 == data['Ticks']['Total']
+
+        #A movement with no start is treated as a line from the end to itself
+        buttons = 0
+        for mouse_button in clicked:
+            buttons |= 1 << mouse_button
+        if start is None:
+            self._moves.append((end[0], end[1], end[0], end[1], False, data['Ticks']['Tracks'], distance, continuous, buttons))
+        else:
+            self._moves.append((start[0], start[1], end[0], end[1], True, data['Ticks']['Tracks'], distance, continuous, buttons))
+
+        store['LastTrackUpdate'] = data['Ticks']['Total']
+        data['Ticks']['Tracks'] += 1
+
+        if self.history_length:
+            data['HistoryAnimation']['Tracks'][-1].append(end)
+
+        #Compress tracks if the count gets too high
+        if data['Ticks']['Tracks'] > self.max_track_value:
+            self.flush()
+            compress_tracks(store, self.compress_amount)
+
+    def _queue_clicks(self, store, received_data, click_type):
+        store['Applications'][store['CurrentProgramName']]['ActivitySinceLastSave'] = True
+        for mouse_button_index, (x, y) in received_data:
+            self._clicks.append((click_type, mouse_button_index, x, y))
+
+    def _get_lines(self, differences):
+        """Find where the pixels for each line are stored, calculating any that are missing.
+        Every line is cached as it's very likely the same movement will happen again.
+        """
+        if self._line_size + len(differences) * 4 > LINE_CACHE_SIZE:
+            self._reset_lines()
+
+        cached = numpy.searchsorted(self._line_keys, differences)
+        found = numpy.array((len(differences),), create=True, dtype='bool_')
+        if len(self._line_keys):
+            found = self._line_keys[numpy.clip(cached, 0, len(self._line_keys) - 1)] == differences
+
+        missing = differences[~found]
+        if len(missing):
+            y_difference = (missing + _LINE_KEY // 2) % _LINE_KEY - _LINE_KEY // 2
+            x_difference = (missing - y_difference) // _LINE_KEY
+            pixel_line, x_offset, y_offset = calculate_lines(x_difference, y_difference)
+            lengths = numpy.bincount(pixel_line, len(missing))
+            starts = numpy.cumsum(lengths) - lengths + self._line_size
+
+            keys = numpy.concatenate([self._line_keys, missing])
+            order = numpy.argsort(keys)
+            self._line_keys = keys[order]
+            self._line_starts = numpy.concatenate([self._line_starts, starts])[order]
+            self._line_lengths = numpy.concatenate([self._line_lengths, lengths])[order]
+            self._add_line_pixels(x_offset, y_offset)
+            cached = numpy.searchsorted(self._line_keys, differences)
+
+        return self._line_starts[cached], self._line_lengths[cached]
+
+    def _add_line_pixels(self, x, y):
+        """Store the pixels of new lines, doubling the space if it runs out."""
+        new_size = self._line_size + len(x)
+        if new_size > len(self._line_x):
+            capacity = max(new_size, len(self._line_x) * 2)
+            for attr in ('_line_x', '_line_y'):
+                resized = numpy.array((capacity,), create=True, dtype='int64')
+                resized[:self._line_size] = getattr(self, attr)[:self._line_size]
+                setattr(self, attr, resized)
+        self._line_x[self._line_size:new_size] = x
+        self._line_y[self._line_size:new_size] = y
+        self._line_size = new_size
+
+    def _reset_lines(self):
+        self._line_keys = numpy.array((0,), create=True, dtype='int64')
+        self._line_starts = numpy.array((0,), create=True, dtype='int64')
+        self._line_lengths = numpy.array((0,), create=True, dtype='int64')
+        self._line_x = numpy.array((0,), create=True, dtype='int64')
+        self._line_y = numpy.array((0,), create=True, dtype='int64')
+        self._line_size = 0
+
+    def _monitor_coordinates(self, x, y):
+        """Convert coordinates to the monitor they are on.
+        Returns the list of resolutions, the resolution index for each pixel
+        (-1 if not on a monitor), and the adjusted coordinates.
+        """
+        store = self.store
+        if store['ApplicationResolution'] is not None:
+            monitor_limits = [store['ApplicationResolution'][0]]
+        elif MULTI_MONITOR:
+            monitor_limits = store['MonitorLimits'] or []
+        elif store['Resolution'] is not None:
+            width, height = store['Resolution']
+            monitor_limits = [(0, 0, width, height)]
+        else:
+            monitor_limits = []
+
+        resolutions = []
+        indexes = numpy.array((len(x),), create=True, dtype='int64') - 1
+        x_offset = numpy.array((len(x),), create=True, dtype='int64')
+        y_offset = numpy.array((len(x),), create=True, dtype='int64')
+        for i, (x1, y1, x2, y2) in enumerate(monitor_limits):
+            resolutions.append((x2 - x1, y2 - y1))
+            on_monitor = (indexes < 0) & (x1 <= x) & (x < x2) & (y1 <= y) & (y < y2)
+            indexes[on_monitor] = i
+            x_offset[on_monitor] = x1
+            y_offset[on_monitor] = y1
+
+        return resolutions, indexes, x - x_offset, y - y_offset
+
+    def flush(self):
+        """Write all queued data to the maps."""
+        if self._moves:
+            self._write_moves(self._moves)
+            self._moves = []
+        if self._clicks:
+            self._write_clicks(self._clicks)
+            self._clicks = []
+
+    def _write_moves(self, moves):
+        store = self.store
+        data = self.data
+
+        start_x, start_y, end_x, end_y, has_start, values, distances, continuous, buttons = zip(*moves)
+        start_x = numpy.array(start_x, dtype='int64')
+        start_y = numpy.array(start_y, dtype='int64')
+        x_difference = numpy.array(end_x, dtype='int64') - start_x
+        y_difference = numpy.array(end_y, dtype='int64') - start_y
+
+        #Calculate each different line once
+        differences, line_index = numpy.unique(x_difference * _LINE_KEY + y_difference, return_inverse=True)
+        line_starts, line_lengths = self._get_lines(differences)
+
+        #Get the pixels for every movement
+        lengths = line_lengths[line_index]
+        first_pixels = numpy.cumsum(lengths) - lengths
+        move_index = numpy.repeat(numpy.arange(len(moves), dtype='int64'), lengths)
+        pixels = numpy.repeat(line_starts[line_index] - first_pixels, lengths) + numpy.arange(len(move_index), dtype='int64')
+        x = self._line_x[pixels] + start_x[move_index]
+        y = self._line_y[pixels] + start_y[move_index]
+
+        resolutions, indexes, x, y = self._monitor_coordinates(x, y)
+
+        #With multiple monitors, a movement is ignored if it doesn't start on one
+        if store['ApplicationResolution'] is None and MULTI_MONITOR:
+            start_indexes = indexes[first_pixels]
+            start_indexes[~numpy.array(has_start, dtype='bool_')] = -1
+            indexes[start_indexes[move_index] < 0] = -1
+
+        values = numpy.array(values, dtype='int64')
+        distances = numpy.array(distances, dtype='int64')
+        continuous = numpy.array(continuous, dtype='bool_')
+        buttons = numpy.array(buttons, dtype='int64')
+        clicked = buttons > 0
+
+        for i, resolution in enumerate(resolutions):
+            selected = indexes == i
+            if not selected.any():
+                continue
+            check_resolution(data, resolution)
+            maps = data['Resolution'][resolution]
+            width = resolution[0]
+
+            #The values increase with each movement, so only the last pixel written matters
+            moves_selected = move_index[selected]
+            pixels = y[selected] * width + x[selected]
+            unique_pixels, last = numpy.unique_last(pixels)
+            numpy.set_max(maps['Tracks'], (unique_pixels // width, unique_pixels % width), values[moves_selected[last]])
+
+            #Speed and strokes are only recorded if the mouse was moving on the previous tick
+            is_continuous = continuous[moves_selected]
+            if not is_continuous.any():
+                continue
+            moves_selected = moves_selected[is_continuous]
+            pixels = pixels[is_continuous]
+            coordinates = (pixels // width, pixels % width)
+            numpy.maximum_at(maps['Speed'], coordinates, distances[moves_selected])
+
+            is_clicked = clicked[moves_selected]
+            if is_clicked.any():
+                numpy.maximum_at(maps['Strokes'], (coordinates[0][is_clicked], coordinates[1][is_clicked]),
+                                 distances[moves_selected[is_clicked]])
+
+            unique_pixels, last = numpy.unique_last(pixels)
+            coordinates = (unique_pixels // width, unique_pixels % width)
+            last_moves = moves_selected[last]
+            for button, mouse_button in enumerate(MOUSE_BUTTONS):
+                stroke_values = values[last_moves] * (buttons[last_moves] >> button & 1)
+                numpy.set_at(maps['StrokesSeparate'][mouse_button], coordinates, stroke_values, assume_unique=True)
+
+    def _write_clicks(self, clicks):
+        data = self.data
+
+        x = numpy.array([click[2] for click in clicks], dtype='int64')
+        y = numpy.array([click[3] for click in clicks], dtype='int64')
+        double_click = numpy.array([click[0] == 'Double' for click in clicks], dtype='bool_')
+        buttons = numpy.array([click[1] for click in clicks], dtype='int64')
+        resolutions, indexes, x, y = self._monitor_coordinates(x, y)
+
+        for i, resolution in enumerate(resolutions):
+            on_monitor = indexes == i
+            if not on_monitor.any():
+                continue
+            check_resolution(data, resolution)
+            for click_type in ('Single', 'Double'):
+                for button, mouse_button in enumerate(MOUSE_BUTTONS):
+                    selected = on_monitor & (double_click == (click_type == 'Double')) & (buttons == button)
+                    if selected.any():
+                        numpy.add_at(data['Resolution'][resolution]['Clicks'][click_type][mouse_button],
+                                     (y[selected], x[selected]), 1)
+
+
+def replay_frames(frames, store=None, batch_size=REPLAY_BATCH_SIZE):
+    """Rebuild profiles from any iterable of frames.
+    Returns the store, which contains the data for every application.
+    """
+    return ReplayEngine(store, batch_size=batch_size).replay(frames)
+
+
+def replay_journal(path, store=None, batch_size=REPLAY_BATCH_SIZE):
+    """Rebuild profiles from a journal file."""
+    return replay_frames(read_journal(path), store=store, batch_size=batch_size)
+
+
+def replay_history(history, store=None, batch_size=REPLAY_BATCH_SIZE):
+    """Rebuild the tracks of a profile from its history animation."""
+    return replay_frames(frames_from_history(history), store=store, batch_size=batch_size)
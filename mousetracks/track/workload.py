@@ -0,0 +1,331 @@
+"""This is part of the Mouse Tracks Python application.
+Source: https://github.com/Peter92/MouseTracks
+"""
+#Generate realistic tracking frames without any input devices
+#The same seed will always give the same frames, so it can be used for repeatable load testing
+
+from __future__ import absolute_import, division
+
+import math
+import random
+
+from ..config.settings import CONFIG
+from ..constants import UPDATES_PER_SECOND
+from ..gamepad import THUMBSTICKS, TRIGGERS
+from ..utils.compatibility import range
+from ..utils.os import MULTI_MONITOR
+
+
+#Fitts' law coefficients (in seconds) for an average mouse user
+FITTS_INTERCEPT = 0.1
+
+FITTS_SLOPE = 0.15
+
+TARGET_SIZES = (8, 16, 24, 32, 48, 64, 128)
+
+RESOLUTIONS = ((1920, 1080), (2560, 1440), (1280, 720), (1366, 768), (1600, 900), (3840, 2160))
+
+#Virtual key codes, weighted towards letters as if typing
+KEY_CODES = tuple(range(65, 91)) * 4 + (32, 32, 32, 13, 8, 8, 16, 17, 18, 9, 27) + tuple(range(48, 58))
+
+#How often each action is picked
+ACTION_WEIGHTS = (
+    ('move', 45),
+    ('drag', 8),
+    ('type', 20),
+    ('idle', 15),
+    ('gamepad', 6),
+    ('switch', 4),
+    ('resolution', 2),
+)
+
+_DOUBLE_CLICK_TICKS = UPDATES_PER_SECOND // 2
+
+
+def fitts_ticks(distance, width):
+    """Calculate how many ticks it takes to move to a target using Fitts' law."""
+    seconds = FITTS_INTERCEPT + FITTS_SLOPE * math.log(distance / width + 1, 2)
+    return max(1, int(round(seconds * UPDATES_PER_SECOND)))
+
+
+def bezier_path(start, end, ticks, rng, curve=0.3):
+    """Generate the cursor position for each tick of a movement.
+    The path is a cubic bezier curve with random control points, and
+    the speed follows a minimum jerk profile of accelerating then slowing down.
+    """
+    (x1, y1), (x2, y2) = start, end
+    x_difference, y_difference = x2 - x1, y2 - y1
+
+    #Offset the control points perpendicular to the direct line
+    offset_a = rng.uniform(-curve, curve)
+    offset_b = rng.uniform(-curve, curve)
+    control_a = (x1 + x_difference / 3 - y_difference * offset_a, y1 + y_difference / 3 + x_difference * offset_a)
+    control_b = (x1 + x_difference * 2 / 3 - y_difference * offset_b, y1 + y_difference * 2 / 3 + x_difference * offset_b)
+
+    path = []
+    for tick in range(1, ticks + 1):
+        t = tick / ticks
+        t = t * t * t * (10 - 15 * t + 6 * t * t)
+        u = 1 - t
+        x = u * u * u * x1 + 3 * u * u * t * control_a[0] + 3 * u * t * t * control_b[0] + t * t * t * x2
+        y = u * u * u * y1 + 3 * u * u * t * control_a[1] + 3 * u * t * t * control_b[1] + t * t * t * y2
+        path.append((int(round(x)), int(round(y))))
+    return path
+
+
+def feed_queue(queue, frames):
+    """Send frames to the background process queue.
+    Returns the number of frames sent.
+    """
+    sent = 0
+    for frame in frames:
+        queue.put(frame)
+        sent += 1
+    return sent
+
+
+class Workload(object):
+    """Deterministic generator of the frames that the tracking loop would send.
+
+    Movements, clicks, typing, gamepad use, application switches and
+    resolution changes are mixed together, and the frames can either be
+    sent to the background process or given to the replay engine.
+    The mix can be changed by overriding the weights, such as {'resolution': 0}.
+    """
+    def __init__(self, seed=0, resolution=(1920, 1080), monitors=None, applications=0,
+                 gamepad=False, multi_monitor=MULTI_MONITOR, weights=None):
+        self.random = random.Random(seed)
+        self.resolution = tuple(resolution)
+        self.multi_monitor = multi_monitor
+        if monitors is None:
+            monitors = [(0, 0) + self.resolution]
+        self.monitors = [tuple(monitor) for monitor in monitors]
+        self.applications = [('Workload {}'.format(i + 1), 'workload{}.exe'.format(i + 1)) for i in range(applications)]
+        self.gamepad = gamepad
+        self.history_check = CONFIG['Advanced']['HistoryCheck']
+
+        self.ticks = 0
+        self.position = None
+        self.program = None
+        self._last_sent = 0
+        self._last_activity = 0
+        self._axis = {axis: 0 for axis in TRIGGERS}
+        for axis_x, axis_y in THUMBSTICKS.values():
+            self._axis[axis_x] = self._axis[axis_y] = 0
+
+        #Disable any actions that aren't possible
+        self._actions = [action for action, weight in ACTION_WEIGHTS]
+        self._weights = [weight for action, weight in ACTION_WEIGHTS]
+        if weights is not None:
+            for action, weight in weights.items():
+                self._weights[self._actions.index(action)] = weight
+        if not applications:
+            self._weights[self._actions.index('switch')] = 0
+        if not gamepad:
+            self._weights[self._actions.index('gamepad')] = 0
+
+    def __iter__(self):
+        return self.frames()
+
+    def frames(self, count=None):
+        """Generate frames, forever if no count is given."""
+        sent = 0
+        for events in self._ticks():
+            self.ticks += 1
+
+            if self.gamepad:
+                events['GamepadAxis'] = [self._axis_noise()]
+            if events:
+                self._last_activity = self.ticks
+            if self.history_check and not self.ticks % self.history_check:
+                events['HistoryCheck'] = True
+            if not events:
+                continue
+
+            events['Ticks'] = {'Total': self.ticks - self._last_sent,
+                               'Idle': self.ticks - self._last_activity}
+            self._last_sent = self.ticks
+            yield events
+
+            sent += 1
+            if count is not None and sent >= count:
+                return
+
+    def _ticks(self):
+        """Generate the events for each tick, which may be empty."""
+        if self.multi_monitor:
+            yield {'MonitorLimits': list(self.monitors)}
+        else:
+            yield {'Resolution': self.resolution}
+
+        while True:
+            action = self._choice(self._actions, self._weights)
+            for events in getattr(self, '_{}'.format(action))():
+                yield events
+
+    def _choice(self, options, weights):
+        """Pick an option based on its weight."""
+        position = self.random.uniform(0, sum(weights))
+        for option, weight in zip(options, weights):
+            position -= weight
+            if position < 0 and weight:
+                return option
+        return options[-1]
+
+    def _random_point(self):
+        """Get a random point on one of the monitors."""
+        if self.multi_monitor:
+            x1, y1, x2, y2 = self.random.choice(self.monitors)
+        else:
+            x1, y1 = 0, 0
+            x2, y2 = self.resolution
+        return (self.random.randint(x1, x2 - 1), self.random.randint(y1, y2 - 1))
+
+    def _constrain(self, point, target):
+        """Make sure a point lies on a monitor.
+        If between monitors, it will be moved onto the monitor containing the target.
+        """
+        x, y = point
+        if self.multi_monitor:
+            for x1, y1, x2, y2 in self.monitors:
+                if x1 <= x < x2 and y1 <= y < y2:
+                    return point
+            for x1, y1, x2, y2 in self.monitors:
+                if x1 <= target[0] < x2 and y1 <= target[1] < y2:
+                    break
+        else:
+            x1, y1 = 0, 0
+            x2, y2 = self.resolution
+        return (min(max(x, x1), x2 - 1), min(max(y, y1), y2 - 1))
+
+    def _path(self, buttons=()):
+        """Move the cursor to a new target."""
+        if self.position is None:
+            self.position = self._random_point()
+            yield {'MouseMove': [None, self.position, list(buttons)]}
+
+        target = self._random_point()
+        distance = math.hypot(target[0] - self.position[0], target[1] - self.position[1])
+        ticks = fitts_ticks(distance, self.random.choice(TARGET_SIZES))
+        for point in bezier_path(self.position, target, ticks, self.random):
+            point = self._constrain(point, target)
+            if point == self.position:
+                yield {}
+                continue
+            yield {'MouseMove': [self.position, point, list(buttons)]}
+            self.position = point
+
+    def _move(self):
+        """Move to a target, then usually click on it."""
+        for events in self._path():
+            yield events
+
+        if self.random.random() < 0.6:
+            button = self._choice((0, 1, 2), (85, 3, 12))
+            double_click = self.random.random() < 0.15
+            for events in self._click(button):
+                yield events
+            if double_click:
+                for _ in range(self.random.randint(2, _DOUBLE_CLICK_TICKS - 1)):
+                    yield {}
+                for events in self._click(button, double_click=True):
+                    yield events
+
+    def _click(self, button, double_click=False):
+        """Press and release a mouse button without moving."""
+        click = (button, self.position)
+        events = {'MouseClick': [click]}
+        if double_click:
+            events['DoubleClick'] = [click]
+        yield events
+        for _ in range(self.random.randint(3, 8)):
+            yield {}
+
+    def _drag(self):
+        """Hold a button down while moving."""
+        if self.position is None:
+            for events in self._path():
+                yield events
+        button = self._choice((0, 2), (9, 1))
+        yield {'MouseClick': [(button, self.position)]}
+        for events in self._path(buttons=[button]):
+            yield events
+
+    def _type(self):
+        """Type a burst of keys."""
+        for _ in range(self.random.randint(3, 40)):
+            key = self.random.choice(KEY_CODES)
+            held = [key]
+            if 65 <= key <= 90 and self.random.random() < 0.1:
+                held.append(16)
+            yield {'KeyPress': list(held), 'KeyHeld': list(held)}
+            for _ in range(self.random.randint(2, 7)):
+                yield {'KeyHeld': list(held)}
+            for _ in range(self.random.randint(0, 10)):
+                yield {}
+
+    def _idle(self):
+        """Do nothing for a while."""
+        for _ in range(int(self.random.uniform(0.5, 10) * UPDATES_PER_SECOND)):
+            yield {}
+
+    def _gamepad(self):
+        """Sweep the thumbsticks and press a few buttons."""
+        thumbstick = self.random.choice(sorted(THUMBSTICKS))
+        axis_x, axis_y = THUMBSTICKS[thumbstick]
+        trigger = self.random.choice(TRIGGERS)
+        angle = self.random.uniform(0, 2 * math.pi)
+        speed = self.random.uniform(-0.2, 0.2)
+        for tick in range(self.random.randint(UPDATES_PER_SECOND, 5 * UPDATES_PER_SECOND)):
+            radius = min(1, tick / 10)
+            angle += speed
+            self._axis[axis_x] = int(math.cos(angle) * radius * 32767)
+            self._axis[axis_y] = int(math.sin(angle) * radius * 32767)
+            self._axis[trigger] = int(radius * 65535) if tick % 40 < 20 else 0
+            if self.random.random() < 0.05:
+                yield {'GamepadButtonPress': [self.random.randint(1, 16)]}
+            else:
+                yield {}
+        self._axis[axis_x] = self._axis[axis_y] = self._axis[trigger] = 0
+
+    def _axis_noise(self):
+        """Get the current axis positions, with some drift around the centre."""
+        noise = self.random.randint
+        return {axis: value + noise(-600, 600) if value or axis not in TRIGGERS else 0
+                for axis, value in self._axis.items()}
+
+    def _switch(self):
+        """Switch to a different application, or back to the default profile."""
+        options = [None] + [app for app in self.applications if app != self.program]
+        self.program = self.random.choice(options)
+        events = {'Program': (None, self.program)}
+
+        #Some applications will be windowed
+        if self.program is not None and self.random.random() < 0.3:
+            width, height = self.random.choice(RESOLUTIONS[2:5])
+            x, y = self._random_point()
+            events['ApplicationResolution'] = ((x, y, x + width, y + height), (width, height))
+        else:
+            events['ApplicationResolution'] = None
+        yield events
+
+    def _resolution(self):
+        """Change the screen resolution."""
+        resolution = self.random.choice([res for res in RESOLUTIONS if res != self.resolution])
+        if self.multi_monitor:
+            x1, y1, x2, y2 = self.monitors[0]
+            self.monitors[0] = (x1, y1, x1 + resolution[0], y1 + resolution[1])
+
+            #Shift any other monitors along so that they don't overlap
+            offset = self.monitors[0][2] - x2
+            self.monitors[1:] = [(x1 + offset, y1, x2 + offset, y2) for x1, y1, x2, y2 in self.monitors[1:]]
+            self.resolution = resolution
+            events = {'MonitorLimits': list(self.monitors)}
+        else:
+            self.resolution = resolution
+            events = {'Resolution': resolution}
+
+        #Keep the cursor on screen
+        if self.position is not None:
+            self.position = self._constrain(self.position, self.position)
+        yield events
@@ -15,7 +15,7 @@ try:
 except AttributeError:
 
     #Disable gamepad tracking
-    from ...utils.config import CONFIG
+    from ...config.settings import CONFIG
     CONFIG['Main']['_TrackGamepads'] = False
     
     class Gamepad(object):
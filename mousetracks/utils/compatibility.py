@@ -6,6 +6,7 @@ Source: https://github.com/Peter92/MouseTracks
 
 from __future__ import absolute_import, print_function
 
+import importlib
 import sys
         
 
@@ -43,17 +44,15 @@ class PythonVersion(object):
         return '{}.{}.{}'.format(self.MAJOR, self.MINOR, self.MICRO)
     
     def _compare(self, value):
-        """Match the input with the version in preparation for comparing."""
+        """Match the input with the version in preparation for comparing.
+        Each part is compared separately, otherwise 3.10 would be less than 3.2.
+        """
         value = str(value)
         try:
-            v_num = int(value)
+            v_num = tuple(int(i) for i in value.split('.'))
         except ValueError:
-            try:
-                v_num = float(value)
-            except ValueError:
-                return str(self), value
-            return float(self), v_num
-        return int(self), v_num
+            return str(self), value
+        return (self.MAJOR, self.MINOR, self.MICRO)[:len(v_num)], v_num
     
     def __eq__(self, value):
         v1, v2 = self._compare(value)
@@ -122,6 +121,25 @@ def iteritems(d, use_custom=True):
     else:
         return d.items()
 
+
+
+class LazyImport(object):
+    """Import a module the first time one of its attributes is used.
+    Module level __getattr__ doesn't exist before Python 3.7, so this acts in place of the module.
+
+    >>> numpy = LazyImport('numpy')
+    >>> numpy.zeros(3)
+    array([0., 0., 0.])
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
         
 class MessageWithQueue(object):
     """Print all messages with an optional queue to send them to.
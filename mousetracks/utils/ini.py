@@ -610,6 +610,20 @@ class Config(dict):
             for variable in self._backup[header]:
                 self[header][variable] = self._backup[header][variable]
 
+    def __reduce__(self):
+        """Pickle the processed data, so nothing needs to be read again when loading.
+        The dict items would otherwise be set through __setitem__ and processed as new headings.
+        """
+        return (_restore_config, (self.__class__, self.__dict__))
+
+
+def _restore_config(cls, attributes):
+    """Create a config from pickled data."""
+    config = cls.__new__(cls)
+    config.__dict__.update(attributes)
+    dict.__init__(config, config._data)
+    return config
+
 
 def config_to_dict(conf):
     """Convert the config class to a dictionary."""
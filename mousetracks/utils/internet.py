@@ -6,16 +6,16 @@ Source: https://github.com/Peter92/MouseTracks
 from __future__ import absolute_import
 
 import json
-try:
-    import urllib2
-except ImportError:
-    import urllib.request as urllib2
 
-from .compatibility import bytes
+from .compatibility import PYTHON_VERSION, bytes, LazyImport
 from ..config.language import LANGUAGE
 from ..notify import NOTIFY
 
-    
+
+#The url library is slow to import and only needed when making a request
+urllib2 = LazyImport('urllib2' if PYTHON_VERSION < 3 else 'urllib.request')
+
+
 def send_request(url, timeout=None, output=False):
     """Send URL request."""
     if output:
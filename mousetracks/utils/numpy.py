@@ -2,36 +2,39 @@
 Source: https://github.com/Peter92/MouseTracks
 """
 #Easy to use wrappers for numpy
+#Numpy is only imported when first used, as the tracking doesn't need it until something is recorded
 
 from __future__ import division, absolute_import
 
-import numpy
 from functools import wraps
 
-from .compatibility import StringIO, BytesIO
+from .compatibility import StringIO, BytesIO, LazyImport
 from ..misc import CustomOpen
 
 
+numpy = LazyImport('numpy')
+
+
 _NUMPY_DTYPES = {
-    'bool_': numpy.bool_,
-    'int_': numpy.int_,
-    'float_': numpy.float_,
-    'complex_': numpy.complex_,
-    'intc': numpy.intc,
-    'intp': numpy.intp,
-    'int8': numpy.int8,
-    'int16': numpy.int16,
-    'int32': numpy.int32,
-    'int64': numpy.int64,
-    'uint8': numpy.uint8,
-    'uint16': numpy.uint16,
-    'uint32': numpy.uint32,
-    'uint64': numpy.uint64,
-    'float16': numpy.float16,
-    'float32': numpy.float32,
-    'float64': numpy.float64,
-    'complex64': numpy.complex64,
-    'complex128': numpy.complex128,
+    'bool_': 'bool_',
+    'int_': 'int_',
+    'float_': 'float64',
+    'complex_': 'complex128',
+    'intc': 'intc',
+    'intp': 'intp',
+    'int8': 'int8',
+    'int16': 'int16',
+    'int32': 'int32',
+    'int64': 'int64',
+    'uint8': 'uint8',
+    'uint16': 'uint16',
+    'uint32': 'uint32',
+    'uint64': 'uint64',
+    'float16': 'float16',
+    'float32': 'float32',
+    'float64': 'float64',
+    'complex64': 'complex64',
+    'complex128': 'complex128',
 }
 
 def process_numpy_array(func):
@@ -67,7 +70,7 @@ def _get_dtype(dtype):
     Inbuilt dtypes can't be used without importing numpy.
     """
     try:
-        return _NUMPY_DTYPES[dtype]
+        return getattr(numpy, _NUMPY_DTYPES[dtype])
     except KeyError:
         return None
 
@@ -118,11 +121,143 @@ def max(array, value=None):
     return array
     
         
+@process_numpy_array
+def clip(array, min_value, max_value):
+    return numpy.clip(array, min_value, max_value)
+
+
+@process_numpy_array
+def bincount(array, length, weights=None, dtype=None):
+    """Count occurances of each integer, with a fixed minimum length."""
+    counts = numpy.bincount(array, weights=weights, minlength=length)
+    if dtype is not None:
+        return counts.astype(_get_dtype(dtype))
+    return counts
+    
+        
+@process_numpy_arrays
+def concatenate(arrays, dtype=None):
+    if dtype is None:
+        return numpy.concatenate(arrays)
+    return numpy.concatenate(arrays).astype(_get_dtype(dtype))
+
+
+@process_numpy_array
+def nonzero(array):
+    return numpy.nonzero(array)
+
+
+def stack(arrays, axis=0):
+    return numpy.stack(arrays, axis=axis)
+
+
+@process_numpy_array
+def repeat(array, repeats):
+    return numpy.repeat(array, repeats)
+
+
+@process_numpy_array
+def maximum_at(array, indices, values):
+    """Set the maximum value at each index, allowing duplicate indexes."""
+    numpy.maximum.at(array, indices, values)
+    return array
+
+
+@process_numpy_array
+def add_at(array, indices, values):
+    """Add to the value at each index, allowing duplicate indexes."""
+    numpy.add.at(array, indices, values)
+    return array
+
+
+@process_numpy_array
+def set_at(array, indices, values, assume_unique=False):
+    """Set the value at each index.
+    Where an index is duplicated, the last value is used.
+    """
+    if assume_unique:
+        array[indices] = values
+        return array
+    flat_indices = numpy.ravel_multi_index(indices, array.shape)
+    unique_indices, last = unique_last(flat_indices)
+    array.flat[unique_indices] = numpy.asarray(values)[last]
+    return array
+
+
+@process_numpy_array
+def set_max(array, indices, values):
+    """Set the maximum value at each index.
+    This is quicker than maximum_at, but indexes must not be duplicated.
+    """
+    array[indices] = numpy.maximum(array[indices], values)
+    return array
+
+
+@process_numpy_array
+def unique_last(array):
+    """Get the unique values, and the index of the last occurance of each."""
+    unique_values, index = numpy.unique(array[::-1], return_index=True)
+    return unique_values, len(array) - 1 - index
+
+
+def arange(start, stop=None, dtype=None):
+    if stop is None:
+        return numpy.arange(start, dtype=_get_dtype(dtype))
+    return numpy.arange(start, stop, dtype=_get_dtype(dtype))
+
+
+@process_numpy_array
+def cumsum(array):
+    return numpy.cumsum(array)
+
+
+@process_numpy_array
+def sign(array, dtype=None):
+    if dtype is None:
+        return numpy.sign(array)
+    return numpy.sign(array).astype(_get_dtype(dtype))
+
+
+@process_numpy_array
+def unique(array, return_inverse=False):
+    return numpy.unique(array, return_inverse=return_inverse)
+
+
+@process_numpy_array
+def searchsorted(array, values):
+    return numpy.searchsorted(array, values)
+
+
+@process_numpy_array
+def quantile(array, fraction):
+    """Find the value a fraction of the way through the sorted array.
+    This uses selection rather than a full sort.
+    """
+    array = array.ravel()
+    index = int(fraction * (array.size - 1) + 0.5)
+    return numpy.partition(array, index)[index]
+
+
+@process_numpy_array
+def argmax(array):
+    return numpy.argmax(array)
+
+
+@process_numpy_array
+def argsort(array, stable=False):
+    return numpy.argsort(array, kind='mergesort' if stable else 'quicksort')
+
+
 @process_numpy_array
 def power(array, power, dtype=None):
     return numpy.power(array, power, dtype=_get_dtype(dtype))
        
        
+@process_numpy_array
+def exp(array):
+    return numpy.exp(array)
+
+
 @process_numpy_array
 def multiply(array, amount, dtype=None):
     if isinstance(array, numpy.ndarray):
@@ -194,6 +329,19 @@ def merge(arrays, merge_type, dtype=None):
     return arrays[0]
 
 
+@process_numpy_array
+def merge_into(array, other, merge_type):
+    """Merge an array into another of the same size, without creating a new one."""
+    merge_type = merge_type.lower()
+    if merge_type.startswith('max'):
+        return numpy.maximum(array, other, out=array)
+    elif merge_type.startswith('min'):
+        return numpy.minimum(array, other, out=array)
+    elif merge_type.startswith('add'):
+        return numpy.add(array, other, out=array, casting='unsafe')
+    raise ValueError('unknown merge type: {}'.format(merge_type))
+
+
 @process_numpy_array
 def convert_to_dict(array, dictionary, dtype=None):
     """Assign dictionary values to array where key is the array value."""
@@ -206,14 +354,34 @@ def remap_to_range(array, dtype=None):
 
     For example, the values (0, 1, 1.1, 1.5, 50, 50.002, 1054)
     will be remapped to (0, 1, 2, 3, 4, 5, 6).
+
+    Whole numbers within a small range are ranked by counting each value,
+    otherwise the array is sorted to find the unique values.
     """
-    values = {v: i for i, v in enumerate(sorted(set(array.ravel())))}
-    return convert_to_dict(array, values, dtype)
+    inverse = None
+    if array.size:
+        offset = array - numpy.amin(array)
+        if numpy.amax(offset) < array.size:
+            indexes = offset.astype(numpy.intp)
+            if (indexes == offset).all():
+                ranks = numpy.cumsum(numpy.bincount(indexes.ravel()) > 0) - 1
+                inverse = ranks[indexes]
+    if inverse is None:
+        inverse = numpy.unique(array, return_inverse=True)[1].reshape(array.shape)
+    if dtype is not None:
+        return inverse.astype(_get_dtype(dtype))
+    return inverse
 
     
 @process_numpy_array
-def csv(array):
-    io = StringIO
+def csv(array, f=None):
+    """Write an array as comma separated integers.
+    If no file is given, the result is returned as a string.
+    """
+    if f is not None:
+        numpy.savetxt(f, array, fmt='%d', delimiter=',')
+        return f
+    io = StringIO()
     numpy.savetxt(io, array, fmt='%d', delimiter=',')
     return io.getvalue()
     
@@ -224,6 +392,17 @@ def save(array):
     numpy.save(f, array, fix_imports=True)
     return f.getvalue()
 
+
+
+def save_npz(f, compress=True, **arrays):
+    """Save multiple named arrays to a single file."""
+    arrays = {k: v.array if isinstance(v, LazyLoader) else v for k, v in arrays.items()}
+    if compress:
+        numpy.savez_compressed(f, **arrays)
+    else:
+        numpy.savez(f, **arrays)
+    return f
+
     
 def load(saved_array):
     f = BytesIO()
@@ -232,6 +411,19 @@ def load(saved_array):
     return numpy.load(f)
     
 
+@process_numpy_array
+def hash_array(array, hasher):
+    """Update a hashlib object with the shape, type and contents of an array."""
+    array = numpy.ascontiguousarray(array)
+    hasher.update(str((array.shape, array.dtype.str)).encode('ascii'))
+    hasher.update(array.data)
+    return hasher
+
+
+def is_array(value):
+    return isinstance(value, (numpy.ndarray, LazyLoader))
+
+
 @process_numpy_array
 def fill(array, value):
     array.fill(value)
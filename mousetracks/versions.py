@@ -10,11 +10,12 @@ import time
 
 from .misc import CustomOpen
 from .config.settings import CONFIG
+from .gamepad import create_axis_histograms, convert_axis_dict
 from .utils import numpy
 from .utils.compatibility import unicode, iteritems
 
 
-FILE_VERSION = 34
+FILE_VERSION = 35
 
 VERSION = '1.0 beta'
 
@@ -74,10 +75,12 @@ class IterateMaps(object):
         self._iterate(self.maps, 'convert', _legacy=True)
 
 
-def upgrade_version(data={}, reset_sessions=True, update_metadata=True):
+def upgrade_version(data=None, reset_sessions=True, update_metadata=True):
     """Files from an older version will be run through this function.
     It will always be compatible between any two versions.
     """
+    if data is None:
+        data = {}
 
     #Convert from old versions to new
     try:
@@ -534,6 +537,14 @@ def upgrade_version(data={}, reset_sessions=True, update_metadata=True):
     if file_version < 34:
         pass
 
+    #Record gamepad axis as fixed size histograms instead of a dict of every value
+    if file_version < 35:
+        for session in ('All', 'Session'):
+            try:
+                data['Gamepad'][session]['Axis'] = convert_axis_dict(data['Gamepad'][session]['Axis'])
+            except KeyError:
+                pass
+
     version_update = data.get('FileVersion', '0') != FILE_VERSION
 
     #Track when the updates happen
@@ -564,7 +575,7 @@ def upgrade_version(data={}, reset_sessions=True, update_metadata=True):
         data['Keys']['Session']['Held'] = {}
         data['Keys']['Session']['Intervals'] = {'Total': {}, 'Individual': {}}
         data['Keys']['Session']['Mistakes'] = {}
-        data['Gamepad']['Session'] = {'Buttons': {'Pressed': {}, 'Held': {}}, 'Axis': {}}
+        data['Gamepad']['Session'] = {'Buttons': {'Pressed': {}, 'Held': {}}, 'Axis': create_axis_histograms()}
         data['TimesLoaded'] += 1
 
     return data
\ No newline at end of file
@@ -8,7 +8,6 @@ import sys
 from multiprocessing import freeze_support
 
 from mousetracks.config.settings import CONFIG, CONFIG_PATH
-from mousetracks.track import track
 from mousetracks.utils.os import tray, console, open_folder, open_file, get_key_press
 
 
@@ -20,6 +19,10 @@ if __name__ == '__main__':
     if CONFIG.is_new:
         pass
 
+    #The tracking and web server are only imported when used, as they take a while to load
+    if tray is not None and CONFIG['API']['WebServer']:
+        from mousetracks.api import load_web_app
+        load_web_app()
     no_gui = tray is None or not CONFIG['API']['WebServer']
     
     #Elevate and quit the process
@@ -28,6 +31,7 @@ if __name__ == '__main__':
     
     #Run normally
     if no_gui:
+        from mousetracks.track import track
         track()
     
     #Generate images
@@ -61,6 +65,7 @@ if __name__ == '__main__':
         from mousetracks.files import Lock, DATA_FOLDER
         from mousetracks.misc import format_file_path, get_script_path
         from mousetracks.notify import NOTIFY
+        from mousetracks.track import track
         from mousetracks.utils.compatibility import Message, input
         from mousetracks.utils.internet import get_url_json, send_request
         from mousetracks.utils.sockets import get_free_port